@@ -0,0 +1,124 @@
+"""
+AppBar 通知处理模块
+定义 Shell 发送给 AppBar 的通知常量，并提供重新定位的节流器
+
+Shell 在任务栏或其他 AppBar 移动时会向注册了回调消息的 AppBar 发送
+ABN_POSCHANGED 等通知，这类通知经常成批到达；RepositionThrottle 把一串请求
+合并为每帧最多一次重新定位，并统计被合并和实际执行的次数
+"""
+
+import time
+from typing import Callable, Dict, Optional
+
+# SHAppBarMessage 回调通知 (wParam)
+ABN_STATECHANGE = 0x0000000
+ABN_POSCHANGED = 0x0000001
+ABN_FULLSCREENAPP = 0x0000002
+ABN_WINDOWARRANGE = 0x0000003
+
+# 与显示器布局相关的窗口消息
+WM_SETTINGCHANGE = 0x001A
+# WM_SETTINGCHANGE 的 wParam：工作区域变化（任何 AppBar 的 ABM_SETPOS 都会引起）
+SPI_SETWORKAREA = 0x002F
+WM_DISPLAYCHANGE = 0x007E
+WM_DPICHANGED = 0x02E0
+WM_APP = 0x8000
+
+# 会话锁定/解锁通知，需要先调用 WTSRegisterSessionNotification
+WM_WTSSESSION_CHANGE = 0x02B1
+WTS_SESSION_LOCK = 0x7
+WTS_SESSION_UNLOCK = 0x8
+
+CALLBACK_MESSAGE_NAME = "DesktopSidebar.AppBarNotify"
+
+# 默认帧间隔（秒）
+FRAME_INTERVAL = 1.0 / 60.0
+
+_callback_message: Optional[int] = None
+
+
+def register_callback_message() -> int:
+    """
+    获取 AppBar 回调消息编号
+
+    优先使用 RegisterWindowMessage 注册全局唯一的消息，失败时退回 WM_APP 范围
+    """
+    global _callback_message
+    if _callback_message is None:
+        try:
+            import win32gui
+            _callback_message = win32gui.RegisterWindowMessage(CALLBACK_MESSAGE_NAME)
+        except Exception:
+            _callback_message = WM_APP + 0x51
+    return _callback_message
+
+
+class RepositionThrottle:
+    """
+    重新定位节流器
+
+    request() 可以被任意频繁地调用；第一次请求会安排一次执行，
+    在执行之前到达的请求全部合并，两次执行之间至少间隔 interval 秒。
+
+    节流器本身不依赖Qt，由 scheduler(delay) 负责在 delay 秒后调用 fire()，
+    例如用单次触发的 QTimer 实现
+    """
+
+    def __init__(self,
+                 callback: Callable[[], None],
+                 scheduler: Callable[[float], None],
+                 interval: float = FRAME_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        初始化节流器
+
+        Args:
+            callback: 实际执行重新定位的函数
+            scheduler: 安排延迟调用 fire() 的函数，参数为延迟秒数
+            interval: 两次执行之间的最小间隔（秒）
+            clock: 单调时钟
+        """
+        self.callback = callback
+        self.scheduler = scheduler
+        self.interval = interval
+        self.clock = clock
+        self.pending = False
+        self._last_run: Optional[float] = None
+
+        self.requested = 0
+        self.suppressed = 0
+        self.executed = 0
+
+    def request(self):
+        """请求一次重新定位"""
+        self.requested += 1
+        if self.pending:
+            self.suppressed += 1
+            return
+        self.pending = True
+        delay = 0.0
+        if self._last_run is not None:
+            delay = max(0.0, self._last_run + self.interval - self.clock())
+        self.scheduler(delay)
+
+    def fire(self):
+        """由调度器回调，执行被合并后的重新定位"""
+        if not self.pending:
+            return
+        self.pending = False
+        self._last_run = self.clock()
+        self.executed += 1
+        self.callback()
+
+    def cancel(self):
+        """丢弃尚未执行的请求（调度器仍可能回调 fire()，此时不会执行）"""
+        self.pending = False
+
+    def get_stats(self) -> Dict[str, int]:
+        """返回请求、合并和执行次数"""
+        return {
+            'requested': self.requested,
+            'suppressed': self.suppressed,
+            'executed': self.executed,
+            'pending': int(self.pending),
+        }
@@ -1,143 +1,302 @@
-import win32con
-import win32gui
-import win32api
-import ctypes
-import json
-import os
-
-ABM_NEW = 0x00000000
-ABM_REMOVE = 0x00000001
-ABM_QUERYPOS = 0x00000002
-ABM_SETPOS = 0x00000003
-
-ABE_LEFT = 0
-ABE_TOP = 1
-ABE_RIGHT = 2
-ABE_BOTTOM = 3
-
-CONFIG_PATH = 'sidebar_config.json'
-
-class APPBARDATA(ctypes.Structure):
-    _fields_ = [
-        ("cbSize", ctypes.c_uint32),
-        ("hWnd", ctypes.c_void_p),
-        ("uCallbackMessage", ctypes.c_uint32),
-        ("uEdge", ctypes.c_uint32),
-        ("rc", ctypes.c_int32 * 4),
-        ("lParam", ctypes.c_int32),
-    ]
-
-def shappbarmessage(msg, abd):
-    shell32 = ctypes.windll.shell32
-    return shell32.SHAppBarMessage(msg, ctypes.byref(abd))
-
-class AppBar:
-    def __init__(self, hwnd, edge=ABE_LEFT, width=300, height=None, top_offset=0):
-        self.hwnd = hwnd
-        self.edge = edge
-        self.width = width
-        self.height = height
-        self.top_offset = top_offset
-
-    def register(self):
-        abd = APPBARDATA()
-        abd.cbSize = ctypes.sizeof(APPBARDATA)
-        abd.hWnd = int(self.hwnd)
-        abd.uCallbackMessage = 0
-        abd.uEdge = self.edge
-        abd.lParam = 0
-        shappbarmessage(ABM_NEW, abd)
-        self.set_pos()
-
-    def set_pos(self):
-        # 获取屏幕分辨率
-        screen = win32api.GetMonitorInfo(win32api.MonitorFromWindow(self.hwnd))
-        work_area = screen['Work']      # 工作区域 (排除任务栏)
-        monitor_area = screen['Monitor']  # 完整屏幕区域
-        
-        print(f"[DEBUG] 工作区域: {work_area}")
-        print(f"[DEBUG] 完整屏幕: {monitor_area}")
-        print(f"[DEBUG] 侧边栏配置: edge={self.edge}, width={self.width}, height={self.height}, top_offset={self.top_offset}")
-        
-        # 🎯 关键修改：使用完整屏幕区域来实现铺满屏幕高度
-        l, t, r, b = monitor_area  # 使用完整屏幕而不是工作区域
-
-        rect = [l, t, r, b]
-        if self.edge in (ABE_LEFT, ABE_RIGHT):
-            rect[1] += self.top_offset
-            # 🔧 铺满屏幕高度：如果没有指定高度，使用完整屏幕高度减去顶部偏移
-            if self.height is None:
-                rect[3] = b  # 使用屏幕底部，铺满整个高度
-            else:
-                rect[3] = rect[1] + self.height
-            
-            if self.edge == ABE_LEFT:
-                rect[2] = rect[0] + self.width
-            else:
-                rect[0] = rect[2] - self.width
-        
-        # 📐 计算最终尺寸
-        final_width = rect[2] - rect[0]
-        final_height = rect[3] - rect[1]
-        print(f"[DEBUG] 最终矩形: {rect}")
-        print(f"[DEBUG] 最终尺寸: 宽度={final_width}px, 高度={final_height}px")
-        
-        # 🚀 这个部分是关键：告诉Windows为侧边栏保留空间
-        abd = APPBARDATA()
-        abd.cbSize = ctypes.sizeof(APPBARDATA)
-        abd.hWnd = int(self.hwnd)
-        abd.uCallbackMessage = 0
-        abd.uEdge = self.edge
-        abd.rc = (ctypes.c_int32 * 4)(*rect)
-        abd.lParam = 0
-
-        # 查询位置 - 让Windows调整矩形以避免与其他AppBar冲突
-        shappbarmessage(ABM_QUERYPOS, abd)
-        print(f"[DEBUG] 查询后的矩形: {list(abd.rc)}")
-        
-        # 设置位置 - 正式注册这个区域
-        shappbarmessage(ABM_SETPOS, abd)
-        print(f"[DEBUG] 设置后的矩形: {list(abd.rc)}")
-        
-        # 🎯 关键：设置窗口位置和大小
-        # HWND_TOPMOST 确保窗口始终在最上层
-        # SWP_NOACTIVATE 确保窗口不会抢夺焦点
-        result = win32gui.SetWindowPos(
-            self.hwnd, 
-            win32con.HWND_TOPMOST,  # 置顶
-            rect[0], rect[1],       # 位置
-            rect[2] - rect[0],      # 宽度
-            rect[3] - rect[1],      # 高度
-            win32con.SWP_NOACTIVATE # 不激活窗口
-        )
-        
-        if result:
-            print(f"✅ 窗口位置设置成功")
-        else:
-            print(f"❌ 窗口位置设置失败")
-        
-        # 📊 输出最终状态
-        actual_rect = win32gui.GetWindowRect(self.hwnd)
-        print(f"[DEBUG] 实际窗口矩形: {actual_rect}")
-        print(f"[DEBUG] 实际尺寸: 宽度={actual_rect[2]-actual_rect[0]}px, 高度={actual_rect[3]-actual_rect[1]}px")
-
-    def unregister(self):
-        print(f"[DEBUG] 开始取消注册AppBar...")
-        abd = APPBARDATA()
-        abd.cbSize = ctypes.sizeof(APPBARDATA)
-        abd.hWnd = int(self.hwnd)
-        abd.uCallbackMessage = 0
-        abd.uEdge = self.edge
-        abd.lParam = 0
-        result = shappbarmessage(ABM_REMOVE, abd)
-        print(f"[DEBUG] 取消注册结果: {result}")
-
-def save_config(config):
-    with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
-        json.dump(config, f)
-
-def load_config():
-    if os.path.exists(CONFIG_PATH):
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
\ No newline at end of file
+"""
+AppBar 封装
+通过 SHAppBarMessage 向 Shell 注册侧边栏并保留屏幕空间
+
+Win32 调用经由 appbar_native 原生调用层，ctypes 在第一次调用时才导入，
+因此本模块在非 Windows 系统上也可以导入，用于布局计算和测试
+"""
+
+from appbar_layout import ABE_LEFT, ABE_TOP, ABE_RIGHT, ABE_BOTTOM, collapse_rect, compute_rect
+from appbar_native import NativeApi, appbardata_type, default_native
+from monitor_topology import MonitorTopology, default_topology
+from sidebar_trace import tracer, WARNING
+
+ABM_NEW = 0x00000000
+ABM_REMOVE = 0x00000001
+ABM_QUERYPOS = 0x00000002
+ABM_SETPOS = 0x00000003
+ABM_SETAUTOHIDEBAREX = 0x0000000C
+
+# 旧版单独配置文件，仅用于导入
+CONFIG_PATH = 'sidebar_config.json'
+CONFIG_PROFILE = 'sidebar_config'
+
+HWND_TOPMOST = -1
+HWND_NOTOPMOST = -2
+SWP_NOACTIVATE = 0x0010
+
+def __getattr__(name):
+    # 兼容 from appbar_helper import APPBARDATA
+    if name == 'APPBARDATA':
+        return appbardata_type()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def shappbarmessage(msg, abd):
+    """兼容旧接口；AppBar 内部使用预先分配的结构体直接调用原生层"""
+    native = default_native()
+    return native.shappbarmessage(msg, native.pointer(abd))
+
+class AppBar:
+    def __init__(self, hwnd, edge=ABE_LEFT, width=300, height=None, top_offset=0,
+                 topology: MonitorTopology = None, callback_message=0,
+                 native: NativeApi = None):
+        self.hwnd = hwnd
+        # Shell 通过该消息发送 ABN_* 通知，0 表示不接收通知
+        self.callback_message = callback_message
+        # 有全屏应用时应取消置顶，让出最上层
+        self.topmost = True
+        # 是否已通过 ABM_NEW 向 Shell 注册
+        self.registered = False
+        # 自动隐藏模式：不保留屏幕空间，未展开时收起为 autohide_strip 厚的细条
+        self.autohide = False
+        self.autohide_strip = 4
+        self.expanded = False
+        self.edge = edge
+        self.width = width
+        self.height = height
+        self.top_offset = top_offset
+        # Shell 最近一次 ABM_SETPOS 确认的保留矩形
+        self.reserved_rect = None
+        # 正在执行 ABM_SETPOS；期间 Shell 广播的工作区域变化是自己引起的
+        self.setpos_in_flight = False
+        # 显示器信息从共享缓存读取，只在显示器变化后重新枚举
+        self.topology = topology or default_topology()
+        # 原生调用层和整个生命周期复用的 APPBARDATA
+        self.native = native or default_native()
+        self._abd = None
+        self._abd_ptr = None
+
+    def _appbardata(self):
+        """返回预先分配的 APPBARDATA 指针，并同步当前的回调消息和边缘"""
+        abd = self._abd
+        if abd is None:
+            abd = self._abd = self.native.new_appbardata(self.hwnd)
+            self._abd_ptr = self.native.pointer(abd)
+        abd.uCallbackMessage = self.callback_message
+        abd.uEdge = self.edge
+        return self._abd_ptr
+
+    def register(self, set_pos=True):
+        """
+        注册AppBar (ABM_NEW)
+        
+        Args:
+            set_pos: 注册后是否立即定位；由 SidebarManager 统一布局时传 False
+        """
+        with tracer.span('appbar.register', hwnd=int(self.hwnd), edge=self.edge):
+            self.native.shappbarmessage(ABM_NEW, self._appbardata())
+            self.registered = True
+            # 注册前窗口可能被拖到了其他显示器，重新确定一次
+            self.topology.forget_window(self.hwnd)
+            if set_pos:
+                self.set_pos()
+
+    def reconfigure(self, edge=None, width=None, top_offset=None, set_pos=True):
+        """
+        就地更新已注册的AppBar
+        
+        宽度和偏移变化只重新执行 ABM_QUERYPOS/ABM_SETPOS/SetWindowPos，
+        只有边缘变化时才先 ABM_REMOVE 再 ABM_NEW 重新注册
+        
+        Args:
+            set_pos: 是否立即重新定位；由 SidebarManager 统一布局时传 False
+        """
+        edge_changed = edge is not None and edge != self.edge
+        if width is not None:
+            self.width = width
+        if top_offset is not None:
+            self.top_offset = top_offset
+        if edge_changed:
+            self.unregister()
+            self.edge = edge
+            self.register(set_pos=set_pos)
+        elif set_pos:
+            self.set_pos()
+
+    def monitor_info(self):
+        """返回AppBar所在显示器的缓存信息"""
+        return self.topology.from_window(self.hwnd)
+
+    def compute_rect(self, monitor_area, work_area=None):
+        """根据当前配置计算目标矩形（不调用任何 Win32 API）"""
+        return compute_rect(
+            monitor_area,
+            work_area,
+            edge=self.edge,
+            width=self.width,
+            height=self.height,
+            top_offset=self.top_offset,
+        )
+
+    def target_rect(self):
+        """根据所在显示器计算目标矩形"""
+        # 获取屏幕分辨率
+        screen = self.topology.from_window(self.hwnd)
+        work_area = screen.work         # 工作区域 (排除任务栏)
+        monitor_area = screen.monitor   # 完整屏幕区域
+        
+        # 🎯 关键修改：使用完整屏幕区域来实现铺满屏幕高度
+        rect = list(self.compute_rect(monitor_area, work_area))
+        
+        if tracer.enabled:
+            tracer.event('appbar.layout',
+                         work_area=work_area, monitor_area=monitor_area,
+                         edge=self.edge, width=self.width, height=self.height,
+                         top_offset=self.top_offset, rect=rect)
+        return rect
+
+    def set_pos(self):
+        with tracer.span('appbar.set_pos', hwnd=int(self.hwnd), edge=self.edge) as span:
+            rect = self.reserve_target()
+            self.move_window(rect)
+            span.set(rect=rect)
+
+    def reserve_target(self):
+        """
+        保留目标区域并返回窗口应处的矩形，不移动窗口
+
+        只调用 SHAppBarMessage，可以在后台线程中执行，窗口移动留给GUI线程
+        """
+        rect = self.target_rect()
+        if not self.autohide:
+            # 同一边缘已有其他AppBar时 Shell 会把侧边栏向内推，
+            # 窗口跟随确认后的位置；沿边缘方向仍按目标矩形铺满
+            confirmed = self.reserve(rect)
+            if self.edge in (ABE_LEFT, ABE_RIGHT):
+                rect[0], rect[2] = confirmed[0], confirmed[2]
+            else:
+                rect[1], rect[3] = confirmed[1], confirmed[3]
+        elif not self.expanded:
+            # 自动隐藏时工作区域不变，只移动窗口
+            rect = list(collapse_rect(rect, self.edge, self.autohide_strip))
+        return rect
+
+    def resized_rect(self, width):
+        """
+        拖动调整宽度时窗口应处的矩形，不调用 SHAppBarMessage
+
+        外侧边缘保持在 Shell 上次确认的位置（同一边缘有其他AppBar时已被向内推），
+        只改变厚度；沿边缘方向与 reserve_target() 一样按目标矩形铺满
+        """
+        rect = self.target_rect()
+        confirmed = self.reserved_rect
+        if confirmed is None or self.autohide:
+            confirmed = rect
+        if self.edge == ABE_LEFT:
+            rect[0] = confirmed[0]
+            rect[2] = confirmed[0] + width
+        elif self.edge == ABE_RIGHT:
+            rect[2] = confirmed[2]
+            rect[0] = confirmed[2] - width
+        elif self.edge == ABE_TOP:
+            rect[1] = confirmed[1]
+            rect[3] = confirmed[1] + width
+        else:
+            rect[3] = confirmed[3]
+            rect[1] = confirmed[3] - width
+        return rect
+
+    def set_autohide(self, enabled):
+        """
+        在所在显示器的当前边缘上注册/注销自动隐藏AppBar (ABM_SETAUTOHIDEBAREX)
+        
+        Returns:
+            bool: 是否成功；同一显示器的同一边缘已有自动隐藏栏时注册失败
+        """
+        abd_ptr = self._appbardata()
+        self._abd.rc[0:4] = self.monitor_info().monitor
+        self._abd.lParam = 1 if enabled else 0
+        ok = bool(self.native.shappbarmessage(ABM_SETAUTOHIDEBAREX, abd_ptr))
+        self._abd.lParam = 0
+        self.autohide = enabled and ok
+        if tracer.enabled:
+            tracer.event('appbar.set_autohide', enabled=enabled, ok=ok)
+        return ok
+
+    def set_expanded(self, expanded):
+        """自动隐藏模式下展开或收起窗口"""
+        self.expanded = expanded
+        self.set_pos()
+
+    def reserve(self, rect):
+        """
+        为侧边栏保留屏幕空间 (ABM_QUERYPOS + ABM_SETPOS)，不移动窗口
+        
+        Returns:
+            tuple: Shell 最终确认的矩形
+        """
+        # 🚀 这个部分是关键：告诉Windows为侧边栏保留空间
+        abd_ptr = self._appbardata()
+        rc = self._abd.rc
+        rc[0:4] = rect
+
+        # 查询位置 - 让Windows调整矩形以避免与其他AppBar冲突
+        self.native.shappbarmessage(ABM_QUERYPOS, abd_ptr)
+        if tracer.enabled:
+            tracer.event('appbar.querypos', rc=list(rc))
+        
+        # Shell 只调整靠外的一侧，按原厚度恢复靠内的一侧
+        if self.edge == ABE_LEFT:
+            rc[2] = rc[0] + (rect[2] - rect[0])
+        elif self.edge == ABE_RIGHT:
+            rc[0] = rc[2] - (rect[2] - rect[0])
+        elif self.edge == ABE_TOP:
+            rc[3] = rc[1] + (rect[3] - rect[1])
+        else:
+            rc[1] = rc[3] - (rect[3] - rect[1])
+        
+        # 设置位置 - 正式注册这个区域
+        self.setpos_in_flight = True
+        try:
+            self.native.shappbarmessage(ABM_SETPOS, abd_ptr)
+        finally:
+            self.setpos_in_flight = False
+        if tracer.enabled:
+            tracer.event('appbar.setpos', rc=list(rc))
+        self.reserved_rect = (rc[0], rc[1], rc[2], rc[3])
+        return self.reserved_rect
+
+    def move_window(self, rect):
+        """将窗口移动到指定矩形 (SetWindowPos)，不修改保留区域"""
+        # 🎯 关键：设置窗口位置和大小
+        # HWND_TOPMOST 确保窗口始终在最上层
+        # SWP_NOACTIVATE 确保窗口不会抢夺焦点
+        ok = self.native.set_window_pos(
+            self.hwnd, 
+            self.insert_after(),    # 置顶
+            rect[0], rect[1],       # 位置
+            rect[2] - rect[0],      # 宽度
+            rect[3] - rect[1],      # 高度
+            SWP_NOACTIVATE          # 不激活窗口
+        )
+        
+        if tracer.enabled:
+            if not ok:
+                tracer.event('appbar.set_window_pos_failed', WARNING, rect=list(rect))
+            # 实际窗口矩形只在调试级别读取，避免额外的Win32调用
+            if tracer.is_enabled():
+                tracer.event('appbar.window_rect',
+                             actual=self.native.get_window_rect(self.hwnd))
+        return ok
+
+    def insert_after(self):
+        """SetWindowPos 使用的Z序位置"""
+        return HWND_TOPMOST if self.topmost else HWND_NOTOPMOST
+
+    def unregister(self):
+        with tracer.span('appbar.unregister', hwnd=int(self.hwnd)) as span:
+            result = self.native.shappbarmessage(ABM_REMOVE, self._appbardata())
+            self.registered = False
+            self.reserved_rect = None
+            span.set(result=result)
+
+def save_config(config):
+    """保存到统一配置文件中的 CONFIG_PROFILE 配置档"""
+    from config_store import ConfigStore, DEFAULT_STORE_PATH
+    ConfigStore.shared(DEFAULT_STORE_PATH).save_profile(CONFIG_PROFILE, config)
+
+def load_config():
+    """读取统一配置文件中的 CONFIG_PROFILE 配置档，不存在时导入旧版 CONFIG_PATH"""
+    from config_store import ConfigStore, DEFAULT_STORE_PATH
+    return ConfigStore.shared(DEFAULT_STORE_PATH).load_profile(
+        CONFIG_PROFILE, legacy_path=CONFIG_PATH)
@@ -0,0 +1,293 @@
+"""
+AppBar 布局计算模块
+纯函数实现，不依赖 Win32 API，可以在任意平台上运行、测试和基准测试
+
+坐标约定:
+    矩形统一使用 (left, top, right, bottom) 四元组，单位为物理像素
+    width 表示侧边栏垂直于所在边缘方向的厚度
+    height 表示侧边栏沿边缘方向的长度，None (批量接口中为 FULL_LENGTH) 表示铺满
+    top_offset 表示沿边缘方向的起始偏移（左/右边缘为距顶部，上/下边缘为距左侧）
+
+使用示例:
+    from appbar_layout import compute_rect, compute_rects, pack_rects, ABE_LEFT
+
+    # 单个侧边栏
+    rect = compute_rect((0, 0, 1920, 1080), edge=ABE_LEFT, width=300)
+
+    # 多个显示器上的多个侧边栏，一次性计算
+    monitors = pack_rects([(0, 0, 1920, 1080), (1920, 0, 4480, 1440)])
+    rects = compute_rects(monitors, edges=[0, 2], widths=[300, 420],
+                          monitor_index=[0, 1])
+"""
+
+from array import array
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+ABE_LEFT = 0
+ABE_TOP = 1
+ABE_RIGHT = 2
+ABE_BOTTOM = 3
+
+# 配置文件中的边缘名称
+EDGE_NAMES = {
+    'left': ABE_LEFT,
+    'top': ABE_TOP,
+    'right': ABE_RIGHT,
+    'bottom': ABE_BOTTOM,
+}
+
+# 批量接口中表示"铺满整条边"的高度值
+FULL_LENGTH = -1
+
+Rect = Tuple[int, int, int, int]
+
+
+def edge_from_name(name: str) -> int:
+    """将配置中的边缘名称 ('left'/'top'/'right'/'bottom') 转换为 ABE_* 常量"""
+    try:
+        return EDGE_NAMES[name]
+    except KeyError:
+        raise ValueError(f"不支持的边缘: {name}") from None
+
+
+def pack_rects(rects: Iterable[Sequence[int]]) -> array:
+    """
+    将矩形序列打包为扁平的整数数组
+
+    Args:
+        rects: (left, top, right, bottom) 矩形序列
+
+    Returns:
+        array: 长度为 4*N 的扁平数组
+    """
+    packed = array('l')
+    for rect in rects:
+        packed.extend(rect[:4])
+    return packed
+
+
+def unpack_rects(packed: Sequence[int]) -> List[Rect]:
+    """
+    将扁平数组还原为矩形列表
+
+    Args:
+        packed: 长度为 4*N 的扁平数组
+
+    Returns:
+        list: (left, top, right, bottom) 元组列表
+    """
+    return [tuple(packed[i:i + 4]) for i in range(0, len(packed), 4)]
+
+
+def compute_rects(area_rects: Sequence[int],
+                  edges: Sequence[int],
+                  widths: Sequence[int],
+                  heights: Optional[Sequence[int]] = None,
+                  top_offsets: Optional[Sequence[int]] = None,
+                  monitor_index: Optional[Sequence[int]] = None) -> array:
+    """
+    批量计算侧边栏目标矩形
+
+    所有输入按列存放（每个参数一列，每个侧边栏一行），一次遍历完成全部计算，
+    不产生中间对象，适合在显示器变化时为大量侧边栏重新布局。
+
+    Args:
+        area_rects: 参考区域的扁平矩形数组（4*M，通常为显示器区域或工作区域）
+        edges: 每个侧边栏的边缘 (ABE_*)
+        widths: 每个侧边栏的厚度
+        heights: 每个侧边栏沿边缘的长度，FULL_LENGTH 表示铺满，默认全部铺满
+        top_offsets: 每个侧边栏沿边缘方向的起始偏移，默认全部为 0
+        monitor_index: 每个侧边栏所在的参考区域下标，默认第 i 个侧边栏使用第 i 个区域
+
+    Returns:
+        array: 长度为 4*N 的扁平数组，依次为每个侧边栏的 (left, top, right, bottom)
+    """
+    count = len(edges)
+    if len(widths) != count:
+        raise ValueError("edges 与 widths 长度不一致")
+    if heights is not None and len(heights) != count:
+        raise ValueError("edges 与 heights 长度不一致")
+    if top_offsets is not None and len(top_offsets) != count:
+        raise ValueError("edges 与 top_offsets 长度不一致")
+    if monitor_index is not None and len(monitor_index) != count:
+        raise ValueError("edges 与 monitor_index 长度不一致")
+
+    out = array('l', (0,)) * (4 * count)
+    for i in range(count):
+        base = (monitor_index[i] if monitor_index is not None else i) * 4
+        l = area_rects[base]
+        t = area_rects[base + 1]
+        r = area_rects[base + 2]
+        b = area_rects[base + 3]
+        edge = edges[i]
+        width = widths[i]
+        height = heights[i] if heights is not None else FULL_LENGTH
+        offset = top_offsets[i] if top_offsets is not None else 0
+
+        if edge == ABE_LEFT or edge == ABE_RIGHT:
+            t += offset
+            if height >= 0:
+                b = t + height
+            if edge == ABE_LEFT:
+                r = l + width
+            else:
+                l = r - width
+        elif edge == ABE_TOP or edge == ABE_BOTTOM:
+            l += offset
+            if height >= 0:
+                r = l + height
+            if edge == ABE_TOP:
+                b = t + width
+            else:
+                t = b - width
+        else:
+            raise ValueError(f"不支持的边缘: {edge}")
+
+        j = i * 4
+        out[j] = l
+        out[j + 1] = t
+        out[j + 2] = r
+        out[j + 3] = b
+    return out
+
+
+def stack_rects(area_rects: Sequence[int],
+                edges: Sequence[int],
+                widths: Sequence[int],
+                heights: Optional[Sequence[int]] = None,
+                top_offsets: Optional[Sequence[int]] = None,
+                monitor_index: Optional[Sequence[int]] = None) -> array:
+    """
+    计算多个侧边栏共同的布局
+
+    同一显示器同一边缘上的侧边栏按输入顺序由外向内依次排列，
+    与 Shell 对多个 AppBar 执行 ABM_QUERYPOS 的结果一致，因此统一计算后
+    每个侧边栏的 ABM_SETPOS 不会再推挤其他侧边栏。参数含义同 compute_rects()
+
+    Returns:
+        array: 长度为 4*N 的扁平数组
+    """
+    count = len(edges)
+    if len(widths) != count:
+        raise ValueError("edges 与 widths 长度不一致")
+
+    # 每个 (区域, 边缘) 已被占用的厚度
+    used = {}
+    areas = array('l', (0,)) * (4 * count)
+    for i in range(count):
+        index = monitor_index[i] if monitor_index is not None else i
+        base = index * 4
+        edge = edges[i]
+        inset = used.get((index, edge), 0)
+        used[(index, edge)] = inset + widths[i]
+
+        l = area_rects[base]
+        t = area_rects[base + 1]
+        r = area_rects[base + 2]
+        b = area_rects[base + 3]
+        if edge == ABE_LEFT:
+            l += inset
+        elif edge == ABE_RIGHT:
+            r -= inset
+        elif edge == ABE_TOP:
+            t += inset
+        elif edge == ABE_BOTTOM:
+            b -= inset
+
+        j = i * 4
+        areas[j] = l
+        areas[j + 1] = t
+        areas[j + 2] = r
+        areas[j + 3] = b
+    return compute_rects(areas, edges, widths, heights, top_offsets)
+
+
+def compute_rect(monitor_area: Sequence[int],
+                 work_area: Optional[Sequence[int]] = None,
+                 edge: int = ABE_LEFT,
+                 width: int = 300,
+                 height: Optional[int] = None,
+                 top_offset: int = 0,
+                 use_work_area: bool = False) -> Rect:
+    """
+    计算单个侧边栏的目标矩形
+
+    Args:
+        monitor_area: 完整屏幕区域
+        work_area: 工作区域 (排除任务栏)
+        edge: 边缘 (ABE_*)
+        width: 厚度
+        height: 沿边缘的长度，None 表示铺满
+        top_offset: 沿边缘方向的起始偏移
+        use_work_area: 是否以工作区域为参考（默认使用完整屏幕区域以铺满屏幕高度）
+
+    Returns:
+        tuple: (left, top, right, bottom)
+    """
+    area = work_area if use_work_area and work_area is not None else monitor_area
+    out = compute_rects(
+        area,
+        (edge,),
+        (width,),
+        (FULL_LENGTH if height is None else height,),
+        (top_offset,),
+        (0,),
+    )
+    return tuple(out)
+
+
+def rect_size(rect: Sequence[int]) -> Tuple[int, int]:
+    """返回矩形的 (宽度, 高度)"""
+    return rect[2] - rect[0], rect[3] - rect[1]
+
+
+def collapse_rect(rect: Sequence[int], edge: int, thickness: int) -> Rect:
+    """
+    将侧边栏矩形收起为贴着所在边缘的细条（自动隐藏模式）
+
+    Args:
+        rect: 展开时的矩形
+        edge: 边缘 (ABE_*)
+        thickness: 细条厚度
+
+    Returns:
+        tuple: (left, top, right, bottom)
+    """
+    l, t, r, b = rect
+    if edge == ABE_LEFT:
+        return l, t, min(r, l + thickness), b
+    if edge == ABE_RIGHT:
+        return max(l, r - thickness), t, r, b
+    if edge == ABE_TOP:
+        return l, t, r, min(b, t + thickness)
+    if edge == ABE_BOTTOM:
+        return l, max(t, b - thickness), r, b
+    raise ValueError(f"不支持的边缘: {edge}")
+
+
+def subtract_rect(pieces: Sequence[Sequence[int]], hole: Sequence[int]) -> List[Rect]:
+    """
+    从一组互不重叠的矩形中减去一个矩形（遮挡检测）
+
+    每个与 hole 相交的矩形最多拆成上、下、左、右四块，不相交的保持不变
+
+    Returns:
+        list: 剩余的矩形，为空表示已被完全覆盖
+    """
+    hl, ht, hr, hb = hole
+    out: List[Rect] = []
+    for piece in pieces:
+        l, t, r, b = piece
+        if hl >= r or hr <= l or ht >= b or hb <= t:
+            out.append(tuple(piece))
+            continue
+        if ht > t:
+            out.append((l, t, r, ht))
+        if hb < b:
+            out.append((l, hb, r, b))
+        top, bottom = max(t, ht), min(b, hb)
+        if hl > l:
+            out.append((l, top, hl, bottom))
+        if hr < r:
+            out.append((hr, top, r, bottom))
+    return out
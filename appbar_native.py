@@ -0,0 +1,366 @@
+"""
+Win32 原生调用层
+函数指针在第一次使用时解析一次并设置 argtypes/restype，
+调用方复用预先分配的 APPBARDATA，重新定位路径上不再产生临时对象；
+只在单次调用内使用的 RECT 每次单独分配，可以在多个线程中同时调用
+
+每个 API 的调用次数、失败次数和耗时都会被记录，可通过 get_stats() 读取
+
+使用示例:
+    from appbar_native import default_native
+
+    native = default_native()
+    abd = native.new_appbardata(hwnd)
+    native.shappbarmessage(ABM_QUERYPOS, native.pointer(abd))
+    print(native.get_stats())
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from appbar_layout import subtract_rect
+
+# WTSRegisterSessionNotification 只接收当前会话的通知
+NOTIFY_FOR_THIS_SESSION = 0
+
+# 返回值本身就是结果、0 不表示失败的 ABM_* 消息：
+# ABM_GETSTATE、ABM_GETAUTOHIDEBAR、ABM_GETAUTOHIDEBAREX；其余消息返回 0 即失败
+_ABM_VALUE_RESULTS = frozenset((0x04, 0x07, 0x0B))
+
+# 遮挡检测：沿 Z 序向上遍历时使用的常量
+GW_HWNDPREV = 3
+GWL_EXSTYLE = -20
+WS_EX_TRANSPARENT = 0x00000020
+DWMWA_CLOAKED = 14
+# 最多检查的上层窗口数，超过时按未被覆盖处理
+OCCLUSION_WINDOW_LIMIT = 256
+
+_appbardata_type = None
+
+
+def appbardata_type():
+    """第一次使用时才导入 ctypes 并定义 APPBARDATA 结构体"""
+    global _appbardata_type
+    if _appbardata_type is None:
+        import ctypes
+        from ctypes import wintypes
+
+        class APPBARDATA(ctypes.Structure):
+            _fields_ = [
+                ("cbSize", wintypes.DWORD),
+                ("hWnd", wintypes.HWND),
+                ("uCallbackMessage", wintypes.UINT),
+                ("uEdge", wintypes.UINT),
+                ("rc", ctypes.c_int32 * 4),
+                ("lParam", wintypes.LPARAM),
+            ]
+
+        APPBARDATA.__qualname__ = 'APPBARDATA'
+        _appbardata_type = APPBARDATA
+    return _appbardata_type
+
+
+class NativeCallStats:
+    """单个原生函数的调用统计"""
+
+    __slots__ = ('calls', 'failures', 'total_ns', 'max_ns')
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, elapsed_ns: int, ok: bool = True):
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        if not ok:
+            self.failures += 1
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'total_ms': self.total_ns / 1e6,
+            'avg_us': self.total_ns / self.calls / 1e3 if self.calls else 0.0,
+            'max_us': self.max_ns / 1e3,
+        }
+
+
+class NativeApi:
+    """
+    原生函数集合
+
+    AppBar、SidebarManager 等通过该对象调用 Win32；
+    在非 Windows 环境下可以替换为实现相同方法的模拟对象
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._shell32 = None
+        self._user32 = None
+        self._wtsapi32 = None
+        self._dwmapi = None
+        self._stats: Dict[str, NativeCallStats] = {}
+
+    def new_appbardata(self, hwnd: int, callback_message: int = 0, edge: int = 0):
+        """分配并初始化一个 APPBARDATA，调用方应长期持有并复用"""
+        import ctypes
+
+        abd = appbardata_type()()
+        abd.cbSize = ctypes.sizeof(abd)
+        abd.hWnd = int(hwnd)
+        abd.uCallbackMessage = callback_message
+        abd.uEdge = edge
+        abd.lParam = 0
+        return abd
+
+    @staticmethod
+    def pointer(abd):
+        """返回可以长期复用的结构体指针"""
+        import ctypes
+        return ctypes.pointer(abd)
+
+    def shappbarmessage(self, msg: int, abd_ptr) -> int:
+        """调用 SHAppBarMessage，abd_ptr 为 pointer() 返回的指针"""
+        func = self._shell32_api().SHAppBarMessage
+        start = time.perf_counter_ns()
+        result = func(msg, abd_ptr)
+        self._record('SHAppBarMessage', time.perf_counter_ns() - start,
+                     bool(result) or msg in _ABM_VALUE_RESULTS)
+        return result
+
+    def set_window_pos(self, hwnd: int, insert_after: int,
+                       x: int, y: int, cx: int, cy: int, flags: int) -> bool:
+        """调用 SetWindowPos"""
+        func = self._user32_api().SetWindowPos
+        start = time.perf_counter_ns()
+        ok = bool(func(hwnd, insert_after, x, y, cx, cy, flags))
+        self._record('SetWindowPos', time.perf_counter_ns() - start, ok)
+        return ok
+
+    def get_window_rect(self, hwnd: int) -> Tuple[int, int, int, int]:
+        """调用 GetWindowRect，返回 (left, top, right, bottom)"""
+        from ctypes import wintypes
+
+        user32 = self._user32_api()
+        # 每次调用单独分配：GUI线程和原生调用线程可能同时调用
+        rect = wintypes.RECT()
+        start = time.perf_counter_ns()
+        ok = bool(user32.GetWindowRect(hwnd, rect))
+        self._record('GetWindowRect', time.perf_counter_ns() - start, ok)
+        return rect.left, rect.top, rect.right, rect.bottom
+
+    def window_occluded(self, hwnd: int, limit: int = OCCLUSION_WINDOW_LIMIT) -> bool:
+        """
+        窗口是否被 Z 序在它之上的窗口完全覆盖
+
+        沿 GetWindow(GW_HWNDPREV) 向上遍历，从窗口矩形中依次减去可见、未最小化、
+        未被 DWM 隐藏（其他虚拟桌面、挂起的应用）且不是鼠标穿透的窗口的矩形，
+        剩余为空即完全被覆盖；检查超过 limit 个窗口仍有剩余时按未被覆盖处理
+        """
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = self._user32_api()
+        rect = wintypes.RECT()
+        start = time.perf_counter_ns()
+        ok = bool(user32.GetWindowRect(hwnd, rect))
+        remaining = [(rect.left, rect.top, rect.right, rect.bottom)]
+        occluded = False
+        if ok and rect.right > rect.left and rect.bottom > rect.top:
+            cloaked = wintypes.DWORD()
+            above = user32.GetWindow(hwnd, GW_HWNDPREV)
+            checked = 0
+            while above and checked < limit:
+                checked += 1
+                if (user32.IsWindowVisible(above) and not user32.IsIconic(above)
+                        and not user32.GetWindowLongPtrW(above, GWL_EXSTYLE) & WS_EX_TRANSPARENT
+                        and not (self._dwmapi_api().DwmGetWindowAttribute(
+                            above, DWMWA_CLOAKED, ctypes.byref(cloaked),
+                            ctypes.sizeof(cloaked)) == 0 and cloaked.value)
+                        and user32.GetWindowRect(above, rect)):
+                    remaining = subtract_rect(
+                        remaining, (rect.left, rect.top, rect.right, rect.bottom))
+                    if not remaining:
+                        occluded = True
+                        break
+                above = user32.GetWindow(above, GW_HWNDPREV)
+        self._record('WindowOccluded', time.perf_counter_ns() - start, ok)
+        return occluded
+
+    def get_window_long(self, hwnd: int, index: int) -> int:
+        """调用 GetWindowLongPtr（32 位系统上为 GetWindowLong）"""
+        func = self._user32_api().GetWindowLongPtrW
+        start = time.perf_counter_ns()
+        value = func(hwnd, index)
+        self._record('GetWindowLongPtr', time.perf_counter_ns() - start)
+        return value
+
+    def set_window_long(self, hwnd: int, index: int, value: int) -> int:
+        """调用 SetWindowLongPtr，返回原来的值"""
+        import ctypes
+
+        func = self._user32_api().SetWindowLongPtrW
+        start = time.perf_counter_ns()
+        # 原来的值可能就是 0，需要借助 GetLastError 判断是否失败
+        ctypes.set_last_error(0)
+        previous = func(hwnd, index, value)
+        ok = previous != 0 or ctypes.get_last_error() == 0
+        self._record('SetWindowLongPtr', time.perf_counter_ns() - start, ok)
+        return previous
+
+    def begin_defer_window_pos(self, count: int) -> int:
+        """调用 BeginDeferWindowPos，返回 HDWP"""
+        func = self._user32_api().BeginDeferWindowPos
+        start = time.perf_counter_ns()
+        hdwp = func(count)
+        self._record('BeginDeferWindowPos', time.perf_counter_ns() - start, bool(hdwp))
+        return hdwp
+
+    def defer_window_pos(self, hdwp: int, hwnd: int, insert_after: int,
+                         x: int, y: int, cx: int, cy: int, flags: int) -> int:
+        """调用 DeferWindowPos，失败时返回 0 且传入的 HDWP 已被系统释放"""
+        func = self._user32_api().DeferWindowPos
+        start = time.perf_counter_ns()
+        hdwp = func(hdwp, hwnd, insert_after, x, y, cx, cy, flags)
+        self._record('DeferWindowPos', time.perf_counter_ns() - start, bool(hdwp))
+        return hdwp
+
+    def end_defer_window_pos(self, hdwp: int) -> bool:
+        """调用 EndDeferWindowPos"""
+        func = self._user32_api().EndDeferWindowPos
+        start = time.perf_counter_ns()
+        ok = bool(func(hdwp))
+        self._record('EndDeferWindowPos', time.perf_counter_ns() - start, ok)
+        return ok
+
+    def register_session_notification(self, hwnd: int) -> bool:
+        """调用 WTSRegisterSessionNotification，窗口开始接收会话锁定/解锁的 WM_WTSSESSION_CHANGE"""
+        func = self._wtsapi32_api().WTSRegisterSessionNotification
+        start = time.perf_counter_ns()
+        ok = bool(func(hwnd, NOTIFY_FOR_THIS_SESSION))
+        self._record('WTSRegisterSessionNotification', time.perf_counter_ns() - start, ok)
+        return ok
+
+    def unregister_session_notification(self, hwnd: int) -> bool:
+        """调用 WTSUnRegisterSessionNotification"""
+        func = self._wtsapi32_api().WTSUnRegisterSessionNotification
+        start = time.perf_counter_ns()
+        ok = bool(func(hwnd))
+        self._record('WTSUnRegisterSessionNotification', time.perf_counter_ns() - start, ok)
+        return ok
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """返回每个原生函数的调用次数和耗时"""
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    def reset_stats(self):
+        """清空统计"""
+        with self._lock:
+            self._stats.clear()
+
+    def _record(self, name: str, elapsed_ns: int, ok: bool = True):
+        stats = self._stats.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(name, NativeCallStats())
+        stats.record(elapsed_ns, ok)
+
+    def _shell32_api(self):
+        if self._shell32 is None:
+            import ctypes
+            from ctypes import wintypes
+
+            shell32 = ctypes.WinDLL('shell32')
+            shell32.SHAppBarMessage.argtypes = [
+                wintypes.DWORD, ctypes.POINTER(appbardata_type())]
+            shell32.SHAppBarMessage.restype = ctypes.c_size_t
+            self._shell32 = shell32
+        return self._shell32
+
+    def _user32_api(self):
+        if self._user32 is None:
+            import ctypes
+            from ctypes import wintypes
+
+            user32 = ctypes.WinDLL('user32', use_last_error=True)
+            user32.SetWindowPos.argtypes = [
+                wintypes.HWND, wintypes.HWND,
+                ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, wintypes.UINT]
+            user32.SetWindowPos.restype = wintypes.BOOL
+            user32.GetWindowRect.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.RECT)]
+            user32.GetWindowRect.restype = wintypes.BOOL
+            # 32 位的 user32 只导出 GetWindowLongW/SetWindowLongW
+            for name in ('GetWindowLongPtrW', 'SetWindowLongPtrW'):
+                if not hasattr(user32, name):
+                    setattr(user32, name, getattr(user32, name.replace('Ptr', '')))
+            user32.GetWindowLongPtrW.argtypes = [wintypes.HWND, ctypes.c_int]
+            user32.GetWindowLongPtrW.restype = ctypes.c_ssize_t
+            user32.SetWindowLongPtrW.argtypes = [wintypes.HWND, ctypes.c_int, ctypes.c_ssize_t]
+            user32.SetWindowLongPtrW.restype = ctypes.c_ssize_t
+            user32.BeginDeferWindowPos.argtypes = [ctypes.c_int]
+            user32.BeginDeferWindowPos.restype = wintypes.HANDLE
+            user32.DeferWindowPos.argtypes = [
+                wintypes.HANDLE, wintypes.HWND, wintypes.HWND,
+                ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, wintypes.UINT]
+            user32.DeferWindowPos.restype = wintypes.HANDLE
+            user32.EndDeferWindowPos.argtypes = [wintypes.HANDLE]
+            user32.EndDeferWindowPos.restype = wintypes.BOOL
+            user32.GetWindow.argtypes = [wintypes.HWND, wintypes.UINT]
+            user32.GetWindow.restype = wintypes.HWND
+            user32.IsWindowVisible.argtypes = [wintypes.HWND]
+            user32.IsWindowVisible.restype = wintypes.BOOL
+            user32.IsIconic.argtypes = [wintypes.HWND]
+            user32.IsIconic.restype = wintypes.BOOL
+            self._user32 = user32
+        return self._user32
+
+    def _wtsapi32_api(self):
+        if self._wtsapi32 is None:
+            import ctypes
+            from ctypes import wintypes
+
+            wtsapi32 = ctypes.WinDLL('wtsapi32')
+            wtsapi32.WTSRegisterSessionNotification.argtypes = [wintypes.HWND, wintypes.DWORD]
+            wtsapi32.WTSRegisterSessionNotification.restype = wintypes.BOOL
+            wtsapi32.WTSUnRegisterSessionNotification.argtypes = [wintypes.HWND]
+            wtsapi32.WTSUnRegisterSessionNotification.restype = wintypes.BOOL
+            self._wtsapi32 = wtsapi32
+        return self._wtsapi32
+
+    def _dwmapi_api(self):
+        if self._dwmapi is None:
+            import ctypes
+            from ctypes import wintypes
+
+            dwmapi = ctypes.WinDLL('dwmapi')
+            dwmapi.DwmGetWindowAttribute.argtypes = [
+                wintypes.HWND, wintypes.DWORD, ctypes.c_void_p, wintypes.DWORD]
+            dwmapi.DwmGetWindowAttribute.restype = ctypes.c_long
+            self._dwmapi = dwmapi
+        return self._dwmapi
+
+
+_default_native: Optional[NativeApi] = None
+
+
+def default_native() -> NativeApi:
+    """获取进程内共享的原生调用层"""
+    global _default_native
+    if _default_native is None:
+        _default_native = NativeApi()
+    return _default_native
+
+
+def set_default_native(native: Optional[NativeApi]):
+    """
+    替换进程内共享的原生调用层，例如换成 shell_simulator.SimulatedShell；
+    传入 None 时恢复为下次使用时重新创建的 Win32 实现
+    """
+    global _default_native
+    _default_native = native
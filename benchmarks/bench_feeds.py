@@ -0,0 +1,102 @@
+"""
+数据源调度基准测试
+不依赖 Qt，可在 Linux CI 上运行
+
+多个数据源以亚秒级间隔在线程池中轮询并计算行差异，主线程模拟GUI事件循环，
+每帧取走一次合并后的差异并应用到 RowStore，统计每帧处理耗时、投递次数、
+被合并的差异数，以及调度器占用的 CPU 时间
+
+用法:
+    python benchmarks/bench_feeds.py [--feeds 48] [--rows 200] [--interval 0.25] [--seconds 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from appbar_events import FRAME_INTERVAL  # noqa: E402
+from feed_scheduler import Feed, FeedScheduler, diff_rows, merge_rows  # noqa: E402
+from row_store import RowStore  # noqa: E402
+
+
+def make_source(index, rows, churn, seed):
+    """返回一个模拟的数据源：每次轮询随机改变一部分行的状态和数值"""
+    rng = random.Random(seed + index)
+    snapshot = {f'{index}-{i}': (f'service-{index}-{i}', 0, 0.0) for i in range(rows)}
+
+    def poll():
+        for key in rng.sample(sorted(snapshot), max(1, int(rows * churn))):
+            text, _, _ = snapshot[key]
+            snapshot[key] = (text, rng.randrange(4), round(rng.random() * 100.0, 1))
+        return dict(snapshot)
+
+    return poll
+
+
+def apply(store, delta):
+    store.remove_many(delta.removed)
+    for key, (text, status, value) in delta.upserts.items():
+        if store.update(key, text, status, value) is None and key not in store:
+            store.append(key, text, status, value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据源调度基准测试")
+    parser.add_argument('--feeds', type=int, default=48, help="数据源数量")
+    parser.add_argument('--rows', type=int, default=200, help="每个数据源的行数")
+    parser.add_argument('--churn', type=float, default=0.05, help="每次轮询变化的行比例")
+    parser.add_argument('--interval', type=float, default=0.25, help="轮询间隔（秒）")
+    parser.add_argument('--seconds', type=float, default=5.0, help="运行时间（秒）")
+    parser.add_argument('--workers', type=int, default=4, help="轮询线程数")
+    parser.add_argument('--seed', type=int, default=1, help="随机种子")
+    args = parser.parse_args()
+
+    wake = threading.Event()
+    scheduler = FeedScheduler(notify=wake.set, workers=args.workers)
+    for i in range(args.feeds):
+        scheduler.add(Feed(f'feed-{i}', make_source(i, args.rows, args.churn, args.seed),
+                           interval=args.interval, diff=diff_rows, merge=merge_rows),
+                      delay=args.interval * i / args.feeds)
+    store = RowStore()
+
+    cpu_start = time.process_time()
+    scheduler.start()
+    frame_times = []
+    applied = 0
+    deadline = time.monotonic() + args.seconds
+    # 模拟GUI线程：被唤醒后对齐到下一帧，取走一次全部差异
+    while time.monotonic() < deadline:
+        if not wake.wait(0.1):
+            continue
+        wake.clear()
+        time.sleep(FRAME_INTERVAL)
+        start = time.perf_counter()
+        updates = scheduler.take_updates()
+        for delta in updates.values():
+            apply(store, delta)
+            applied += len(delta)
+        frame_times.append((time.perf_counter() - start) * 1e3)
+    scheduler.stop()
+    cpu = time.process_time() - cpu_start
+
+    stats = scheduler.get_stats()
+    polls = sum(source['polls'] for source in stats['sources'].values())
+    frame_times.sort()
+    print(f"数据源: {args.feeds}, 每个 {args.rows} 行, 间隔 {args.interval * 1e3:.0f} ms, "
+          f"运行 {args.seconds:.1f} s")
+    print(f"轮询: {polls} 次 ({polls / args.seconds:.0f} 次/秒), 投递: {stats['deliveries']} 帧, "
+          f"合并: {stats['merged']} 次, 应用: {applied} 行")
+    if frame_times:
+        print(f"每帧处理: 平均 {sum(frame_times) / len(frame_times):.3f} ms, "
+              f"p95 {frame_times[int(len(frame_times) * 0.95)]:.3f} ms, "
+              f"最大 {frame_times[-1]:.3f} ms")
+    print(f"CPU: {cpu * 1e3:.0f} ms ({cpu / args.seconds * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
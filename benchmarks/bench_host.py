@@ -0,0 +1,142 @@
+"""
+共享宿主通信基准测试
+不依赖 Qt，可在 Linux CI 上运行
+
+在本进程中启动 HostServer，用一个线程代替宿主的GUI线程（被唤醒后对齐到下一帧，
+取走全部更新并应用到 RowStore，再回复 PING）；多个客户端进程通过本地套接字
+（Windows 上为命名管道）连接，各自附加面板并连续推送行更新，统计:
+    吞吐量: 每秒消息数、行数和字节数
+    延迟:   PING 从发送到宿主应用完此前全部更新后返回的往返时间（包含对齐到帧的等待）
+
+用法:
+    python benchmarks/bench_host.py [--clients 4] [--updates 2000] [--batch 20] [--sync-every 50]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from appbar_events import FRAME_INTERVAL  # noqa: E402
+from row_store import RowStore  # noqa: E402
+from sidebar_host import HostClient, HostServer  # noqa: E402
+
+
+def run_client(index, address, args, results):
+    """客户端进程：附加面板，推送 updates 次行更新，每 sync_every 次测量一次往返时间"""
+    rng = random.Random(args.seed + index)
+    client = HostClient.connect(address, name=f'bench-{index}')
+    panels = [f'client{index}.panel{p}' for p in range(args.panels)]
+    for panel in panels:
+        client.attach(panel, title=panel)
+        client.update_rows(panel, [(f'row-{i}', f'service {i}', 0, 0.0) for i in range(args.rows)])
+    client.sync()
+
+    latencies = []
+    start = time.perf_counter()
+    for n in range(1, args.updates + 1):
+        rows = [(f'row-{rng.randrange(args.rows)}', f'service {n}', rng.randrange(4),
+                 round(rng.random() * 100.0, 1)) for _ in range(args.batch)]
+        client.update_rows(panels[n % len(panels)], rows)
+        if n % args.sync_every == 0:
+            latencies.append(client.sync())
+    latencies.append(client.sync())
+    elapsed = time.perf_counter() - start
+    client.close()
+    results.put((elapsed, latencies, client.errors))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="共享宿主通信基准测试")
+    parser.add_argument('--clients', type=int, default=4, help="客户端进程数")
+    parser.add_argument('--panels', type=int, default=2, help="每个客户端的面板数")
+    parser.add_argument('--rows', type=int, default=500, help="每个面板的行数")
+    parser.add_argument('--updates', type=int, default=2000, help="每个客户端发送的行更新消息数")
+    parser.add_argument('--batch', type=int, default=20, help="每条消息中的行数")
+    parser.add_argument('--sync-every', type=int, default=50, help="每隔多少条消息测量一次往返时间")
+    parser.add_argument('--seed', type=int, default=1, help="随机种子")
+    args = parser.parse_args()
+
+    if sys.platform == 'win32':
+        address = rf'\\.\pipe\DesktopSidebarHostBench-{os.getpid()}'
+    else:
+        address = os.path.join(tempfile.mkdtemp(prefix='bench-host-'), 'host.sock')
+
+    wake = threading.Event()
+    server = HostServer(notify=wake.set, address=address)
+    server.start()
+    stores = {}
+    frame_times = []
+    running = True
+
+    def gui():
+        # 代替宿主的GUI线程
+        while running:
+            if not wake.wait(0.1):
+                continue
+            wake.clear()
+            time.sleep(FRAME_INTERVAL)
+            start = time.perf_counter()
+            updates = server.take_updates()
+            for op in updates.ops:
+                if op[0] == 'attach':
+                    stores[op[1]] = RowStore()
+                elif op[0] == 'detach':
+                    stores.pop(op[1], None)
+            for name, delta in updates.rows.items():
+                store = stores.get(name)
+                if store is None:
+                    continue
+                store.remove_many(delta.removed)
+                for key, (text, status, value) in delta.upserts.items():
+                    if store.update(key, text, status, value) is None and key not in store:
+                        store.append(key, text, status, value)
+            frame_times.append((time.perf_counter() - start) * 1e3)
+            server.acknowledge(updates.pongs)
+
+    gui_thread = threading.Thread(target=gui, daemon=True)
+    gui_thread.start()
+
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=run_client, args=(i, address, args, results))
+                 for i in range(args.clients)]
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    wall = time.perf_counter() - wall_start
+    for process in processes:
+        process.join()
+    cpu = time.process_time() - cpu_start
+    stats = server.get_stats()
+    running = False
+    server.stop()
+
+    latencies = sorted(value * 1e3 for _, samples, _ in outcomes for value in samples)
+    errors = sum(len(errs) for _, _, errs in outcomes)
+    messages = args.clients * args.updates
+    slowest = max(elapsed for elapsed, _, _ in outcomes)
+    print(f"客户端: {args.clients} 个进程, 每个 {args.panels} 个面板 x {args.rows} 行, "
+          f"每条消息 {args.batch} 行")
+    print(f"吞吐量: {messages / slowest:.0f} 条/秒, {messages * args.batch / slowest:.0f} 行/秒, "
+          f"{stats['bytes'] / wall / 1024:.0f} KB/秒 (共 {stats['messages']} 条, "
+          f"平均 {stats['bytes'] / max(stats['messages'], 1):.0f} 字节/条)")
+    print(f"合并: {stats['merged']} 次, 应用: {len(frame_times)} 帧"
+          + (f", 每帧 平均 {sum(frame_times) / len(frame_times):.3f} ms, "
+             f"最大 {max(frame_times):.3f} ms" if frame_times else ""))
+    if latencies:
+        print(f"往返延迟: p50 {latencies[len(latencies) // 2]:.2f} ms, "
+              f"p95 {latencies[int(len(latencies) * 0.95)]:.2f} ms, 最大 {latencies[-1]:.2f} ms")
+    print(f"宿主 CPU: {cpu * 1e3:.0f} ms, 错误: {errors} 次")
+    return 0 if errors == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
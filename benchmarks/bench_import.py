@@ -0,0 +1,188 @@
+"""
+冷启动导入耗时基准测试
+
+每个模块在全新的解释器中用 -X importtime 导入若干次，取最小的累计耗时与
+import_budget.json 中的预算比较，超出预算或导入了不应在导入阶段加载的
+原生/界面模块时以非零状态退出，可直接用于 CI；
+预算文件中没有记录的模块只检查是否提前加载，依赖缺失的模块会被跳过
+
+绝对耗时随机器和负载变化，同一次运行中先以相同方式测量基线模块 json，
+预算按基线耗时与记录预算时的基线耗时之比缩放；允许的超出量取比例和
+绝对下限中较大的一个，几毫秒的模块不会因为抖动失败
+
+PySide6.QtCore 自身会加载 logging 等模块，导入了 QtCore 的模块只在加载了
+QtCore 之外的延迟模块时才算提前加载；QtCore 本身的导入耗时也不计入模块
+
+用法:
+    python benchmarks/bench_import.py             # 检查预算
+    python benchmarks/bench_import.py --update    # 以本机测量结果更新预算
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'import_budget.json')
+
+MODULES = [
+    'appbar_layout',
+    'appbar_events',
+    'appbar_helper',
+    'appbar_native',
+    'config_writer',
+    'config_store',
+    'monitor_topology',
+    'sidebar_trace',
+    'sidebar_config',
+    'sidebar_metrics',
+    'sidebar_animation',
+    'sidebar_resize',
+    'sidebar_list',
+    'sidebar_feeds',
+    'shell_simulator',
+    'window_style',
+    'dpi_scale',
+    'row_store',
+    'feed_scheduler',
+    'sidebar_visibility',
+    'sidebar_theme',
+    'sidebar_host',
+    'sidebar_host_app',
+    'sidebar_manager',
+    'sidebar_widget',
+]
+
+# 这些模块只应在第一次嵌入或创建窗口时加载
+DEFERRED = ['ctypes', 'win32api', 'win32con', 'win32gui', 'logging',
+            'qfluentwidgets', 'qframelesswindow', 'PySide6.QtWidgets']
+
+# Qt 基线：所有依赖 Qt 的模块都会导入 QtCore
+QT_BASELINE = 'PySide6.QtCore'
+
+# 耗时基线：纯 Python 的标准库模块，用于按本次运行的机器速度缩放预算
+BASELINE = 'json'
+BASELINE_KEY = '_baseline'
+
+# 允许超出预算的绝对下限（毫秒）
+FLOOR_MS = 2.0
+
+_PROBE = (
+    "import sys, json\n"
+    "import {module}\n"
+    "print(json.dumps([[m for m in {deferred!r} if m in sys.modules], {baseline!r} in sys.modules]))\n"
+)
+
+
+def qt_baseline():
+    """
+    返回 QtCore 自身加载的延迟模块
+
+    Returns:
+        list: 模块列表，未安装 PySide6 时为空
+    """
+    proc = subprocess.run(
+        [sys.executable, '-c',
+         f"import sys, json\nimport {QT_BASELINE}\n"
+         f"print(json.dumps([m for m in {DEFERRED!r} if m in sys.modules]))\n"],
+        cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return []
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def measure(module, runs, baseline=()):
+    """
+    测量模块的冷启动导入耗时
+
+    Args:
+        baseline: QtCore 自身加载的延迟模块，模块导入了 QtCore 时不计入
+
+    Returns:
+        tuple: (最小累计耗时毫秒，不含 QtCore 的导入耗时, 提前加载的模块列表)；
+               依赖缺失时返回 (None, 错误信息)
+    """
+    best = None
+    loaded = []
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c',
+             _PROBE.format(module=module, deferred=DEFERRED, baseline=QT_BASELINE)],
+            cwd=ROOT, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            last = proc.stderr.strip().splitlines()[-1:] or ['']
+            return None, last[0]
+        loaded, uses_qt = json.loads(proc.stdout.strip().splitlines()[-1])
+        if uses_qt:
+            loaded = [m for m in loaded if m not in baseline]
+        cumulative = qt = 0
+        for line in proc.stderr.splitlines():
+            parts = line.split('|')
+            if len(parts) != 3:
+                continue
+            name = parts[2].strip()
+            if parts[2].rstrip() == ' ' + module:
+                cumulative = int(parts[1])
+            elif name == QT_BASELINE:
+                qt = int(parts[1])
+        cost = (cumulative - qt) / 1000.0
+        best = cost if best is None else min(best, cost)
+    return best, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="冷启动导入耗时基准测试")
+    parser.add_argument('--runs', type=int, default=5, help="每个模块的测量次数")
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help="允许超出预算的比例")
+    parser.add_argument('--floor', type=float, default=FLOOR_MS,
+                        help="允许超出预算的绝对下限（毫秒）")
+    parser.add_argument('--update', action='store_true', help="更新预算文件")
+    args = parser.parse_args()
+
+    budget = {}
+    if os.path.exists(BUDGET_FILE):
+        with open(BUDGET_FILE, 'r', encoding='utf-8') as f:
+            budget = json.load(f)
+
+    failed = False
+    measured = {}
+    baseline = qt_baseline()
+    reference, _ = measure(BASELINE, args.runs)
+    recorded = budget.get(BASELINE_KEY)
+    scale = reference / recorded if recorded else 1.0
+    print(f"基线 {BASELINE}: {reference:.2f} ms, 预算缩放 {scale:.2f}x")
+    for module in MODULES:
+        cost, extra = measure(module, args.runs, baseline)
+        if cost is None:
+            print(f"跳过 {module:<18} 依赖缺失: {extra}")
+            continue
+        measured[module] = round(cost, 2)
+        limit = budget.get(module)
+        status = "OK"
+        if extra:
+            status = f"提前加载: {', '.join(extra)}"
+            failed = True
+        elif limit is not None:
+            limit *= scale
+            if cost > max(limit * (1 + args.tolerance), limit + args.floor):
+                status = f"超出预算 {limit:.2f}ms"
+                failed = True
+        print(f"{module:<24} {cost:8.2f} ms  {status}")
+
+    if args.update:
+        budget.update(measured)
+        budget[BASELINE_KEY] = round(reference, 2)
+        with open(BUDGET_FILE, 'w', encoding='utf-8') as f:
+            json.dump(budget, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"已更新 {BUDGET_FILE}")
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
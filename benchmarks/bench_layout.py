@@ -0,0 +1,52 @@
+"""
+布局计算基准测试
+不依赖 Win32 API，可在 Linux CI 上运行
+
+用法:
+    python benchmarks/bench_layout.py [--bars 48] [--monitors 4] [--rounds 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from appbar_layout import compute_rect, compute_rects, pack_rects  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AppBar 布局计算基准测试")
+    parser.add_argument('--bars', type=int, default=48, help="侧边栏数量")
+    parser.add_argument('--monitors', type=int, default=4, help="显示器数量")
+    parser.add_argument('--rounds', type=int, default=2000, help="重复次数")
+    args = parser.parse_args()
+
+    monitors = [(i * 1920, 0, (i + 1) * 1920, 1080) for i in range(args.monitors)]
+    packed = pack_rects(monitors)
+    edges = [i % 4 for i in range(args.bars)]
+    widths = [200 + (i % 5) * 20 for i in range(args.bars)]
+    heights = [-1] * args.bars
+    offsets = [(i % 3) * 10 for i in range(args.bars)]
+    index = [i % args.monitors for i in range(args.bars)]
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for i in range(args.bars):
+            compute_rect(monitors[index[i]], None, edges[i], widths[i], None, offsets[i])
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        compute_rects(packed, edges, widths, heights, offsets, index)
+    batch = time.perf_counter() - start
+
+    per_layout = 1e6 / args.rounds
+    print(f"侧边栏: {args.bars}, 显示器: {args.monitors}, 轮次: {args.rounds}")
+    print(f"逐个计算: {single * per_layout:.1f} us/次布局")
+    print(f"批量计算: {batch * per_layout:.1f} us/次布局")
+
+
+if __name__ == "__main__":
+    main()
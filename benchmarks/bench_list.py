@@ -0,0 +1,145 @@
+"""
+虚拟化列表基准测试
+RowStore 部分不依赖 Qt，可在 Linux CI 上运行；安装了 PySide6 时还会以 offscreen 平台
+测量 VirtualListPanel 的创建时间、滚动帧时间和增量更新后的重绘时间
+
+内存: RowStore 使用 tracemalloc 统计的 Python 分配；面板部分使用进程最大常驻内存的增量
+
+用法:
+    python benchmarks/bench_list.py [--rows 100000] [--updates 10000] [--frames 300]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from row_store import RowStore, STATUS_ERROR, STATUS_OK  # noqa: E402
+
+
+def iter_rows(count):
+    for i in range(count):
+        yield f'svc-{i}', f'service-{i:06d}.prod.internal', i % 4, float(i % 1000)
+
+
+def make_updates(count, rows, rng):
+    return [(f'svc-{rng.randrange(rows)}', None, rng.choice((STATUS_OK, STATUS_ERROR)),
+             rng.random() * 100.0) for _ in range(count)]
+
+
+def max_rss_mb():
+    """进程最大常驻内存 (MB)，不支持的平台返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以字节为单位，Linux 以 KB 为单位
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def bench_store(args):
+    rng = random.Random(args.seed)
+    updates = make_updates(args.updates, args.rows, rng)
+
+    start = time.perf_counter()
+    store = RowStore()
+    store.extend(iter_rows(args.rows))
+    build = time.perf_counter() - start
+
+    # 另建一次统计内存，避免 tracemalloc 的开销计入创建时间；
+    # 行在添加时逐个生成，统计的内存包含键和文本字符串
+    tracemalloc.start()
+    traced = RowStore()
+    traced.extend(iter_rows(args.rows))
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced
+
+    start = time.perf_counter()
+    changed = sum(store.update(*update) is not None for update in updates)
+    update = time.perf_counter() - start
+
+    print(f"RowStore: {args.rows} 行")
+    print(f"创建: {build * 1e3:.1f} ms, 内存: {memory / 1e6:.1f} MB "
+          f"({memory / args.rows:.0f} 字节/行，含键和文本字符串)")
+    print(f"增量更新: {update * 1e6 / args.updates:.2f} us/次, 变化 {changed} 行")
+
+
+def bench_panel(args):
+    """VirtualListPanel 滚动帧时间（需要 PySide6）"""
+    try:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PySide6.QtWidgets import QApplication
+    except ImportError:
+        print("跳过 VirtualListPanel: 未安装 PySide6")
+        return
+
+    from sidebar_list import VirtualListPanel
+
+    app = QApplication.instance() or QApplication([])
+    rows = list(iter_rows(args.rows))
+    rng = random.Random(args.seed)
+
+    rss_before = max_rss_mb()
+    start = time.perf_counter()
+    panel = VirtualListPanel()
+    panel.resize(320, 1000)
+    panel.append_rows(rows)
+    panel.show()
+    app.processEvents()
+    build = time.perf_counter() - start
+    rss_after = max_rss_mb()
+
+    # 每帧滚动一段距离并同步重绘，测量单帧耗时
+    scrollbar = panel.verticalScrollBar()
+    step = max(1, scrollbar.maximum() // args.frames)
+    frame_times = []
+    for i in range(args.frames):
+        start = time.perf_counter()
+        scrollbar.setValue((i * step) % (scrollbar.maximum() + 1))
+        panel.viewport().repaint()
+        frame_times.append((time.perf_counter() - start) * 1e3)
+
+    # 增量更新后重绘一次
+    updates = make_updates(args.updates, args.rows, rng)
+    start = time.perf_counter()
+    changed = panel.update_rows(updates)
+    panel.viewport().repaint()
+    update = time.perf_counter() - start
+    first, last = panel.visible_range()
+
+    print(f"VirtualListPanel: {args.rows} 行, 可见 {last - first + 1} 行")
+    if rss_before is not None:
+        print(f"创建并显示: {build * 1e3:.1f} ms, 常驻内存增加: {rss_after - rss_before:.1f} MB")
+    else:
+        print(f"创建并显示: {build * 1e3:.1f} ms")
+    print(f"滚动帧时间: 平均 {sum(frame_times) / len(frame_times):.2f} ms, "
+          f"p95 {percentile(frame_times, 0.95):.2f} ms, 最大 {max(frame_times):.2f} ms")
+    print(f"增量更新 {args.updates} 次 + 重绘: {update * 1e3:.1f} ms, 变化 {changed} 行")
+    panel.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="虚拟化列表基准测试")
+    parser.add_argument('--rows', type=int, default=100000, help="行数")
+    parser.add_argument('--updates', type=int, default=10000, help="增量更新次数")
+    parser.add_argument('--frames', type=int, default=300, help="滚动帧数")
+    parser.add_argument('--seed', type=int, default=1, help="随机种子")
+    args = parser.parse_args()
+
+    bench_store(args)
+    bench_panel(args)
+
+
+if __name__ == "__main__":
+    main()
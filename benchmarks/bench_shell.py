@@ -0,0 +1,154 @@
+"""
+AppBar 压力测试基准
+使用 shell_simulator 模拟的 Shell，不依赖 Win32 API，可在 Linux CI 上运行
+
+先在多个显示器上注册大量 AppBar，再随机反复注销/注册/调整宽度，
+统计吞吐量、原生调用次数和工作区域变化次数，并检查保留区域互不重叠、
+工作区域不为空；安装了 PySide6 时还会测量 SidebarWidget 的嵌入/取消嵌入
+
+用法:
+    python benchmarks/bench_shell.py [--bars 200] [--monitors 4] [--toggles 5000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from appbar_helper import AppBar  # noqa: E402
+from monitor_topology import MonitorTopology  # noqa: E402
+from shell_simulator import SimulatedShell  # noqa: E402
+
+
+def check_invariants(shell, monitors):
+    """返回违反约束的描述列表"""
+    problems = []
+    for index in range(monitors):
+        l, t, r, b = shell.work_area(index)
+        if l > r or t > b:
+            problems.append(f"显示器 {index} 工作区域为空: {(l, t, r, b)}")
+        rects = [rect for _, _, rect in shell.reserved_rects(index)
+                 if rect[0] < rect[2] and rect[1] < rect[3]]
+        for i, a in enumerate(rects):
+            for c in rects[i + 1:]:
+                if a[0] < c[2] and c[0] < a[2] and a[1] < c[3] and c[1] < a[3]:
+                    problems.append(f"显示器 {index} 保留区域重叠: {a} {c}")
+    return problems
+
+
+def bench_appbars(args):
+    monitors = [(i * 2560, 0, (i + 1) * 2560, 1440) for i in range(args.monitors)]
+    shell = SimulatedShell(monitors)
+    topology = MonitorTopology(shell)
+    # 与 SidebarWidget 一样，收到 WM_SETTINGCHANGE 时使拓扑缓存失效
+    shell.on_message = lambda hwnd, message, wparam, lparam: topology.invalidate()
+    rng = random.Random(args.seed)
+
+    appbars = []
+    start = time.perf_counter()
+    for i in range(args.bars):
+        l, t, r, b = monitors[i % args.monitors]
+        hwnd = shell.create_window((l + 100, t + 100, l + 500, t + 900))
+        appbar = AppBar(hwnd, edge=(i // args.monitors) % 4, width=16 + (i % 4) * 4,
+                        topology=topology, native=shell)
+        appbar.register()
+        appbars.append(appbar)
+    register_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.toggles):
+        appbar = rng.choice(appbars)
+        if appbar.registered:
+            if rng.random() < 0.5:
+                appbar.unregister()
+            else:
+                appbar.reconfigure(width=16 + rng.randrange(4) * 4)
+        else:
+            appbar.register()
+    toggle_time = time.perf_counter() - start
+
+    problems = check_invariants(shell, args.monitors)
+    stats = shell.get_stats()
+    print(f"AppBar: {args.bars}, 显示器: {args.monitors}, 切换: {args.toggles}")
+    print(f"注册: {register_time * 1e6 / args.bars:.1f} us/个")
+    print(f"切换: {toggle_time * 1e6 / args.toggles:.1f} us/次 "
+          f"({args.toggles / toggle_time:.0f} 次/秒)")
+    print(f"SHAppBarMessage: {stats['SHAppBarMessage']['calls']} 次, "
+          f"SetWindowPos: {stats.get('SetWindowPos', {}).get('calls', 0)} 次, "
+          f"工作区域变化: {shell.work_area_changes} 次")
+    for problem in problems[:10]:
+        print(f"  ❌ {problem}")
+    return not problems
+
+
+def bench_widgets(args):
+    """SidebarWidget 嵌入/取消嵌入吞吐量（需要 PySide6）"""
+    try:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PySide6.QtWidgets import QApplication, QWidget
+    except ImportError:
+        print("跳过 SidebarWidget: 未安装 PySide6")
+        return True
+
+    import tempfile
+    from config_store import ConfigStore
+    from native_event_filter import native_event_filter
+    from sidebar_widget import SidebarWidget
+
+    app = QApplication.instance() or QApplication([])
+    shell = SimulatedShell([(0, 0, 2560, 1440)])
+    topology = MonitorTopology(shell)
+    shell.on_message = native_event_filter().dispatch
+    directory = tempfile.mkdtemp(prefix='bench-shell-')
+    store = ConfigStore(os.path.join(directory, 'profiles.json'))
+
+    widgets = []
+    for i in range(args.widgets):
+        window = QWidget()
+        window.resize(400, 800)
+        shell.create_window((100, 100, 500, 900), hwnd=int(window.winId()))
+        sidebar = SidebarWidget(window, profile=f'bench_{i}', store=store,
+                                topology=topology, native=shell,
+                                default_config={'width': 40, 'edge': ('left', 'right')[i % 2],
+                                                'resizable': False})
+        widgets.append(sidebar)
+
+    start = time.perf_counter()
+    for _ in range(args.widget_rounds):
+        for sidebar in widgets:
+            sidebar.toggle()
+        app.processEvents()
+    elapsed = time.perf_counter() - start
+    operations = args.widget_rounds * len(widgets)
+    store.flush()
+
+    errors = sum(sum(v for k, v in sidebar.metrics.snapshot()['counters'].items()
+                     if k.startswith('errors.')) for sidebar in widgets)
+    print(f"SidebarWidget: {len(widgets)} 个, {operations} 次嵌入/取消嵌入, "
+          f"{elapsed * 1e6 / operations:.1f} us/次, 错误 {errors} 次")
+    for sidebar in widgets:
+        sidebar.cleanup()
+    store.flush()
+    return errors == 0 and not check_invariants(shell, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AppBar 模拟 Shell 压力测试")
+    parser.add_argument('--bars', type=int, default=200, help="AppBar 数量")
+    parser.add_argument('--monitors', type=int, default=4, help="显示器数量")
+    parser.add_argument('--toggles', type=int, default=5000, help="随机切换次数")
+    parser.add_argument('--widgets', type=int, default=20, help="SidebarWidget 数量")
+    parser.add_argument('--widget-rounds', type=int, default=50, help="SidebarWidget 切换轮数")
+    parser.add_argument('--seed', type=int, default=1, help="随机种子")
+    args = parser.parse_args()
+
+    ok = bench_appbars(args)
+    ok = bench_widgets(args) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
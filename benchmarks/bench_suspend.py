@@ -0,0 +1,91 @@
+"""
+可见性挂起基准测试
+不依赖 Qt，可在 Linux CI 上运行
+
+与 bench_feeds 相同的数据源登记到 SuspensionRegistry，依次经历
+可见 -> 不可见（例如被全屏应用覆盖）-> 可见 三个阶段，
+统计每个阶段的轮询次数、唤醒次数和 CPU 时间，确认不可见期间的开销接近零，
+以及恢复可见后立即补轮询一次
+
+用法:
+    python benchmarks/bench_suspend.py [--feeds 48] [--interval 0.25] [--seconds 2]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feed_scheduler import Feed, FeedScheduler  # noqa: E402
+from sidebar_visibility import SuspensionRegistry  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="可见性挂起基准测试")
+    parser.add_argument('--feeds', type=int, default=48, help="数据源数量")
+    parser.add_argument('--interval', type=float, default=0.25, help="轮询间隔（秒）")
+    parser.add_argument('--seconds', type=float, default=2.0, help="每个阶段的运行时间（秒）")
+    parser.add_argument('--workers', type=int, default=4, help="轮询线程数")
+    args = parser.parse_args()
+
+    registry = SuspensionRegistry()
+    polls = [0]
+    lock = threading.Lock()
+
+    def poll():
+        with lock:
+            polls[0] += 1
+        registry.note_wakeup()
+        return time.monotonic()
+
+    scheduler = FeedScheduler(notify=registry.note_wakeup, workers=args.workers)
+    for i in range(args.feeds):
+        scheduler.add(Feed(f'feed-{i}', poll, interval=args.interval),
+                      delay=args.interval * i / args.feeds)
+    registry.register('feeds', scheduler.pause, scheduler.resume)
+    scheduler.start()
+
+    def phase(name, active):
+        registry.set_active(active)
+        with lock:
+            start_polls = polls[0]
+        cpu_start = time.process_time()
+        catch_up = None
+        deadline = time.monotonic() + args.seconds
+        while time.monotonic() < deadline:
+            # 不可见时GUI线程没有投递，只是空闲等待
+            time.sleep(0.01 if active else 0.1)
+            if catch_up is None and active:
+                with lock:
+                    if polls[0] - start_polls >= args.feeds:
+                        catch_up = (args.seconds - (deadline - time.monotonic())) * 1e3
+            # 模拟GUI线程每帧取走结果
+            scheduler.take_updates()
+        cpu = time.process_time() - cpu_start
+        with lock:
+            count = polls[0] - start_polls
+        line = (f"{name}: 轮询 {count} 次 ({count / args.seconds:.0f} 次/秒), "
+                f"CPU {cpu * 1e3:.1f} ms ({cpu / args.seconds * 100:.1f}%)")
+        if catch_up is not None:
+            line += f", 全部数据源在 {catch_up:.0f} ms 内至少轮询一次"
+        print(line)
+        return count
+
+    phase("可见", True)
+    hidden = phase("不可见", False)
+    phase("恢复可见", True)
+    scheduler.stop()
+
+    stats = registry.get_stats()
+    print(f"唤醒: 可见 {stats['wakeups']['visible']} 次, 不可见 {stats['wakeups']['hidden']} 次 "
+          f"({stats['wakeups_per_minute']['hidden']:.1f} 次/分钟)")
+    print(f"CPU: 可见 {stats['cpu_ms']['visible']:.1f} ms, 不可见 {stats['cpu_ms']['hidden']:.1f} ms")
+    # 切换到不可见时已提交的轮询可能还在完成
+    return 0 if hidden <= args.workers else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
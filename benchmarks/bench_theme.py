@@ -0,0 +1,116 @@
+"""
+主题样式表基准测试
+需要 PySide6，使用 offscreen 平台，可在 Linux CI 上运行
+
+构建一个包含大量带样式控件的窗口（卡片中放标签、下拉框、数值框和按钮），比较两种方式：
+    inline: 与旧版示例相同，每张卡片单独 setStyleSheet 一段样式
+    theme:  控件只设置对象名，sidebar_theme 把一份样式表设置在根控件上
+统计构建并显示窗口的耗时，以及在深色/浅色之间切换的耗时；
+切换一次主题不应比重新构建一次窗口更慢
+
+用法:
+    python benchmarks/bench_theme.py [--widgets 1000] [--per-card 4] [--switches 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sidebar_theme import DARK, LIGHT, ROLE_CARD, ROLE_ROOT, SidebarTheme  # noqa: E402
+
+
+def build_window(widgets, per_card, style):
+    """
+    创建窗口
+
+    Args:
+        style: 每张卡片的内联样式表；为 None 时使用应用级主题的角色
+    """
+    from PySide6.QtWidgets import (QComboBox, QLabel, QPushButton, QSpinBox,
+                                   QVBoxLayout, QWidget)
+    from sidebar_theme import set_role
+
+    root = QWidget()
+    root.resize(430, 900)
+    layout = QVBoxLayout(root)
+    if style is None:
+        set_role(root, ROLE_ROOT)
+    factories = (lambda i: QLabel(f"标签 {i}"), lambda i: QComboBox(),
+                 lambda i: QSpinBox(), lambda i: QPushButton(f"按钮 {i}"))
+    created = 0
+    while created < widgets:
+        card = QWidget()
+        if style is None:
+            set_role(card, ROLE_CARD)
+        else:
+            card.setStyleSheet(style)
+        card_layout = QVBoxLayout(card)
+        for _ in range(min(per_card, widgets - created)):
+            card_layout.addWidget(factories[created % len(factories)](created))
+            created += 1
+        layout.addWidget(card)
+    return root
+
+
+def measure(app, args, style, theme=None):
+    start = time.perf_counter()
+    window = build_window(args.widgets, args.per_card, style)
+    if theme is not None:
+        theme.attach(window, DARK)
+    window.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    return window, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="主题样式表基准测试")
+    parser.add_argument('--widgets', type=int, default=1000, help="带样式的控件数量")
+    parser.add_argument('--per-card', type=int, default=4, help="每张卡片中的控件数量")
+    parser.add_argument('--switches', type=int, default=10, help="深色/浅色切换次数")
+    args = parser.parse_args()
+
+    try:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PySide6.QtWidgets import QApplication
+    except ImportError:
+        print("跳过: 未安装 PySide6")
+        return 0
+
+    app = QApplication.instance() or QApplication([])
+    theme = SidebarTheme()
+    # 与旧版示例相同：每张卡片一段内联样式（不带对象名选择器）
+    inline = theme.stylesheet(DARK).replace('#SidebarCard ', '').replace('QWidget#SidebarCard', 'QWidget')
+
+    window, inline_time = measure(app, args, inline)
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+
+    window, theme_time = measure(app, args, None, theme)
+
+    switch_times = []
+    for i in range(args.switches):
+        start = time.perf_counter()
+        theme.apply(LIGHT if i % 2 == 0 else DARK, app)
+        app.processEvents()
+        switch_times.append((time.perf_counter() - start) * 1e3)
+    window.close()
+
+    print(f"控件: {args.widgets} 个, 每张卡片 {args.per_card} 个")
+    print(f"构建并显示: inline {inline_time * 1e3:.1f} ms, theme {theme_time * 1e3:.1f} ms "
+          f"({inline_time / theme_time:.1f}x)")
+    if switch_times:
+        switch_times.sort()
+        print(f"切换主题: 平均 {sum(switch_times) / len(switch_times):.1f} ms, "
+              f"最大 {switch_times[-1]:.1f} ms (构建 {theme_time * 1e3:.1f} ms)")
+    stats = theme.get_stats()
+    print(f"样式表生成: {stats['compiles']} 次, 缓存命中: {stats['cache_hits']} 次")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""
+统一配置存储模块
+所有侧边栏的配置以命名配置档 (profile) 的形式保存在同一个 JSON 文件中
+
+文件格式:
+    {
+      "version": 1,
+      "profiles": {
+        "sidebar_config": {"edge": "left", "width": 300, ...},
+        "sidebar_test": {...}
+      }
+    }
+
+解析结果缓存在内存中，用文件的修改时间和大小校验，未变化时读取不访问磁盘内容；
+同一路径的多个侧边栏通过 ConfigStore.shared() 共享一个实例，只解析一次。
+写入通过 config_writer 合并后在后台完成，失败时按指数退避重试，
+未写入的修改一直保留在内存中
+
+使用示例:
+    from config_store import ConfigStore
+
+    store = ConfigStore.shared("sidebar_profiles.json")
+    config = store.load_profile("sidebar_test", defaults={'width': 300})
+    store.save_profile("sidebar_test", config)
+"""
+
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config_writer import ConfigWriter, get_default_writer
+from sidebar_trace import tracer, WARNING
+
+DEFAULT_STORE_PATH = 'sidebar_profiles.json'
+STORE_VERSION = 1
+# 写入失败后的重试次数和首次重试延迟（秒），之后每次加倍
+WRITE_RETRIES = 3
+WRITE_RETRY_DELAY = 0.5
+
+
+class ConfigStore:
+    """命名配置档存储"""
+
+    _shared: Dict[str, 'ConfigStore'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH,
+                 writer: Optional[ConfigWriter] = None):
+        """
+        初始化配置存储
+
+        Args:
+            path: 配置文件路径
+            writer: 配置写入器，默认使用进程内共享的后台写入器
+        """
+        self.path = path
+        self.writer = writer or get_default_writer()
+        self._lock = threading.RLock()
+        # 文件原始内容中的各配置档（未合并默认值）
+        self._profiles: Optional[Dict[str, Dict[str, Any]]] = None
+        # 已按需合并默认值的配置档
+        self._materialized: Dict[str, Dict[str, Any]] = {}
+        self._signature: Optional[Tuple[int, int]] = None
+        self._dirty = False
+        self._revision = 0
+
+        self._disk_reads = 0
+        self._cache_hits = 0
+        self._bytes_read = 0
+
+    @classmethod
+    def shared(cls, path: str = DEFAULT_STORE_PATH,
+               writer: Optional[ConfigWriter] = None) -> 'ConfigStore':
+        """
+        获取指定路径的共享实例
+
+        Args:
+            path: 配置文件路径
+            writer: 配置写入器，仅在首次创建实例时使用；实例已存在且使用
+                    其他写入器时抛出 ValueError，避免两个写入器写同一个文件
+        """
+        key = os.path.abspath(path)
+        with cls._shared_lock:
+            store = cls._shared.get(key)
+            if store is None:
+                store = cls(path, writer)
+                cls._shared[key] = store
+            elif writer is not None and writer is not store.writer:
+                raise ValueError(f"配置文件已使用其他写入器: {path}")
+            return store
+
+    def profile_names(self) -> List[str]:
+        """返回所有配置档名称"""
+        with self._lock:
+            return list(self._load())
+
+    def has_profile(self, name: str) -> bool:
+        """判断配置档是否存在"""
+        with self._lock:
+            return name in self._load()
+
+    def load_profile(self, name: str,
+                     defaults: Optional[Dict[str, Any]] = None,
+                     legacy_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        读取配置档
+
+        Args:
+            name: 配置档名称
+            defaults: 默认值，文件中缺少的键使用默认值
+            legacy_path: 旧版单独配置文件路径，配置档不存在时从该文件导入
+
+        Returns:
+            dict: 合并默认值后的配置（新的字典，调用方可以自由修改）
+        """
+        with self._lock:
+            profiles = self._load()
+            if name not in profiles and legacy_path:
+                self.import_legacy(name, legacy_path)
+            cached = self._materialized.get(name)
+            if cached is None:
+                cached = dict(defaults or {})
+                cached.update(profiles.get(name, {}))
+                self._materialized[name] = cached
+            else:
+                self._cache_hits += 1
+                if defaults:
+                    for key, value in defaults.items():
+                        cached.setdefault(key, value)
+            return dict(cached)
+
+    def save_profile(self, name: str, data: Dict[str, Any],
+                     on_error: Optional[Callable[[str, Exception], None]] = None):
+        """
+        保存配置档
+
+        内存中的内容立即更新，文件由后台写入器合并后写入
+
+        Args:
+            name: 配置档名称
+            data: 配置内容
+            on_error: 写入失败回调，参数为 (路径, 异常)
+        """
+        with self._lock:
+            profiles = self._load()
+            profiles[name] = dict(data)
+            self._materialized[name] = dict(data)
+            self._submit(on_error)
+
+    def delete_profile(self, name: str):
+        """删除配置档"""
+        with self._lock:
+            profiles = self._load()
+            if profiles.pop(name, None) is not None:
+                self._materialized.pop(name, None)
+                self._submit(None)
+
+    def import_legacy(self, name: str, legacy_path: str) -> bool:
+        """
+        从旧版单独配置文件导入配置档
+
+        Returns:
+            bool: 是否导入成功
+        """
+        if not os.path.exists(legacy_path):
+            return False
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.save_profile(name, data)
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待待写入的内容写入磁盘"""
+        return self.writer.flush(timeout)
+
+    def get_stats(self) -> Dict[str, int]:
+        """返回读取统计"""
+        with self._lock:
+            return {
+                'disk_reads': self._disk_reads,
+                'cache_hits': self._cache_hits,
+                'bytes_read': self._bytes_read,
+                'profiles': len(self._profiles or {}),
+            }
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """返回原始配置档字典，文件变化时重新解析"""
+        if self._profiles is not None and self._dirty:
+            # 尚有未写入的修改，内存中的内容最新
+            return self._profiles
+        signature = self._stat()
+        if self._profiles is not None and signature == self._signature:
+            return self._profiles
+
+        profiles: Dict[str, Dict[str, Any]] = {}
+        if signature is not None:
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+            self._disk_reads += 1
+            self._bytes_read += len(raw)
+            document = json.loads(raw.decode('utf-8')) if raw.strip() else {}
+            profiles = dict(document.get('profiles', {}))
+        self._profiles = profiles
+        self._materialized = {}
+        self._signature = signature
+        return profiles
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _submit(self, on_error: Optional[Callable[[str, Exception], None]]):
+        document = {
+            'version': STORE_VERSION,
+            'profiles': dict(self._profiles),
+        }
+        self._dirty = True
+        self._revision += 1
+        self._write(self._revision, document, on_error or self.writer.on_error, 0)
+
+    def _write(self, revision: int, document: Dict[str, Any],
+               callback: Optional[Callable[[str, Exception], None]],
+               attempt: int, delay: Optional[float] = None):
+        def failed(path: str, error: Exception):
+            if self._on_write_failed(revision, document, callback, attempt) and callback:
+                callback(path, error)
+
+        self.writer.submit(self.path, document, on_error=failed,
+                           on_written=lambda path: self._on_written(revision),
+                           delay=delay)
+
+    def _on_written(self, revision: int):
+        """后台写入完成：记录新的文件签名，避免下次读取时重新解析自己写入的内容"""
+        with self._lock:
+            if revision == self._revision:
+                self._signature = self._stat()
+                self._dirty = False
+
+    def _on_write_failed(self, revision: int, document: Dict[str, Any],
+                         callback: Optional[Callable[[str, Exception], None]],
+                         attempt: int) -> bool:
+        """
+        后台写入失败：内存中的内容仍是最新的，保持 dirty 并按指数退避重新提交
+
+        Returns:
+            bool: 是否已放弃重试（需要通知调用方）
+        """
+        with self._lock:
+            if revision != self._revision:
+                # 已有更新的提交排队，由它写入
+                return False
+            if attempt >= WRITE_RETRIES:
+                # 放弃重试，内存中的修改保留，下次保存时一并写入
+                return True
+            delay = WRITE_RETRY_DELAY * (2 ** attempt)
+            if tracer.enabled:
+                tracer.event('config.write_retry', WARNING, path=self.path,
+                             attempt=attempt + 1, delay=delay)
+            self._write(revision, document, callback, attempt + 1, delay)
+            return False
@@ -0,0 +1,250 @@
+"""
+配置文件后台写入模块
+合并短时间内的多次保存请求，由后台线程以"临时文件 + 重命名"的方式原子写入
+
+使用示例:
+    from config_writer import get_default_writer
+
+    writer = get_default_writer()
+    writer.submit("sidebar_config.json", {"width": 300})
+    writer.submit("sidebar_config.json", {"width": 310})  # 与上一次合并
+    writer.flush()                                      # 阻塞直到全部写入磁盘
+    print(writer.get_stats())
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from sidebar_trace import tracer
+
+
+def atomic_write_json(path: str, data: Any) -> int:
+    """
+    原子写入 JSON 文件
+
+    Returns:
+        int: 写入的字节数
+    """
+    payload = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return atomic_write_bytes(path, payload, suffix='.json')
+
+
+def atomic_write_bytes(path: str, payload: bytes, suffix: str = '') -> int:
+    """
+    原子写入文件
+
+    先写入同目录下的临时文件并 fsync，再用 os.replace 覆盖目标文件，
+    避免进程中途退出时留下半截文件。
+
+    Returns:
+        int: 写入的字节数
+    """
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', suffix=suffix, dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return len(payload)
+
+
+class ConfigWriter:
+    """
+    合并写入器
+
+    同一路径在 delay 秒内的多次提交只会写入最后一次的内容；
+    持续提交时最迟在 max_delay 秒后强制写入一次。
+    """
+
+    def __init__(self,
+                 delay: float = 0.3,
+                 max_delay: float = 2.0,
+                 on_error: Optional[Callable[[str, Exception], None]] = None):
+        """
+        初始化写入器
+
+        Args:
+            delay: 防抖延迟（秒）
+            max_delay: 首次提交后的最长等待时间（秒）
+            on_error: 写入失败回调，参数为 (路径, 异常)，在后台线程中调用
+        """
+        self.delay = delay
+        self.max_delay = max_delay
+        self.on_error = on_error
+
+        self._cond = threading.Condition()
+        # path -> [data, deadline, first_submit_time, error_callback, written_callback]
+        self._pending: Dict[str, list] = {}
+        self._inflight = 0
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        self._requested = 0
+        self._written = 0
+        self._coalesced = 0
+        self._failed = 0
+        self._bytes_written = 0
+
+    def submit(self, path: str, data: Any,
+               on_error: Optional[Callable[[str, Exception], None]] = None,
+               on_written: Optional[Callable[[str], None]] = None,
+               delay: Optional[float] = None):
+        """
+        提交一次保存请求
+
+        data 必须是调用方不再修改的快照（例如 dict.copy() 的结果）。
+
+        Args:
+            path: 目标文件路径
+            data: 要写入的数据
+            on_error: 本次写入失败时的回调，缺省使用构造时的 on_error
+            on_written: 写入成功后的回调，参数为路径，在后台线程中调用
+            delay: 本次提交的防抖延迟（秒），缺省使用构造时的 delay
+        """
+        now = time.monotonic()
+        if delay is None:
+            delay = self.delay
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("ConfigWriter 已关闭")
+            self._requested += 1
+            entry = self._pending.get(path)
+            if entry is None:
+                self._pending[path] = [data, now + delay, now, on_error, on_written]
+            else:
+                self._coalesced += 1
+                entry[0] = data
+                entry[1] = min(now + delay, entry[2] + self.max_delay)
+                entry[3] = on_error
+                entry[4] = on_written
+            self._ensure_thread()
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        立即写入所有待保存内容并等待完成
+
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
+
+        Returns:
+            bool: 是否在超时前全部写入
+        """
+        with self._cond:
+            if not self._pending and not self._inflight:
+                return True
+            for entry in self._pending.values():
+                entry[1] = 0.0
+            self._ensure_thread()
+            self._cond.notify_all()
+            return self._cond.wait_for(
+                lambda: not self._pending and not self._inflight, timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """写入剩余内容并停止后台线程"""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        获取写入统计
+
+        Returns:
+            dict: requested 为提交次数，written 为实际写盘次数，
+                  coalesced 为被合并（省掉）的写入次数
+        """
+        with self._cond:
+            return {
+                'requested': self._requested,
+                'written': self._written,
+                'coalesced': self._coalesced,
+                'failed': self._failed,
+                'pending': len(self._pending),
+                'bytes_written': self._bytes_written,
+            }
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name='ConfigWriter', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed and not self._pending:
+                        return
+                    now = time.monotonic()
+                    due = [path for path, entry in self._pending.items()
+                           if entry[1] <= now]
+                    if due:
+                        break
+                    if self._pending:
+                        wait = min(entry[1] for entry in self._pending.values()) - now
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                batch = [(path, self._pending.pop(path)) for path in due]
+                self._inflight += len(batch)
+
+            for path, (data, _, _, on_error, on_written) in batch:
+                try:
+                    with tracer.span('config.write', path=path) as span:
+                        written = atomic_write_json(path, data)
+                        span.set(bytes=written)
+                except Exception as e:
+                    with self._cond:
+                        self._failed += 1
+                    callback = on_error or self.on_error
+                    if callback:
+                        try:
+                            callback(path, e)
+                        except Exception:
+                            pass
+                else:
+                    with self._cond:
+                        self._written += 1
+                        self._bytes_written += written
+                    if on_written:
+                        try:
+                            on_written(path)
+                        except Exception:
+                            pass
+                finally:
+                    with self._cond:
+                        self._inflight -= 1
+                        self._cond.notify_all()
+
+
+_default_writer: Optional[ConfigWriter] = None
+_default_lock = threading.Lock()
+
+
+def get_default_writer() -> ConfigWriter:
+    """获取进程内共享的写入器，进程退出时自动写入剩余内容"""
+    global _default_writer
+    with _default_lock:
+        if _default_writer is None:
+            _default_writer = ConfigWriter()
+            atexit.register(_default_writer.close, 5.0)
+        return _default_writer
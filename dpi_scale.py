@@ -0,0 +1,99 @@
+"""
+按显示器缓存的 DPI 换算层
+配置中的 width/top_offset/auto_hide_strip 以逻辑像素（96 DPI 下的像素）表示，
+AppBar 和 Win32 使用物理像素；两者之间的换算统一在这里完成
+
+每个显示器的缩放比例在第一次使用时从 MonitorTopology 读取并缓存，
+之后只在 DPI 变化（WM_DPICHANGED）或显示器变化（WM_DISPLAYCHANGE）时重新计算，
+两者都经 MonitorTopology.invalidate() 使拓扑一并失效，MonitorInfo.dpi 与缩放比例保持一致；
+AppBar 增减引起的 WM_SETTINGCHANGE 不会使缩放比例失效
+
+使用示例:
+    from dpi_scale import DpiScaler
+
+    dpi = DpiScaler(topology)
+    scale = dpi.scale_for_window(hwnd)
+    appbar.width = dpi.to_physical(config.width, scale)
+
+    # 收到 WM_DPICHANGED 时
+    dpi.dpi_changed(hwnd, LOWORD(wparam))
+"""
+
+from typing import Dict, Optional, Sequence
+
+from monitor_topology import DEFAULT_DPI, MonitorInfo, MonitorTopology, Rect, default_topology
+
+
+class DpiScaler:
+    """按显示器句柄缓存缩放比例，在逻辑像素和物理像素之间换算"""
+
+    def __init__(self, topology: Optional[MonitorTopology] = None):
+        self.topology = topology or default_topology()
+        self._scales: Dict[int, float] = {}
+        self._computed = 0
+        self._invalidations = 0
+
+    def scale_for_monitor(self, info: MonitorInfo) -> float:
+        """返回显示器的缩放比例，例如 144 DPI 为 1.5"""
+        scale = self._scales.get(info.handle)
+        if scale is None:
+            scale = self._scales[info.handle] = info.dpi / DEFAULT_DPI
+            self._computed += 1
+        return scale
+
+    def scale_for_window(self, hwnd: int) -> float:
+        """返回窗口所在显示器的缩放比例"""
+        return self.scale_for_monitor(self.topology.from_window(hwnd))
+
+    @staticmethod
+    def to_physical(value: int, scale: float) -> int:
+        """逻辑像素 -> 物理像素，四舍五入"""
+        return int(value * scale + 0.5) if value >= 0 else -int(-value * scale + 0.5)
+
+    @staticmethod
+    def to_logical(value: int, scale: float) -> int:
+        """物理像素 -> 逻辑像素，四舍五入"""
+        return int(value / scale + 0.5) if value >= 0 else -int(-value / scale + 0.5)
+
+    def rect_to_logical(self, rect: Sequence[int], info: MonitorInfo) -> Rect:
+        """
+        物理像素矩形 -> Qt 的逻辑坐标
+
+        Qt 在 Windows 上保持每个屏幕左上角的坐标不变，
+        屏幕内的偏移和尺寸按该屏幕的缩放比例换算
+        """
+        scale = self.scale_for_monitor(info)
+        to_logical = self.to_logical
+        origin_x, origin_y = info.monitor[0], info.monitor[1]
+        l, t, r, b = rect
+        left = origin_x + to_logical(l - origin_x, scale)
+        top = origin_y + to_logical(t - origin_y, scale)
+        return left, top, left + to_logical(r - l, scale), top + to_logical(b - t, scale)
+
+    def dpi_changed(self, hwnd: Optional[int] = None, dpi: Optional[int] = None):
+        """
+        DPI 变化时调用，清空缓存并使拓扑失效，重新枚举后 MonitorInfo.dpi 为新的值
+
+        Args:
+            hwnd: 收到 WM_DPICHANGED 的窗口，与 dpi 一起指定时该窗口所在显示器直接使用 dpi
+            dpi: 新的 DPI（wParam 的低 16 位）
+        """
+        self._invalidations += 1
+        self._scales.clear()
+        # 窗口映射随之作废：窗口可能刚被拖到另一个显示器上
+        self.topology.invalidate()
+        if hwnd is not None and dpi:
+            info = self.topology.from_window(hwnd)
+            self._scales[info.handle] = dpi / DEFAULT_DPI
+
+    def invalidate(self):
+        """显示器增减或分辨率变化时清空缓存，拓扑一并失效"""
+        self.dpi_changed()
+
+    def get_stats(self) -> Dict[str, int]:
+        """返回缓存统计"""
+        return {
+            'cached': len(self._scales),
+            'computed': self._computed,
+            'invalidations': self._invalidations,
+        }
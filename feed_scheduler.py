@@ -0,0 +1,375 @@
+"""
+后台数据源调度模块
+在线程池中按各自的间隔轮询数据源（进程列表、服务健康文件等），
+在工作线程中计算与上一次结果的差异，并把同一帧内到达的差异合并，
+由界面一次性取走；本模块不依赖 Qt，Qt 侧的逐帧投递见 sidebar_feeds
+
+每个数据源:
+    poll()             在工作线程中执行，返回当前快照
+    diff(prev, cur)    在工作线程中执行，返回差异，无变化时返回 None
+    merge(old, new)    两次差异在界面取走之前合并为一次
+    失败时按 interval * 2^n 退避，最长 max_backoff 秒，成功后恢复
+
+使用示例:
+    from feed_scheduler import Feed, FeedScheduler
+
+    scheduler = FeedScheduler(notify=lambda: ...)   # 有新差异时调用（任意线程）
+    scheduler.add(Feed('services', read_health_file, interval=0.5))
+    scheduler.start()
+    ...
+    updates = scheduler.take_updates()              # {'services': 合并后的差异}
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple
+
+from sidebar_trace import tracer, WARNING
+
+
+def replace_diff(previous: Any, current: Any) -> Any:
+    """默认差异：快照变化时返回整个新快照"""
+    return None if current == previous else current
+
+
+def replace_merge(old: Any, new: Any) -> Any:
+    """默认合并：保留最新的差异"""
+    return new
+
+
+class RowDelta:
+    """
+    按键的行差异，快照为 {key: (text, status, value)}
+
+    upserts 为新增或变化的行，removed 为删除的键
+    """
+
+    __slots__ = ('upserts', 'removed')
+
+    def __init__(self, upserts: Optional[Dict[str, tuple]] = None,
+                 removed: Optional[Set[str]] = None):
+        self.upserts = upserts if upserts is not None else {}
+        self.removed = removed if removed is not None else set()
+
+    def __bool__(self) -> bool:
+        return bool(self.upserts or self.removed)
+
+    def __len__(self) -> int:
+        return len(self.upserts) + len(self.removed)
+
+    def __repr__(self) -> str:
+        return f'RowDelta(upserts={len(self.upserts)}, removed={len(self.removed)})'
+
+
+def diff_rows(previous: Optional[Mapping[str, tuple]],
+              current: Mapping[str, tuple]) -> Optional[RowDelta]:
+    """比较两次行快照"""
+    previous = previous or {}
+    upserts = {key: row for key, row in current.items() if previous.get(key) != row}
+    removed = {key for key in previous if key not in current}
+    delta = RowDelta(upserts, removed)
+    return delta if delta else None
+
+
+def merge_rows(old: RowDelta, new: RowDelta) -> RowDelta:
+    """合并两次行差异，后一次优先"""
+    for key in new.removed:
+        old.upserts.pop(key, None)
+    old.removed.difference_update(new.upserts)
+    old.removed.update(new.removed)
+    old.upserts.update(new.upserts)
+    return old
+
+
+class Feed:
+    """数据源声明"""
+
+    def __init__(self, name: str, poll: Callable[[], Any],
+                 interval: float = 1.0,
+                 diff: Callable[[Any, Any], Any] = replace_diff,
+                 merge: Callable[[Any, Any], Any] = replace_merge,
+                 max_backoff: float = 30.0):
+        """
+        Args:
+            name: 名称，同一调度器内唯一
+            poll: 读取数据源的函数，在工作线程中执行
+            interval: 轮询间隔（秒）
+            diff: 计算差异的函数 (previous, current)，第一次调用时 previous 为 None
+            merge: 合并两次差异的函数 (old, new)
+            max_backoff: 失败退避的最长间隔（秒）
+        """
+        if interval <= 0:
+            raise ValueError(f"轮询间隔必须大于 0: {interval}")
+        self.name = name
+        self.poll = poll
+        self.interval = interval
+        self.diff = diff
+        self.merge = merge
+        self.max_backoff = max(max_backoff, interval)
+
+        # 以下由调度器维护
+        self.snapshot: Any = None
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.polls = 0
+        self.changes = 0
+        self.poll_ns = 0
+        self.active = False
+        # 每次添加/移除时递增，旧的排期和进行中的轮询结果按代数作废
+        self.generation = 0
+
+    def next_delay(self) -> float:
+        """下一次轮询前的等待时间，连续失败时指数退避"""
+        if not self.failures:
+            return self.interval
+        return min(self.interval * (2 ** min(self.failures, 16)), self.max_backoff)
+
+
+class FeedScheduler:
+    """
+    数据源调度器
+
+    一个调度线程按到期时间把轮询交给线程池，同一数据源的轮询不会重叠；
+    差异在工作线程中计算并合并到待取走的结果里，只有待取走的结果从空变为非空时
+    才调用一次 notify，界面每次取走全部结果
+    """
+
+    def __init__(self, notify: Optional[Callable[[], None]] = None,
+                 workers: int = 4,
+                 on_error: Optional[Callable[[str, Exception], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            notify: 出现待取走的结果时调用，可能在任意工作线程中调用
+            workers: 线程池大小
+            on_error: 数据源轮询失败时调用 (name, exception)，在工作线程中调用
+            clock: 单调时钟
+        """
+        self.notify = notify
+        self.on_error = on_error
+        self.clock = clock
+        self._workers = workers
+        self._feeds: Dict[str, Feed] = {}
+        # (到期时间, 序号, 数据源, 排期时的代数)
+        self._heap: List[Tuple[float, int, Feed, int]] = []
+        self._sequence = itertools.count()
+        self._pending: Dict[str, Any] = {}
+        self._condition = threading.Condition()
+        self._executor = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._paused = False
+
+        self._deliveries = 0
+        self._merged = 0
+        self._failures = 0
+
+    def add(self, feed: Feed, delay: float = 0.0):
+        """添加数据源，delay 秒后第一次轮询"""
+        with self._condition:
+            if feed.name in self._feeds:
+                raise ValueError(f"数据源已存在: {feed.name}")
+            self._feeds[feed.name] = feed
+            feed.active = True
+            feed.generation += 1
+            self._schedule(feed, delay)
+
+    def remove(self, name: str) -> bool:
+        """
+        移除数据源，正在进行的轮询结果会被丢弃
+
+        有尚未取走的差异时同时清空快照，重新添加后第一次轮询得到完整差异
+        """
+        with self._condition:
+            feed = self._feeds.pop(name, None)
+            if feed is None:
+                return False
+            feed.active = False
+            feed.generation += 1
+            if self._pending.pop(name, None) is not None:
+                feed.snapshot = None
+            return True
+
+    def start(self):
+        """启动调度线程"""
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            # 停止期间完成的轮询没有重新排期，重新启动时立即轮询一次
+            scheduled = {id(feed) for _, _, feed, generation in self._heap
+                         if generation == feed.generation}
+            for feed in self._feeds.values():
+                if id(feed) not in scheduled:
+                    self._schedule(feed, 0.0)
+            # concurrent.futures 会加载 logging，推迟到启动时导入
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=self._workers,
+                                                thread_name_prefix='SidebarFeed')
+            self._thread = threading.Thread(target=self._run, name='SidebarFeedScheduler',
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """停止调度线程并等待正在进行的轮询结束"""
+        with self._condition:
+            thread, self._thread = self._thread, None
+            executor, self._executor = self._executor, None
+            self._stopping = True
+            self._condition.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def pause(self):
+        """暂停轮询，已到期的数据源在 resume() 时立即轮询一次"""
+        with self._condition:
+            self._paused = True
+
+    def resume(self):
+        """恢复轮询，所有数据源立即补轮询一次"""
+        with self._condition:
+            if not self._paused:
+                return
+            self._paused = False
+            now = self.clock()
+            self._heap = [(now, seq, feed, generation)
+                          for _, seq, feed, generation in self._heap]
+            heapq.heapify(self._heap)
+            self._condition.notify_all()
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    def refresh(self, name: Optional[str] = None):
+        """立即轮询指定数据源（默认全部），不等到下一次到期"""
+        with self._condition:
+            now = self.clock()
+            self._heap = [(now if name is None or feed.name == name else due,
+                           seq, feed, generation)
+                          for due, seq, feed, generation in self._heap]
+            heapq.heapify(self._heap)
+            self._condition.notify_all()
+
+    def take_updates(self) -> Dict[str, Any]:
+        """取走全部待处理的差异 {name: 合并后的差异}"""
+        with self._condition:
+            updates, self._pending = self._pending, {}
+            if updates:
+                self._deliveries += 1
+            return updates
+
+    def discard_updates(self) -> int:
+        """
+        丢弃全部待处理的差异
+
+        快照已经包含了这些变化，被丢弃差异的数据源同时清空快照，
+        下一次轮询得到相对 None 的完整差异，变化不会丢失
+
+        Returns:
+            int: 丢弃的数据源数量
+        """
+        with self._condition:
+            discarded, self._pending = self._pending, {}
+            for name in discarded:
+                self._feeds[name].snapshot = None
+            return len(discarded)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """返回调度统计和每个数据源的轮询次数、失败次数和平均耗时"""
+        with self._condition:
+            return {
+                'feeds': len(self._feeds),
+                'paused': self._paused,
+                'deliveries': self._deliveries,
+                'merged': self._merged,
+                'failures': self._failures,
+                'sources': {
+                    name: {
+                        'polls': feed.polls,
+                        'changes': feed.changes,
+                        'failures': feed.failures,
+                        'avg_poll_ms': feed.poll_ns / feed.polls / 1e6 if feed.polls else 0.0,
+                        'last_error': feed.last_error,
+                    }
+                    for name, feed in self._feeds.items()
+                },
+            }
+
+    def _schedule(self, feed: Feed, delay: float):
+        heapq.heappush(self._heap, (self.clock() + delay, next(self._sequence), feed,
+                                    feed.generation))
+        self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._stopping:
+                        return
+                    timeout = None
+                    if self._heap and not self._paused:
+                        timeout = self._heap[0][0] - self.clock()
+                        if timeout <= 0:
+                            break
+                    self._condition.wait(timeout)
+                _, _, feed, generation = heapq.heappop(self._heap)
+                executor = self._executor
+                # 移除后（或移除后又重新添加）的旧排期直接丢弃
+                current = feed.active and generation == feed.generation
+            if current and executor is not None:
+                try:
+                    executor.submit(self._poll, feed, generation)
+                except RuntimeError:
+                    # 线程池已关闭
+                    return
+
+    def _poll(self, feed: Feed, generation: int):
+        start = time.perf_counter_ns()
+        try:
+            snapshot = feed.poll()
+            delta = feed.diff(feed.snapshot, snapshot)
+        except Exception as e:
+            self._poll_failed(feed, generation, e)
+            return
+        elapsed = time.perf_counter_ns() - start
+
+        notify = False
+        with self._condition:
+            feed.polls += 1
+            feed.poll_ns += elapsed
+            feed.failures = 0
+            feed.last_error = None
+            if not feed.active or generation != feed.generation:
+                return
+            feed.snapshot = snapshot
+            if delta is not None:
+                feed.changes += 1
+                notify = not self._pending
+                if feed.name in self._pending:
+                    self._pending[feed.name] = feed.merge(self._pending[feed.name], delta)
+                    self._merged += 1
+                else:
+                    self._pending[feed.name] = delta
+            if not self._stopping:
+                self._schedule(feed, feed.next_delay())
+        if notify and self.notify is not None:
+            self.notify()
+
+    def _poll_failed(self, feed: Feed, generation: int, error: Exception):
+        with self._condition:
+            feed.polls += 1
+            feed.failures += 1
+            feed.last_error = str(error)
+            self._failures += 1
+            if feed.active and generation == feed.generation and not self._stopping:
+                self._schedule(feed, feed.next_delay())
+        if tracer.enabled:
+            tracer.event('feed.poll_failed', WARNING, feed=feed.name, error=str(error),
+                         backoff=feed.next_delay())
+        if self.on_error is not None:
+            self.on_error(feed.name, error)
@@ -0,0 +1,282 @@
+"""
+显示器拓扑缓存模块
+一次性枚举所有显示器，按句柄和坐标建立索引，缓存显示器区域、工作区域和 DPI，
+仅在收到显示器或系统设置变化通知时失效
+
+Win32 枚举通过 MonitorBackend 接口隔离，测试时可以用 FakeMonitorBackend 代替
+
+使用示例:
+    from monitor_topology import default_topology
+
+    topology = default_topology()
+    info = topology.from_window(hwnd)
+    print(info.monitor, info.work, info.dpi)
+
+    # 收到 WM_DISPLAYCHANGE / WM_SETTINGCHANGE 等通知时
+    topology.invalidate()
+"""
+
+import threading
+from bisect import bisect_right
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+Rect = Tuple[int, int, int, int]
+
+MONITOR_DEFAULTTONEAREST = 0x00000002
+MONITORINFOF_PRIMARY = 0x00000001
+MDT_EFFECTIVE_DPI = 0
+DEFAULT_DPI = 96
+
+
+class MonitorInfo(NamedTuple):
+    """单个显示器的信息，坐标均为物理像素"""
+    handle: int
+    monitor: Rect
+    work: Rect
+    dpi: int = DEFAULT_DPI
+    primary: bool = False
+    device: str = ''
+
+    @property
+    def scale(self) -> float:
+        """缩放比例，例如 144 DPI 为 1.5"""
+        return self.dpi / DEFAULT_DPI
+
+
+class MonitorBackend:
+    """显示器枚举接口"""
+
+    def enumerate_monitors(self) -> List[MonitorInfo]:
+        """枚举所有显示器"""
+        raise NotImplementedError
+
+    def monitor_from_window(self, hwnd: int) -> int:
+        """返回窗口所在（或最近）显示器的句柄"""
+        raise NotImplementedError
+
+
+class Win32MonitorBackend(MonitorBackend):
+    """基于 Win32 API 的显示器枚举"""
+
+    def enumerate_monitors(self) -> List[MonitorInfo]:
+        import win32api
+
+        monitors = []
+        for hmonitor, _, _ in win32api.EnumDisplayMonitors():
+            info = win32api.GetMonitorInfo(hmonitor)
+            handle = int(hmonitor)
+            monitors.append(MonitorInfo(
+                handle=handle,
+                monitor=tuple(info['Monitor']),
+                work=tuple(info['Work']),
+                dpi=self._monitor_dpi(handle),
+                primary=bool(info.get('Flags', 0) & MONITORINFOF_PRIMARY),
+                device=info.get('Device', ''),
+            ))
+        return monitors
+
+    def monitor_from_window(self, hwnd: int) -> int:
+        import win32api
+
+        return int(win32api.MonitorFromWindow(hwnd, MONITOR_DEFAULTTONEAREST))
+
+    @staticmethod
+    def _monitor_dpi(handle: int) -> int:
+        """读取显示器的有效 DPI，Win8.1 之前的系统返回默认值"""
+        import ctypes
+
+        try:
+            dpi_x = ctypes.c_uint()
+            dpi_y = ctypes.c_uint()
+            result = ctypes.windll.shcore.GetDpiForMonitor(
+                ctypes.c_void_p(handle), MDT_EFFECTIVE_DPI,
+                ctypes.byref(dpi_x), ctypes.byref(dpi_y))
+            if result == 0 and dpi_x.value:
+                return dpi_x.value
+        except (AttributeError, OSError):
+            pass
+        return DEFAULT_DPI
+
+
+class FakeMonitorBackend(MonitorBackend):
+    """
+    用于测试的显示器后端
+
+    windows 为 {hwnd: 显示器句柄}，未登记的窗口视为位于主显示器
+    """
+
+    def __init__(self, monitors: Sequence[MonitorInfo],
+                 windows: Optional[Dict[int, int]] = None):
+        self.monitors = list(monitors)
+        self.windows = dict(windows or {})
+        self.enumerate_calls = 0
+        self.window_calls = 0
+
+    def enumerate_monitors(self) -> List[MonitorInfo]:
+        self.enumerate_calls += 1
+        return list(self.monitors)
+
+    def monitor_from_window(self, hwnd: int) -> int:
+        self.window_calls += 1
+        handle = self.windows.get(hwnd)
+        if handle is not None:
+            return handle
+        for info in self.monitors:
+            if info.primary:
+                return info.handle
+        return self.monitors[0].handle
+
+
+class MonitorTopology:
+    """
+    显示器拓扑缓存
+
+    枚举结果在 invalidate() 之前一直有效；窗口到显示器的映射同样缓存，
+    窗口在未嵌入状态下可能被拖到其他显示器，重新注册前应调用 forget_window()
+    """
+
+    def __init__(self, backend: Optional[MonitorBackend] = None):
+        self.backend = backend or Win32MonitorBackend()
+        self.generation = 0
+        self._lock = threading.RLock()
+        self._monitors: Optional[List[MonitorInfo]] = None
+        self._by_handle: Dict[int, MonitorInfo] = {}
+        self._lefts: List[int] = []
+        self._sorted: List[MonitorInfo] = []
+        self._windows: Dict[int, int] = {}
+        self._listeners: List[Callable[['MonitorTopology'], None]] = []
+
+        self._enumerations = 0
+        self._hits = 0
+        self._misses = 0
+
+    def monitors(self) -> List[MonitorInfo]:
+        """返回所有显示器（按需枚举一次）"""
+        with self._lock:
+            if self._monitors is None:
+                self._load()
+            return list(self._monitors)
+
+    def primary(self) -> MonitorInfo:
+        """返回主显示器"""
+        monitors = self.monitors()
+        for info in monitors:
+            if info.primary:
+                return info
+        return monitors[0]
+
+    def by_handle(self, handle: int) -> Optional[MonitorInfo]:
+        """按显示器句柄查找"""
+        with self._lock:
+            if self._monitors is None:
+                self._load()
+            return self._by_handle.get(int(handle))
+
+    def from_point(self, x: int, y: int) -> MonitorInfo:
+        """返回包含该点的显示器，点不在任何显示器上时返回最近的显示器"""
+        with self._lock:
+            if self._monitors is None:
+                self._load()
+            index = bisect_right(self._lefts, x)
+            for info in reversed(self._sorted[:index]):
+                l, t, r, b = info.monitor
+                if l <= x < r and t <= y < b:
+                    return info
+            return min(self._sorted, key=lambda info: _distance(info.monitor, x, y))
+
+    def from_window(self, hwnd: int) -> MonitorInfo:
+        """返回窗口所在的显示器，窗口映射缓存到下一次失效"""
+        hwnd = int(hwnd)
+        with self._lock:
+            if self._monitors is None:
+                self._load()
+            handle = self._windows.get(hwnd)
+            if handle is not None:
+                info = self._by_handle.get(handle)
+                if info is not None:
+                    self._hits += 1
+                    return info
+            self._misses += 1
+            handle = int(self.backend.monitor_from_window(hwnd))
+            info = self._by_handle.get(handle)
+            if info is not None:
+                self._windows[hwnd] = info.handle
+                return info
+        # 句柄不在缓存中说明拓扑已经变化但尚未收到通知：与收到通知时一样整体失效，
+        # 其他窗口的映射随之作废，监听者（例如 DpiScaler）也会得到通知
+        self.invalidate()
+        with self._lock:
+            if self._monitors is None:
+                self._load()
+            info = self._by_handle.get(handle) or self.primary()
+            self._windows[hwnd] = info.handle
+            return info
+
+    def forget_window(self, hwnd: int):
+        """丢弃窗口到显示器的缓存映射"""
+        with self._lock:
+            self._windows.pop(int(hwnd), None)
+
+    def invalidate(self):
+        """显示器或系统设置变化时调用，下次访问时重新枚举"""
+        with self._lock:
+            self._monitors = None
+            self._by_handle = {}
+            self._lefts = []
+            self._sorted = []
+            self._windows.clear()
+            self.generation += 1
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(self)
+
+    def add_listener(self, callback: Callable[['MonitorTopology'], None]):
+        """注册失效回调"""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[['MonitorTopology'], None]):
+        """移除失效回调"""
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def get_stats(self) -> Dict[str, int]:
+        """返回缓存统计"""
+        with self._lock:
+            return {
+                'generation': self.generation,
+                'enumerations': self._enumerations,
+                'window_hits': self._hits,
+                'window_misses': self._misses,
+            }
+
+    def _load(self):
+        monitors = self.backend.enumerate_monitors()
+        if not monitors:
+            raise RuntimeError("未找到任何显示器")
+        self._enumerations += 1
+        self._monitors = monitors
+        self._by_handle = {info.handle: info for info in monitors}
+        self._sorted = sorted(monitors, key=lambda info: info.monitor[0])
+        self._lefts = [info.monitor[0] for info in self._sorted]
+
+
+def _distance(rect: Rect, x: int, y: int) -> int:
+    l, t, r, b = rect
+    dx = l - x if x < l else (x - r + 1 if x >= r else 0)
+    dy = t - y if y < t else (y - b + 1 if y >= b else 0)
+    return dx * dx + dy * dy
+
+
+_default_topology: Optional[MonitorTopology] = None
+_default_lock = threading.Lock()
+
+
+def default_topology() -> MonitorTopology:
+    """获取进程内共享的显示器拓扑"""
+    global _default_topology
+    with _default_lock:
+        if _default_topology is None:
+            _default_topology = MonitorTopology()
+        return _default_topology
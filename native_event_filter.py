@@ -0,0 +1,100 @@
+"""
+Qt 原生事件过滤器
+在Qt的窗口过程中截获指定窗口的Win32消息，转发给对应的处理函数
+
+使用示例:
+    from native_event_filter import native_event_filter
+
+    event_filter = native_event_filter()
+    event_filter.add_window(hwnd, handler, [callback_message, WM_DISPLAYCHANGE])
+    ...
+    event_filter.remove_window(hwnd)
+
+handler 的参数为 (message, wParam, lParam)，在GUI线程中同步调用，应当尽快返回
+"""
+
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+from PySide6.QtCore import QAbstractNativeEventFilter, QCoreApplication
+
+from sidebar_trace import tracer, WARNING
+
+NativeHandler = Callable[[int, int, int], None]
+
+_WINDOWS_MSG = b"windows_generic_MSG"
+
+
+class NativeEventFilter(QAbstractNativeEventFilter):
+    """按窗口句柄分发原生消息的过滤器"""
+
+    def __init__(self):
+        super().__init__()
+        self._handlers: Dict[int, Tuple[NativeHandler, Set[int]]] = {}
+        self._msg_type = None
+        self._errors = 0
+
+    def add_window(self, hwnd: int, handler: NativeHandler, messages: Iterable[int]):
+        """
+        登记窗口
+
+        Args:
+            hwnd: 窗口句柄
+            handler: 消息处理函数
+            messages: 需要转发的消息编号
+        """
+        self._handlers[int(hwnd)] = (handler, set(messages))
+
+    def remove_window(self, hwnd: int):
+        """取消登记窗口"""
+        self._handlers.pop(int(hwnd), None)
+
+    @property
+    def errors(self) -> int:
+        """处理函数抛出异常的次数"""
+        return self._errors
+
+    def nativeEventFilter(self, eventType, message):
+        if not self._handlers or bytes(eventType) != _WINDOWS_MSG:
+            return False, 0
+        if self._msg_type is None:
+            from ctypes import wintypes
+            self._msg_type = wintypes.MSG
+        msg = self._msg_type.from_address(int(message))
+        self.dispatch(msg.hWnd or 0, msg.message, msg.wParam or 0, msg.lParam or 0)
+        return False, 0
+
+    def dispatch(self, hwnd: int, message: int, wparam: int, lparam: int) -> bool:
+        """
+        将一条消息转发给登记的处理函数（也可由 shell_simulator 等直接调用）
+
+        Returns:
+            bool: 是否有处理函数接收了该消息
+        """
+        entry = self._handlers.get(hwnd)
+        if entry is None or message not in entry[1]:
+            return False
+        try:
+            entry[0](message, wparam, lparam)
+        except Exception as e:
+            # 异常不能穿过Qt的窗口过程，只记录到跟踪中
+            self._errors += 1
+            if tracer.enabled:
+                tracer.event('native.handler_failed', WARNING, hwnd=hwnd, message=message,
+                             wparam=wparam, error=repr(e))
+        return True
+
+
+_instance: Optional[NativeEventFilter] = None
+_installed = False
+
+
+def native_event_filter() -> NativeEventFilter:
+    """获取安装在 QCoreApplication 上的共享过滤器"""
+    global _instance, _installed
+    if _instance is None:
+        _instance = NativeEventFilter()
+    if not _installed:
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.installNativeEventFilter(_instance)
+            _installed = True
+    return _instance
@@ -0,0 +1,268 @@
+"""
+紧凑的行存储
+为虚拟化列表提供数据，不依赖 Qt，可以在任意平台上运行、测试和基准测试
+
+每一列是一个 array 或字符串列表，而不是每行一个对象或一个控件：
+10 万行的状态和数值各只占一段连续内存，按键查找行号使用一个字典
+
+使用示例:
+    from row_store import RowStore, STATUS_ERROR
+
+    store = RowStore()
+    store.extend([('svc-1', 'nginx', STATUS_OK, 12.5), ('svc-2', 'redis', STATUS_OK, 3.0)])
+    row = store.update('svc-2', status=STATUS_ERROR, value=0.0)   # 返回发生变化的行号
+"""
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 行状态
+STATUS_OK = 0
+STATUS_WARNING = 1
+STATUS_ERROR = 2
+STATUS_UNKNOWN = 3
+
+Row = Tuple[str, str, int, float]
+
+
+class RowStore:
+    """按列存储的行集合：键、显示文本、状态和一个数值"""
+
+    __slots__ = ('keys', 'texts', 'status', 'values', '_index')
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.texts: List[str] = []
+        self.status = array('B')
+        self.values = array('d')
+        self._index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def find(self, key: str) -> Optional[int]:
+        """返回键所在的行号"""
+        return self._index.get(key)
+
+    def row(self, index: int) -> Row:
+        """返回 (key, text, status, value)"""
+        return self.keys[index], self.texts[index], self.status[index], self.values[index]
+
+    def check_rows(self, rows: Iterable[Row], replace: bool = False) -> List[Row]:
+        """
+        检查一批待添加的行，不修改存储
+
+        Args:
+            replace: 是否用于替换全部数据（不与已有的键比较）
+
+        Returns:
+            list: 检查通过的行
+
+        Raises:
+            KeyError: 键已存在或在这一批中重复
+            ValueError: 行不是 (str, str, 0-255 的整数, 数值)
+        """
+        rows = list(rows)
+        seen = set()
+        for row in rows:
+            if not isinstance(row, tuple) or len(row) != 4:
+                raise ValueError(f"行必须是 (key, text, status, value): {row!r}")
+            key, text, status, value = row
+            if not isinstance(key, str) or not isinstance(text, str):
+                raise ValueError(f"key 和 text 必须是字符串: {row!r}")
+            if not isinstance(status, int) or not 0 <= status <= 255:
+                raise ValueError(f"status 必须是 0-255 的整数: {row!r}")
+            if not isinstance(value, (int, float)):
+                raise ValueError(f"value 必须是数值: {row!r}")
+            if key in seen or (not replace and key in self._index):
+                raise KeyError(f"行已存在: {key}")
+            seen.add(key)
+        return rows
+
+    def check_updates(self, updates: Iterable[tuple]) -> List[tuple]:
+        """
+        检查一批增量更新 (key, text, status, value)，不修改存储
+
+        None 表示该列不变；不存在的键不检查，更新时跳过
+
+        Returns:
+            list: 检查通过的更新
+
+        Raises:
+            ValueError: 更新不是 (str, str 或 None, 0-255 的整数或 None, 数值或 None)
+        """
+        updates = list(updates)
+        for update in updates:
+            if not isinstance(update, tuple) or len(update) != 4:
+                raise ValueError(f"更新必须是 (key, text, status, value): {update!r}")
+            key, text, status, value = update
+            if not isinstance(key, str) or not (text is None or isinstance(text, str)):
+                raise ValueError(f"key 和 text 必须是字符串: {update!r}")
+            if status is not None and (not isinstance(status, int) or not 0 <= status <= 255):
+                raise ValueError(f"status 必须是 0-255 的整数: {update!r}")
+            if value is not None and not isinstance(value, (int, float)):
+                raise ValueError(f"value 必须是数值: {update!r}")
+        return updates
+
+    def append(self, key: str, text: str, status: int = STATUS_UNKNOWN, value: float = 0.0) -> int:
+        """
+        在末尾添加一行，失败时存储保持不变
+
+        Returns:
+            int: 新行的行号
+
+        Raises:
+            KeyError: 键已存在
+            OverflowError, TypeError: status 或 value 无法存入列数组
+        """
+        if key in self._index:
+            raise KeyError(f"行已存在: {key}")
+        index = len(self.keys)
+        # 先写入会做类型检查的列数组，失败时撤销
+        self.status.append(status)
+        try:
+            self.values.append(value)
+        except Exception:
+            self.status.pop()
+            raise
+        self.keys.append(key)
+        self.texts.append(text)
+        self._index[key] = index
+        return index
+
+    def extend(self, rows: Iterable[Row]) -> int:
+        """
+        批量添加行，任何一行失败时整批都不添加
+
+        Returns:
+            int: 添加的行数
+
+        Raises:
+            KeyError: 键已存在或在这一批中重复
+            OverflowError, TypeError: status 或 value 无法存入列数组
+        """
+        # 先写入局部的列，全部成功后再一次性追加，失败时只需撤销索引
+        index = self._index
+        start = len(self.keys)
+        keys: List[str] = []
+        texts: List[str] = []
+        status_column = array('B')
+        values = array('d')
+        try:
+            for key, text, status, value in rows:
+                if key in index:
+                    raise KeyError(f"行已存在: {key}")
+                status_column.append(status)
+                values.append(value)
+                index[key] = start + len(keys)
+                keys.append(key)
+                texts.append(text)
+        except Exception:
+            for key in keys:
+                del index[key]
+            raise
+        self.keys.extend(keys)
+        self.texts.extend(texts)
+        self.status.extend(status_column)
+        self.values.extend(values)
+        return len(keys)
+
+    def update(self, key: str, text: Optional[str] = None,
+               status: Optional[int] = None, value: Optional[float] = None) -> Optional[int]:
+        """
+        更新一行中指定的列
+
+        Returns:
+            int: 发生变化的行号；键不存在或值没有变化时为 None
+        """
+        index = self._index.get(key)
+        if index is None:
+            return None
+        changed = False
+        if text is not None and self.texts[index] != text:
+            self.texts[index] = text
+            changed = True
+        if status is not None and self.status[index] != status:
+            self.status[index] = status
+            changed = True
+        if value is not None and self.values[index] != value:
+            self.values[index] = value
+            changed = True
+        return index if changed else None
+
+    def remove(self, key: str) -> Optional[int]:
+        """
+        删除一行，之后的行号依次前移
+
+        删除多行时使用 remove_many()，只重建一次索引
+
+        Returns:
+            int: 被删除的行号；键不存在时为 None
+        """
+        index = self._index.get(key)
+        if index is None:
+            return None
+        self.delete_range(index, index)
+        self.reindex(index)
+        return index
+
+    def remove_many(self, keys: Iterable[str]) -> int:
+        """
+        批量删除行，不存在的键被忽略
+
+        Returns:
+            int: 删除的行数
+        """
+        ranges = self.removal_ranges(keys)
+        for first, last in ranges:
+            self.delete_range(first, last)
+        if ranges:
+            self.reindex(ranges[-1][0])
+        return sum(last - first + 1 for first, last in ranges)
+
+    def removal_ranges(self, keys: Iterable[str]) -> List[Tuple[int, int]]:
+        """
+        返回删除这些键需要删除的连续行号区间 (first, last)，按行号从后向前排列
+
+        按顺序对每个区间调用 delete_range() 时前面区间的行号不受影响
+        """
+        index = self._index
+        rows = sorted({index[key] for key in keys if key in index}, reverse=True)
+        ranges: List[Tuple[int, int]] = []
+        for row in rows:
+            if ranges and ranges[-1][0] == row + 1:
+                ranges[-1] = (row, ranges[-1][1])
+            else:
+                ranges.append((row, row))
+        return ranges
+
+    def delete_range(self, first: int, last: int):
+        """
+        删除 first 到 last（含）的行
+
+        之后的行号前移但不更新索引，调用方删除完所有区间后需要调用一次 reindex()
+        """
+        index = self._index
+        for key in self.keys[first:last + 1]:
+            del index[key]
+        del self.keys[first:last + 1]
+        del self.texts[first:last + 1]
+        del self.status[first:last + 1]
+        del self.values[first:last + 1]
+
+    def reindex(self, start: int = 0):
+        """重建 start 之后各行的键索引"""
+        index = self._index
+        keys = self.keys
+        for i in range(start, len(keys)):
+            index[keys[i]] = i
+
+    def clear(self):
+        self.keys.clear()
+        self.texts.clear()
+        del self.status[:]
+        del self.values[:]
+        self._index.clear()
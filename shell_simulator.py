@@ -0,0 +1,468 @@
+"""
+内存中的 Windows Shell 模拟器
+在任意平台上模拟显示器、任务栏、已注册的 AppBar 和窗口矩形，用于无界面的压力测试
+
+SimulatedShell 同时实现 NativeApi 和 MonitorBackend 两个接口，可以直接替换原生调用层：
+AppBar 的 ABM_NEW/QUERYPOS/SETPOS/REMOVE 按 Shell 的冲突规则调整矩形并更新工作区域，
+SetWindowPos/DeferWindowPos 只修改内存中的窗口矩形（以及 SWP_SHOWWINDOW/SWP_HIDEWINDOW 对应的 WS_VISIBLE）；不计算窗口之间的遮挡，
+window_occluded() 返回 set_window_occluded() 指定的状态
+
+冲突规则:
+    QUERYPOS 依次检查任务栏和先登记的 AppBar（同一显示器上已保留的区域）：
+    同一边缘的向内推（例如左侧栏的 left 移到已有左侧栏的 right），
+    相邻边缘的截短长度（例如左侧栏避开顶部和底部的保留区域），对边不处理
+    SETPOS 再执行一次同样的调整后保留该矩形，工作区域随之变化，
+    并向其他 AppBar 发送 ABN_POSCHANGED、向所有窗口广播 WM_SETTINGCHANGE
+
+使用示例:
+    from appbar_helper import AppBar
+    from monitor_topology import MonitorTopology
+    from shell_simulator import SimulatedShell
+
+    shell = SimulatedShell([(0, 0, 1920, 1080), (1920, 0, 4480, 1440)])
+    topology = MonitorTopology(shell)
+    hwnd = shell.create_window((100, 100, 500, 900))
+    appbar = AppBar(hwnd, topology=topology, native=shell)
+    appbar.register()
+    print(shell.work_area(0), shell.window_rect(hwnd))
+"""
+
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from appbar_events import (ABN_FULLSCREENAPP, ABN_POSCHANGED, SPI_SETWORKAREA,
+                           WM_SETTINGCHANGE, WM_WTSSESSION_CHANGE, WTS_SESSION_LOCK,
+                           WTS_SESSION_UNLOCK)
+from appbar_layout import ABE_BOTTOM, ABE_LEFT, ABE_RIGHT, ABE_TOP
+from appbar_native import OCCLUSION_WINDOW_LIMIT, NativeApi
+from monitor_topology import DEFAULT_DPI, MonitorBackend, MonitorInfo
+
+Rect = Tuple[int, int, int, int]
+
+ABM_NEW = 0x00
+ABM_REMOVE = 0x01
+ABM_QUERYPOS = 0x02
+ABM_SETPOS = 0x03
+ABM_SETAUTOHIDEBAREX = 0x0C
+
+# 模拟器分配的句柄从这里开始，便于与真实句柄区分
+_FIRST_HANDLE = 0x10000
+GWL_STYLE = -16
+GWL_EXSTYLE = -20
+WS_OVERLAPPEDWINDOW = 0x00CF0000
+WS_VISIBLE = 0x10000000
+SWP_NOSIZE = 0x0001
+SWP_NOMOVE = 0x0002
+SWP_SHOWWINDOW = 0x0040
+SWP_HIDEWINDOW = 0x0080
+
+
+class SimulatedAppBarData:
+    """与 APPBARDATA 字段相同的纯 Python 结构"""
+
+    __slots__ = ('cbSize', 'hWnd', 'uCallbackMessage', 'uEdge', 'rc', 'lParam')
+
+    def __init__(self, hwnd: int, callback_message: int = 0, edge: int = 0):
+        self.cbSize = 0
+        self.hWnd = hwnd
+        self.uCallbackMessage = callback_message
+        self.uEdge = edge
+        self.rc = [0, 0, 0, 0]
+        self.lParam = 0
+
+
+class _Bar:
+    """已注册的 AppBar"""
+
+    __slots__ = ('hwnd', 'callback_message', 'edge', 'rect', 'monitor')
+
+    def __init__(self, hwnd: int, callback_message: int):
+        self.hwnd = hwnd
+        self.callback_message = callback_message
+        self.edge = ABE_LEFT
+        self.rect: Optional[Rect] = None
+        self.monitor = -1
+
+
+class SimulatedShell(NativeApi, MonitorBackend):
+    """
+    模拟的 Shell 和窗口管理器
+
+    monitors 可以是矩形或 MonitorInfo；主显示器上有一个任务栏，
+    taskbar_size 为 0 时不模拟任务栏
+    """
+
+    def __init__(self, monitors: Sequence,
+                 taskbar_edge: int = ABE_BOTTOM,
+                 taskbar_size: int = 40,
+                 dpi: int = DEFAULT_DPI):
+        super().__init__()
+        self._monitors: List[MonitorInfo] = []
+        for i, item in enumerate(monitors):
+            if isinstance(item, MonitorInfo):
+                info = item
+            else:
+                info = MonitorInfo(handle=_FIRST_HANDLE + i, monitor=tuple(item),
+                                   work=tuple(item), dpi=dpi, primary=i == 0,
+                                   device=f'\\\\.\\DISPLAY{i + 1}')
+            self._monitors.append(info)
+        if not self._monitors:
+            raise ValueError("至少需要一个显示器")
+
+        self._windows: Dict[int, Rect] = {}
+        self._window_longs: Dict[Tuple[int, int], int] = {}
+        self._bars: Dict[int, _Bar] = {}
+        self._autohide: Dict[Tuple[int, int], int] = {}
+        self._next_handle = _FIRST_HANDLE + 0x1000
+        self._defer: Dict[int, List[tuple]] = {}
+        self._session_windows: Set[int] = set()
+        self._occluded: Set[int] = set()
+
+        # 任务栏作为最先登记的保留区域，不对应任何窗口
+        self._taskbar: Optional[_Bar] = None
+        if taskbar_size > 0:
+            primary = self._primary_index()
+            taskbar = _Bar(0, 0)
+            taskbar.edge = taskbar_edge
+            taskbar.monitor = primary
+            taskbar.rect = _edge_rect(self._monitors[primary].monitor, taskbar_edge, taskbar_size)
+            self._taskbar = taskbar
+        self._work: List[Rect] = []
+        self._update_work_areas()
+
+        # 消息回调：(hwnd, message, wparam, lparam)
+        self.on_message: Optional[Callable[[int, int, int, int], None]] = None
+        self.messages_sent = 0
+        self.work_area_changes = 0
+
+    # ---- 模拟器接口 ----
+
+    def create_window(self, rect: Rect = (0, 0, 400, 600), hwnd: Optional[int] = None) -> int:
+        """
+        创建一个窗口并返回句柄
+
+        Args:
+            rect: 窗口矩形
+            hwnd: 使用指定的句柄，例如登记 Qt 窗口的 winId()
+        """
+        if hwnd is None:
+            hwnd = self._next_handle
+            self._next_handle += 4
+        self._windows[int(hwnd)] = tuple(rect)
+        self._window_longs[(int(hwnd), GWL_STYLE)] = WS_OVERLAPPEDWINDOW
+        self._window_longs[(int(hwnd), GWL_EXSTYLE)] = 0
+        return int(hwnd)
+
+    def destroy_window(self, hwnd: int):
+        """销毁窗口，已注册的 AppBar 随之移除（与 Shell 的行为一致）"""
+        if hwnd in self._bars:
+            self._remove(hwnd)
+        self._windows.pop(hwnd, None)
+        self._window_longs.pop((hwnd, GWL_STYLE), None)
+        self._window_longs.pop((hwnd, GWL_EXSTYLE), None)
+        self._session_windows.discard(hwnd)
+        self._occluded.discard(hwnd)
+
+    def window_rect(self, hwnd: int) -> Rect:
+        return self._windows[hwnd]
+
+    def work_area(self, index: int = 0) -> Rect:
+        """返回第 index 个显示器当前的工作区域"""
+        return self._work[index]
+
+    def reserved_rects(self, index: Optional[int] = None) -> List[Tuple[int, int, Rect]]:
+        """
+        返回已保留的区域
+
+        Returns:
+            list: (hwnd, edge, rect)，任务栏的 hwnd 为 0
+        """
+        return [(bar.hwnd, bar.edge, bar.rect) for bar in self._reservations()
+                if index is None or bar.monitor == index]
+
+    @property
+    def appbar_count(self) -> int:
+        return len(self._bars)
+
+    def set_fullscreen_app(self, active: bool):
+        """模拟全屏应用出现或消失：向所有 AppBar 发送 ABN_FULLSCREENAPP"""
+        for bar in list(self._bars.values()):
+            if bar.callback_message:
+                self._send(bar.hwnd, bar.callback_message, ABN_FULLSCREENAPP, int(active))
+
+    def set_session_locked(self, locked: bool):
+        """模拟会话锁定或解锁：向登记了会话通知的窗口发送 WM_WTSSESSION_CHANGE"""
+        code = WTS_SESSION_LOCK if locked else WTS_SESSION_UNLOCK
+        for hwnd in list(self._session_windows):
+            self._send(hwnd, WM_WTSSESSION_CHANGE, code, 0)
+
+    def set_window_occluded(self, hwnd: int, occluded: bool):
+        """模拟窗口被上层窗口完全覆盖或重新露出，之后 window_occluded() 返回该状态"""
+        if occluded:
+            self._occluded.add(int(hwnd))
+        else:
+            self._occluded.discard(int(hwnd))
+
+    # ---- MonitorBackend ----
+
+    def enumerate_monitors(self) -> List[MonitorInfo]:
+        return [info._replace(work=work) for info, work in zip(self._monitors, self._work)]
+
+    def monitor_from_window(self, hwnd: int) -> int:
+        rect = self._windows.get(int(hwnd))
+        if rect is None:
+            return self._monitors[self._primary_index()].handle
+        return self._monitors[self._monitor_index(rect)].handle
+
+    # ---- NativeApi ----
+
+    def new_appbardata(self, hwnd: int, callback_message: int = 0, edge: int = 0):
+        return SimulatedAppBarData(int(hwnd), callback_message, edge)
+
+    @staticmethod
+    def pointer(abd):
+        return abd
+
+    def shappbarmessage(self, msg: int, abd_ptr) -> int:
+        start = time.perf_counter_ns()
+        abd = abd_ptr
+        hwnd = int(abd.hWnd)
+        result = 0
+        if msg == ABM_NEW:
+            if hwnd not in self._bars:
+                self._bars[hwnd] = _Bar(hwnd, abd.uCallbackMessage)
+                result = 1
+        elif msg == ABM_REMOVE:
+            if hwnd in self._bars:
+                self._remove(hwnd)
+            result = 1
+        elif msg == ABM_QUERYPOS:
+            if hwnd in self._bars:
+                abd.rc[0:4] = self._query_pos(hwnd, abd.uEdge, tuple(abd.rc))
+                result = 1
+        elif msg == ABM_SETPOS:
+            bar = self._bars.get(hwnd)
+            if bar is not None:
+                rect = self._query_pos(hwnd, abd.uEdge, tuple(abd.rc))
+                abd.rc[0:4] = rect
+                bar.edge = abd.uEdge
+                bar.rect = rect
+                bar.monitor = self._monitor_index(rect)
+                self._reservations_changed(hwnd)
+                result = 1
+        elif msg == ABM_SETAUTOHIDEBAREX:
+            key = (self._monitor_index(tuple(abd.rc)), abd.uEdge)
+            owner = self._autohide.get(key)
+            if abd.lParam:
+                if owner is None or owner == hwnd:
+                    self._autohide[key] = hwnd
+                    result = 1
+            elif owner == hwnd:
+                del self._autohide[key]
+                result = 1
+        self._record('SHAppBarMessage', time.perf_counter_ns() - start, bool(result))
+        return result
+
+    def set_window_pos(self, hwnd: int, insert_after: int,
+                       x: int, y: int, cx: int, cy: int, flags: int) -> bool:
+        start = time.perf_counter_ns()
+        ok = int(hwnd) in self._windows
+        if ok:
+            l, t, r, b = self._windows[int(hwnd)]
+            if flags & SWP_NOMOVE:
+                x, y = l, t
+            if flags & SWP_NOSIZE:
+                cx, cy = r - l, b - t
+            self._windows[int(hwnd)] = (x, y, x + cx, y + cy)
+            if flags & (SWP_SHOWWINDOW | SWP_HIDEWINDOW):
+                key = (int(hwnd), GWL_STYLE)
+                style = self._window_longs[key] & ~WS_VISIBLE
+                self._window_longs[key] = style | (WS_VISIBLE if flags & SWP_SHOWWINDOW else 0)
+        self._record('SetWindowPos', time.perf_counter_ns() - start, ok)
+        return ok
+
+    def get_window_rect(self, hwnd: int) -> Rect:
+        start = time.perf_counter_ns()
+        rect = self._windows.get(int(hwnd), (0, 0, 0, 0))
+        self._record('GetWindowRect', time.perf_counter_ns() - start, int(hwnd) in self._windows)
+        return rect
+
+    def window_occluded(self, hwnd: int, limit: int = OCCLUSION_WINDOW_LIMIT) -> bool:
+        start = time.perf_counter_ns()
+        occluded = int(hwnd) in self._occluded
+        self._record('WindowOccluded', time.perf_counter_ns() - start, int(hwnd) in self._windows)
+        return occluded
+
+    def get_window_long(self, hwnd: int, index: int) -> int:
+        start = time.perf_counter_ns()
+        value = self._window_longs.get((int(hwnd), index), 0)
+        self._record('GetWindowLongPtr', time.perf_counter_ns() - start)
+        return value
+
+    def set_window_long(self, hwnd: int, index: int, value: int) -> int:
+        start = time.perf_counter_ns()
+        ok = int(hwnd) in self._windows
+        previous = 0
+        if ok:
+            previous = self._window_longs.get((int(hwnd), index), 0)
+            self._window_longs[(int(hwnd), index)] = value
+        self._record('SetWindowLongPtr', time.perf_counter_ns() - start, ok)
+        return previous
+
+    def register_session_notification(self, hwnd: int) -> bool:
+        start = time.perf_counter_ns()
+        ok = int(hwnd) in self._windows
+        if ok:
+            self._session_windows.add(int(hwnd))
+        self._record('WTSRegisterSessionNotification', time.perf_counter_ns() - start, ok)
+        return ok
+
+    def unregister_session_notification(self, hwnd: int) -> bool:
+        start = time.perf_counter_ns()
+        ok = int(hwnd) in self._session_windows
+        self._session_windows.discard(int(hwnd))
+        self._record('WTSUnRegisterSessionNotification', time.perf_counter_ns() - start, ok)
+        return ok
+
+    def begin_defer_window_pos(self, count: int) -> int:
+        start = time.perf_counter_ns()
+        hdwp = self._next_handle
+        self._next_handle += 4
+        self._defer[hdwp] = []
+        self._record('BeginDeferWindowPos', time.perf_counter_ns() - start)
+        return hdwp
+
+    def defer_window_pos(self, hdwp: int, hwnd: int, insert_after: int,
+                         x: int, y: int, cx: int, cy: int, flags: int) -> int:
+        start = time.perf_counter_ns()
+        moves = self._defer.get(hdwp)
+        ok = moves is not None and int(hwnd) in self._windows
+        if ok:
+            moves.append((int(hwnd), (x, y, x + cx, y + cy)))
+        else:
+            # 与系统一致：失败时句柄被释放
+            self._defer.pop(hdwp, None)
+        self._record('DeferWindowPos', time.perf_counter_ns() - start, ok)
+        return hdwp if ok else 0
+
+    def end_defer_window_pos(self, hdwp: int) -> bool:
+        start = time.perf_counter_ns()
+        moves = self._defer.pop(hdwp, None)
+        if moves is not None:
+            for hwnd, rect in moves:
+                self._windows[hwnd] = rect
+        self._record('EndDeferWindowPos', time.perf_counter_ns() - start, moves is not None)
+        return moves is not None
+
+    # ---- 内部实现 ----
+
+    def _primary_index(self) -> int:
+        for i, info in enumerate(self._monitors):
+            if info.primary:
+                return i
+        return 0
+
+    def _monitor_index(self, rect: Rect) -> int:
+        """矩形中心所在的显示器，不在任何显示器上时取最近的"""
+        x = (rect[0] + rect[2]) // 2
+        y = (rect[1] + rect[3]) // 2
+        best, best_distance = 0, None
+        for i, info in enumerate(self._monitors):
+            l, t, r, b = info.monitor
+            if l <= x < r and t <= y < b:
+                return i
+            dx = max(l - x, 0, x - r + 1)
+            dy = max(t - y, 0, y - b + 1)
+            distance = dx * dx + dy * dy
+            if best_distance is None or distance < best_distance:
+                best, best_distance = i, distance
+        return best
+
+    def _reservations(self) -> List[_Bar]:
+        bars = [bar for bar in self._bars.values() if bar.rect is not None]
+        if self._taskbar is not None:
+            bars.insert(0, self._taskbar)
+        return bars
+
+    def _query_pos(self, hwnd: int, edge: int, rect: Rect) -> Rect:
+        """按冲突规则调整提议的矩形"""
+        l, t, r, b = rect
+        monitor = self._monitor_index(rect)
+        for other in self._reservations():
+            if other.hwnd == hwnd or other.monitor != monitor:
+                continue
+            ol, ot, orr, ob = other.rect
+            if ol >= r or orr <= l or ot >= b or ob <= t:
+                continue
+            if other.edge == edge:
+                if edge == ABE_LEFT:
+                    l = orr
+                elif edge == ABE_RIGHT:
+                    r = ol
+                elif edge == ABE_TOP:
+                    t = ob
+                else:
+                    b = ot
+            elif edge in (ABE_LEFT, ABE_RIGHT):
+                if other.edge == ABE_TOP:
+                    t = max(t, ob)
+                elif other.edge == ABE_BOTTOM:
+                    b = min(b, ot)
+            else:
+                if other.edge == ABE_LEFT:
+                    l = max(l, orr)
+                elif other.edge == ABE_RIGHT:
+                    r = min(r, ol)
+        return l, t, max(l, r), max(t, b)
+
+    def _remove(self, hwnd: int):
+        bar = self._bars.pop(hwnd)
+        for key, owner in list(self._autohide.items()):
+            if owner == hwnd:
+                del self._autohide[key]
+        if bar.rect is not None:
+            self._reservations_changed(hwnd)
+
+    def _update_work_areas(self) -> bool:
+        work = [list(info.monitor) for info in self._monitors]
+        for bar in self._reservations():
+            area = work[bar.monitor]
+            l, t, r, b = bar.rect
+            if bar.edge == ABE_LEFT:
+                area[0] = max(area[0], r)
+            elif bar.edge == ABE_RIGHT:
+                area[2] = min(area[2], l)
+            elif bar.edge == ABE_TOP:
+                area[1] = max(area[1], b)
+            else:
+                area[3] = min(area[3], t)
+        work = [tuple(area) for area in work]
+        changed = work != self._work
+        self._work = work
+        return changed
+
+    def _reservations_changed(self, source: int):
+        if not self._update_work_areas():
+            return
+        self.work_area_changes += 1
+        for bar in list(self._bars.values()):
+            if bar.hwnd != source and bar.callback_message:
+                self._send(bar.hwnd, bar.callback_message, ABN_POSCHANGED, 0)
+        for hwnd in list(self._windows):
+            self._send(hwnd, WM_SETTINGCHANGE, SPI_SETWORKAREA, 0)
+
+    def _send(self, hwnd: int, message: int, wparam: int, lparam: int):
+        self.messages_sent += 1
+        if self.on_message is not None:
+            self.on_message(hwnd, message, wparam, lparam)
+
+
+def _edge_rect(area: Rect, edge: int, size: int) -> Rect:
+    l, t, r, b = area
+    if edge == ABE_LEFT:
+        return l, t, l + size, b
+    if edge == ABE_RIGHT:
+        return r - size, t, r, b
+    if edge == ABE_TOP:
+        return l, t, r, t + size
+    return l, b - size, r, b
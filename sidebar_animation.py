@@ -0,0 +1,203 @@
+"""
+侧边栏滑入/滑出动画模块
+预先计算全部关键帧的窗口矩形，由高精度定时器按帧驱动，每帧只移动窗口
+
+帧调度以动画开始时间为基准：某一帧处理延迟时直接跳到当前时间对应的关键帧，
+不会让动画整体变慢，被跳过的帧计入丢帧数
+
+使用示例:
+    animator = SlideAnimator(appbar.move_window)
+    frames = slide_keyframes(target_rect, edge, duration_ms=200)
+    animator.start(frames, on_finished=appbar.register)
+"""
+
+import time
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from PySide6.QtCore import QObject, Qt, QTimer, Signal
+
+from appbar_layout import ABE_BOTTOM, ABE_LEFT, ABE_RIGHT, ABE_TOP
+
+Rect = Tuple[int, int, int, int]
+
+DEFAULT_FRAME_MS = 1000.0 / 60.0
+
+
+def ease_out_cubic(t: float) -> float:
+    """先快后慢的缓动曲线"""
+    t = 1.0 - t
+    return 1.0 - t * t * t
+
+
+def offscreen_rect(rect: Sequence[int], edge: int) -> Rect:
+    """返回把矩形沿所在边缘整体移出屏幕后的位置"""
+    l, t, r, b = rect
+    if edge == ABE_LEFT:
+        return l - (r - l), t, l, b
+    if edge == ABE_RIGHT:
+        return r, t, r + (r - l), b
+    if edge == ABE_TOP:
+        return l, t - (b - t), r, t
+    if edge == ABE_BOTTOM:
+        return l, b, r, b + (b - t)
+    raise ValueError(f"不支持的边缘: {edge}")
+
+
+def precompute_keyframes(start: Sequence[int], end: Sequence[int], frames: int,
+                         easing: Callable[[float], float] = ease_out_cubic) -> List[Rect]:
+    """
+    预先计算从 start 到 end 的关键帧
+
+    Args:
+        start: 起始矩形
+        end: 结束矩形
+        frames: 帧数（不含起始帧，最后一帧等于 end）
+        easing: 缓动函数
+
+    Returns:
+        list: 每一帧的矩形
+    """
+    frames = max(1, frames)
+    keyframes = []
+    for i in range(1, frames + 1):
+        k = easing(i / frames)
+        keyframes.append(tuple(int(round(s + (e - s) * k)) for s, e in zip(start, end)))
+    keyframes[-1] = tuple(end)
+    return keyframes
+
+
+def slide_keyframes(docked: Sequence[int], edge: int, duration_ms: float,
+                    slide_in: bool = True,
+                    frame_ms: float = DEFAULT_FRAME_MS) -> List[Rect]:
+    """
+    计算滑入（从屏幕外到停靠位置）或滑出（从停靠位置到屏幕外）的关键帧
+
+    Returns:
+        list: 每一帧的矩形
+    """
+    hidden = offscreen_rect(docked, edge)
+    frames = int(round(duration_ms / frame_ms))
+    if slide_in:
+        return precompute_keyframes(hidden, docked, frames)
+    return precompute_keyframes(docked, hidden, frames)
+
+
+class FrameStats:
+    """动画帧统计"""
+
+    def __init__(self, frame_ms: float):
+        self.frame_ms = frame_ms
+        self.frames = 0
+        self.dropped = 0
+        self.frame_times = array('d')
+        self.animations = 0
+
+    def reset(self):
+        self.frames = 0
+        self.dropped = 0
+        self.frame_times = array('d')
+
+    def as_dict(self) -> Dict[str, float]:
+        times = sorted(self.frame_times)
+        return {
+            'animations': self.animations,
+            'frames': self.frames,
+            'dropped_frames': self.dropped,
+            'frame_ms_avg': sum(times) / len(times) if times else 0.0,
+            'frame_ms_p95': times[int(len(times) * 0.95)] if times else 0.0,
+            'frame_ms_max': times[-1] if times else 0.0,
+        }
+
+
+class SlideAnimator(QObject):
+    """
+    按帧驱动的窗口移动动画
+
+    move 负责把窗口移动到给定矩形（通常为 AppBar.move_window，只调用 SetWindowPos）
+    """
+
+    finished = Signal()
+
+    def __init__(self, move: Callable[[Rect], object],
+                 frame_ms: float = DEFAULT_FRAME_MS,
+                 parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.move = move
+        self.frame_ms = frame_ms
+        self.stats = FrameStats(frame_ms)
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+        self._keyframes: List[Rect] = []
+        self._index = -1
+        self._start = 0.0
+        self._last = 0.0
+        self._on_finished: Optional[Callable[[], None]] = None
+
+    @property
+    def running(self) -> bool:
+        """动画是否正在进行"""
+        return self._timer.isActive()
+
+    def start(self, keyframes: List[Rect], on_finished: Optional[Callable[[], None]] = None):
+        """
+        开始动画
+
+        Args:
+            keyframes: 预先计算的关键帧
+            on_finished: 动画正常结束后调用（被 stop() 中止时不调用）
+        """
+        self.stop()
+        self._keyframes = list(keyframes)
+        self._on_finished = on_finished
+        self._index = -1
+        self.stats.reset()
+        self.stats.animations += 1
+        self._start = self._last = time.perf_counter()
+        self._timer.start(max(1, int(self.frame_ms)))
+        self._tick()
+
+    def stop(self) -> bool:
+        """
+        中止动画，窗口停在当前帧
+
+        Returns:
+            bool: 中止前动画是否正在进行
+        """
+        running = self._timer.isActive()
+        self._timer.stop()
+        self._on_finished = None
+        return running
+
+    def finish(self):
+        """立即跳到最后一帧并结束动画（例如窗口关闭时）"""
+        if not self._timer.isActive():
+            return
+        self._index = len(self._keyframes) - 2
+        self._start = time.perf_counter() - len(self._keyframes) * self.frame_ms / 1000.0
+        self._tick()
+
+    def _tick(self):
+        now = time.perf_counter()
+        elapsed_ms = (now - self._start) * 1000.0
+        if self._index >= 0:
+            delta_ms = (now - self._last) * 1000.0
+            self.stats.frame_times.append(delta_ms)
+        self._last = now
+
+        target = min(len(self._keyframes) - 1, int(elapsed_ms / self.frame_ms))
+        if self._index >= 0 and target > self._index + 1:
+            self.stats.dropped += target - self._index - 1
+        if target > self._index:
+            self._index = target
+            self.move(self._keyframes[target])
+            self.stats.frames += 1
+
+        if self._index >= len(self._keyframes) - 1:
+            self._timer.stop()
+            callback = self._on_finished
+            self._on_finished = None
+            if callback:
+                callback()
+            self.finished.emit()
@@ -0,0 +1,305 @@
+"""
+侧边栏配置模型
+用 __slots__ 保存的类型化配置对象，取代原来的普通字典
+
+每个字段的校验函数在类创建时编译一次，赋值时直接调用；
+update() 返回实际发生变化的字段，diff() 逐字段比较两个配置，
+调用方可以只处理真正变化的参数
+
+配置档中记录 version，读取旧版本时先依次执行迁移函数，
+未知的键（如旧版的 direction）和格式错误的值被丢弃并使用默认值
+
+上次退出时的嵌入状态和窗口几何信息保存在同一个配置档中，但属于运行状态，
+由 SidebarState 单独读写，不是 SidebarConfig 的字段
+
+使用示例:
+    from sidebar_config import SidebarConfig
+
+    config = SidebarConfig(edge='right', width=320)
+    changed = config.update(width=360, top_offset=0)   # {'width'}
+    data = config.to_dict()                             # 保存到配置档
+    config = SidebarConfig.from_dict(data)              # 从配置档读取
+"""
+
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from appbar_layout import EDGE_NAMES
+from sidebar_trace import tracer, WARNING
+
+# 当前配置档格式版本；没有 version 键的配置档视为版本 1
+CONFIG_VERSION = 2
+
+_GEOMETRY_KEYS = ('x', 'y', 'width', 'height')
+
+# 配置档中保存运行状态的键，由 SidebarState 读写
+STATE_KEYS = ('is_embedded', 'window_geometry')
+
+
+class Field:
+    """配置字段声明"""
+
+    __slots__ = ('type', 'default', 'choices', 'minimum', 'optional', 'check')
+
+    def __init__(self, type: type, default: Any,
+                 choices: Optional[Tuple[Any, ...]] = None,
+                 minimum: Optional[int] = None,
+                 optional: bool = False,
+                 check: Optional[Callable[[Any], Any]] = None):
+        """
+        Args:
+            type: 值的类型
+            default: 默认值
+            choices: 允许的取值
+            minimum: 整数下限
+            optional: 是否允许 None
+            check: 额外的校验函数，返回规范化后的值，不合法时抛出 ValueError
+        """
+        self.type = type
+        self.default = default
+        self.choices = choices
+        self.minimum = minimum
+        self.optional = optional
+        self.check = check
+
+
+def _compile(name: str, field: Field) -> Callable[[Any], Any]:
+    """为字段生成校验函数，只在类创建时执行一次"""
+    expected = field.type
+    choices = field.choices
+    minimum = field.minimum
+    optional = field.optional
+    check = field.check
+
+    def validate(value):
+        if value is None and optional:
+            return None
+        # bool 是 int 的子类，整数字段不接受 True/False
+        if type(value) is not expected and not (expected is int and type(value) is float
+                                                and value.is_integer()):
+            raise ValueError(f"配置参数 {name} 应为 {expected.__name__}: {value!r}")
+        if expected is int:
+            value = int(value)
+            if minimum is not None and value < minimum:
+                raise ValueError(f"配置参数 {name} 不能小于 {minimum}: {value}")
+        if choices is not None and value not in choices:
+            raise ValueError(f"配置参数 {name} 只能是 {', '.join(map(str, choices))}: {value!r}")
+        if check is not None:
+            value = check(value)
+        return value
+
+    return validate
+
+
+def _check_geometry(value: Dict[str, Any]) -> Dict[str, int]:
+    try:
+        return {key: int(value[key]) for key in _GEOMETRY_KEYS}
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"窗口几何信息格式错误: {value!r}") from None
+
+
+class _ConfigMeta(type):
+    """把类体中的 Field 声明转换为 __slots__、默认值和编译后的校验函数"""
+
+    def __new__(mcs, name, bases, namespace):
+        fields = {key: value for key, value in namespace.items() if isinstance(value, Field)}
+        for key in fields:
+            del namespace[key]
+        namespace['__slots__'] = tuple(fields)
+        namespace['_fields'] = tuple(fields)
+        namespace['_defaults'] = {key: field.default for key, field in fields.items()}
+        namespace['_validators'] = {key: _compile(key, field) for key, field in fields.items()}
+        return super().__new__(mcs, name, bases, namespace)
+
+
+def _migrate_v1(data: Dict[str, Any]) -> Dict[str, Any]:
+    """版本 1 -> 2：direction 由 edge 取代"""
+    direction = data.pop('direction', None)
+    if 'edge' not in data and direction in (0, 1):
+        data['edge'] = 'left' if direction == 0 else 'right'
+    return data
+
+
+# 版本 n 的配置档经 MIGRATIONS[n] 升级到版本 n + 1
+MIGRATIONS: Dict[int, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    1: _migrate_v1,
+}
+
+
+def migrate(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    将旧版本的配置档升级到 CONFIG_VERSION
+
+    Returns:
+        dict: 升级后的新字典（不修改传入的字典）
+    """
+    data = dict(data)
+    version = data.pop('version', 1)
+    # 格式错误的版本号按版本 1 处理
+    if type(version) is not int:
+        version = 1
+    while version < CONFIG_VERSION:
+        data = MIGRATIONS[version](data)
+        version += 1
+    return data
+
+
+class SidebarConfig(metaclass=_ConfigMeta):
+    """侧边栏配置"""
+
+    edge = Field(str, 'left', choices=tuple(EDGE_NAMES))  # 所在边缘
+    width = Field(int, 300, minimum=1)                    # 宽度（逻辑像素）
+    top_offset = Field(int, 0)                            # 顶部偏移（逻辑像素）
+    auto_save = Field(bool, True)                         # 是否自动保存配置
+    animate = Field(bool, False)                          # 嵌入/取消嵌入时是否播放动画
+    animation_ms = Field(int, 200, minimum=0)             # 动画时长（毫秒）
+    auto_hide = Field(bool, False)                        # 自动隐藏
+    auto_hide_strip = Field(int, 4, minimum=1)            # 自动隐藏时收起的细条厚度
+    resizable = Field(bool, True)                         # 是否可以拖动内侧边缘调整宽度
+    restyle_in_place = Field(bool, True)                  # 就地修改窗口样式，不重建原生窗口
+    tool_window = Field(bool, True)                       # 嵌入时不在任务栏上显示按钮
+    suspend_unembedded = Field(bool, True)                # 取消嵌入后暂停登记的定时器、数据源等
+
+    def __init__(self, **values):
+        """
+        创建配置，未指定的字段使用默认值
+
+        Raises:
+            ValueError: 参数不存在或值不合法
+        """
+        for name, value in self._defaults.items():
+            object.__setattr__(self, name, value)
+        if values:
+            self.update(**values)
+
+    def __setattr__(self, name: str, value: Any):
+        validate = self._validators.get(name)
+        if validate is None:
+            raise ValueError(f"不支持的配置参数: {name}")
+        object.__setattr__(self, name, validate(value))
+
+    def update(self, **changes) -> Set[str]:
+        """
+        修改配置；任一参数不合法时不做任何修改
+
+        Returns:
+            set: 实际发生变化的字段
+        """
+        validated = {}
+        for name, value in changes.items():
+            validate = self._validators.get(name)
+            if validate is None:
+                raise ValueError(f"不支持的配置参数: {name}")
+            validated[name] = validate(value)
+
+        changed = set()
+        for name, value in validated.items():
+            if getattr(self, name) != value:
+                object.__setattr__(self, name, value)
+                changed.add(name)
+        return changed
+
+    def diff(self, other: 'SidebarConfig') -> Set[str]:
+        """返回与另一个配置不同的字段"""
+        return {name for name in self._fields if getattr(self, name) != getattr(other, name)}
+
+    def copy(self) -> 'SidebarConfig':
+        config = object.__new__(type(self))
+        for name in self._fields:
+            object.__setattr__(config, name, getattr(self, name))
+        return config
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any],
+                  defaults: Optional['SidebarConfig'] = None) -> 'SidebarConfig':
+        """
+        从配置档创建配置
+
+        先执行版本迁移；未知的键被忽略，不合法的值使用默认值；
+        运行状态的键（STATE_KEYS）由 SidebarState 读取
+
+        Args:
+            data: 配置档内容
+            defaults: 默认配置，缺省使用各字段的默认值
+        """
+        config = defaults.copy() if defaults is not None else cls()
+        dropped = []
+        for name, value in migrate(data).items():
+            validate = cls._validators.get(name)
+            if validate is None:
+                if name not in STATE_KEYS:
+                    dropped.append(name)
+                continue
+            try:
+                object.__setattr__(config, name, validate(value))
+            except ValueError:
+                dropped.append(name)
+        if dropped and tracer.enabled:
+            tracer.event('config.dropped_keys', WARNING, keys=dropped)
+        return config
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为保存到配置档的字典"""
+        data: Dict[str, Any] = {'version': CONFIG_VERSION}
+        for name in self._fields:
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value
+        return data
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """兼容字典写法 config.get('width')"""
+        return getattr(self, name, default)
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._validators:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._validators
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SidebarConfig):
+            return NotImplemented
+        return not self.diff(other)
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self._fields)
+        return f'{type(self).__name__}({fields})'
+
+
+class SidebarState:
+    """
+    上次保存时的运行状态：是否处于嵌入状态，以及普通窗口的几何信息
+
+    与配置一起保存在配置档中，但不是配置：修改它不会触发配置变化或自动保存
+    """
+
+    __slots__ = ('is_embedded', 'window_geometry')
+
+    def __init__(self, is_embedded: bool = False,
+                 window_geometry: Optional[Dict[str, int]] = None):
+        self.is_embedded = is_embedded
+        self.window_geometry = window_geometry
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SidebarState':
+        """从配置档读取，格式错误的值使用默认值"""
+        is_embedded = data.get('is_embedded') is True
+        geometry = data.get('window_geometry')
+        try:
+            geometry = _check_geometry(geometry) if isinstance(geometry, dict) else None
+        except ValueError:
+            geometry = None
+        return cls(is_embedded, geometry)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为保存到配置档的字典"""
+        data: Dict[str, Any] = {'is_embedded': self.is_embedded}
+        if self.window_geometry is not None:
+            data['window_geometry'] = dict(self.window_geometry)
+        return data
+
+    def __repr__(self) -> str:
+        return (f'{type(self).__name__}(is_embedded={self.is_embedded!r}, '
+                f'window_geometry={self.window_geometry!r})')
@@ -0,0 +1,190 @@
+"""
+侧边栏数据源的逐帧投递
+FeedHub 在后台线程池中轮询数据源（见 feed_scheduler），差异在工作线程中计算，
+GUI线程每帧最多收到一次合并后的更新，不再为每个面板单独创建轮询定时器
+
+使用示例:
+    from sidebar_feeds import FeedHub
+    from feed_scheduler import Feed
+
+    hub = FeedHub(window)
+    hub.add_rows('services', read_service_health, panel, interval=0.5)   # VirtualListPanel
+    hub.add(Feed('cpu', read_cpu_percent, interval=1.0), handler=label_update)
+    hub.start()
+    ...
+    hub.stop()
+"""
+
+import time
+from typing import Any, Callable, Dict, Optional
+
+from PySide6.QtCore import QObject, Qt, QTimer, Signal
+
+from appbar_events import FRAME_INTERVAL, RepositionThrottle
+from feed_scheduler import Feed, FeedScheduler, RowDelta, diff_rows, merge_rows
+from sidebar_trace import tracer, WARNING
+
+
+def apply_row_delta(panel, delta: RowDelta):
+    """
+    将行差异应用到 VirtualListPanel（或 RowListModel）
+
+    删除的行只重建一次索引，已有的行合并为一次 dataChanged，新行合并为一次插入
+    """
+    model = getattr(panel, 'list_model', panel)
+    if delta.removed:
+        model.remove_rows(delta.removed)
+    store = model.store
+    updates = []
+    appends = []
+    for key, (text, status, value) in delta.upserts.items():
+        if key in store:
+            updates.append((key, text, status, value))
+        else:
+            appends.append((key, text, status, value))
+    if updates:
+        model.update_rows(updates)
+    if appends:
+        model.append_rows(appends)
+
+
+class FeedHub(QObject):
+    """
+    数据源集合
+
+    工作线程中出现新差异时通过排队信号唤醒GUI线程，
+    再经 RepositionThrottle 合并为每帧最多一次投递
+    """
+
+    # 每帧最多一次，参数为 {数据源名称: 合并后的差异}
+    updated = Signal(dict)
+    # 数据源轮询失败或处理函数出错 (name, message)
+    feedError = Signal(str, str)
+
+    # 从工作线程发出，排队到GUI线程处理
+    _wake = Signal()
+    _poll_failed = Signal(str, str)
+
+    def __init__(self, parent: Optional[QObject] = None, workers: int = 4,
+                 interval: float = FRAME_INTERVAL):
+        """
+        Args:
+            parent: 父对象
+            workers: 轮询线程数
+            interval: 两次投递之间的最小间隔（秒），默认一帧
+        """
+        super().__init__(parent)
+        self.scheduler = FeedScheduler(
+            notify=self._wake.emit, workers=workers,
+            on_error=lambda name, exc: self._poll_failed.emit(name, str(exc)))
+        self._handlers: Dict[str, Callable[[Any], None]] = {}
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._throttle = RepositionThrottle(
+            self._deliver,
+            lambda delay: self._timer.start(int(delay * 1000)),
+            interval,
+        )
+        self._timer.timeout.connect(self._throttle.fire)
+        # 连接到本对象的方法，跨线程时才会排队到GUI线程执行
+        self._wake.connect(self._on_wake)
+        self._poll_failed.connect(self.feedError)
+
+        self._frames = 0
+        self._deliver_ns = 0
+        self._max_deliver_ns = 0
+
+    def add(self, feed: Feed, handler: Optional[Callable[[Any], None]] = None,
+            delay: float = 0.0):
+        """
+        添加数据源
+
+        Args:
+            feed: 数据源
+            handler: 在GUI线程中以合并后的差异调用，也可以只连接 updated 信号
+            delay: 第一次轮询前的等待时间（秒）
+        """
+        if handler is not None:
+            self._handlers[feed.name] = handler
+        self.scheduler.add(feed, delay)
+
+    def add_rows(self, name: str, poll: Callable[[], Dict[str, tuple]], panel,
+                 interval: float = 1.0, **kwargs) -> Feed:
+        """
+        添加返回 {key: (text, status, value)} 快照的数据源，差异直接应用到列表面板
+
+        Args:
+            name: 数据源名称
+            poll: 读取快照的函数，在工作线程中执行
+            panel: VirtualListPanel 或 RowListModel
+            interval: 轮询间隔（秒）
+            **kwargs: 传给 Feed 的其他参数，例如 max_backoff
+        """
+        feed = Feed(name, poll, interval, diff=diff_rows, merge=merge_rows, **kwargs)
+        self.add(feed, lambda delta: apply_row_delta(panel, delta))
+        return feed
+
+    def remove(self, name: str) -> bool:
+        self._handlers.pop(name, None)
+        return self.scheduler.remove(name)
+
+    def start(self):
+        self.scheduler.start()
+
+    def stop(self):
+        """停止轮询并丢弃尚未投递的更新，重新启动后这些数据源重新投递完整数据"""
+        self._throttle.cancel()
+        self._timer.stop()
+        self.scheduler.stop()
+        self.scheduler.discard_updates()
+
+    def pause(self):
+        self.scheduler.pause()
+
+    def resume(self):
+        """恢复轮询，所有数据源立即补轮询一次"""
+        self.scheduler.resume()
+
+    def refresh(self, name: Optional[str] = None):
+        self.scheduler.refresh(name)
+
+    @property
+    def paused(self) -> bool:
+        return self.scheduler.paused
+
+    def get_stats(self) -> Dict[str, Any]:
+        """返回调度统计以及GUI线程中的投递次数和耗时"""
+        stats = self.scheduler.get_stats()
+        stats['frames'] = self._frames
+        stats['avg_deliver_ms'] = self._deliver_ns / self._frames / 1e6 if self._frames else 0.0
+        stats['max_deliver_ms'] = self._max_deliver_ns / 1e6
+        return stats
+
+    def _on_wake(self):
+        self._throttle.request()
+
+    def _deliver(self):
+        """每帧一次：取走全部差异，依次交给处理函数"""
+        updates = self.scheduler.take_updates()
+        if not updates:
+            return
+        start = time.perf_counter_ns()
+        with tracer.span('feeds.deliver', feeds=len(updates)):
+            for name, delta in updates.items():
+                handler = self._handlers.get(name)
+                if handler is None:
+                    continue
+                try:
+                    handler(delta)
+                except Exception as e:
+                    if tracer.enabled:
+                        tracer.event('feed.handler_failed', WARNING, feed=name, error=str(e))
+                    self.feedError.emit(name, str(e))
+            self.updated.emit(updates)
+        elapsed = time.perf_counter_ns() - start
+        self._frames += 1
+        self._deliver_ns += elapsed
+        if elapsed > self._max_deliver_ns:
+            self._max_deliver_ns = elapsed
@@ -0,0 +1,535 @@
+"""
+共享侧边栏宿主的本地通信模块
+一个宿主进程持有唯一的 AppBar 和停靠窗口，其他应用作为客户端通过本地命名管道
+（Windows）或 Unix 套接字连接，附加自己的面板并推送行更新，不再各自加载 PySide6、
+各自注册 AppBar 和保留一条屏幕区域；本模块不依赖 Qt，宿主窗口见 sidebar_host_app
+
+消息格式（multiprocessing.connection 的 send_bytes/recv_bytes 负责分帧和认证）:
+    1 字节操作码 | 2 字节面板名长度（小端）| 面板名（UTF-8）| 紧凑 JSON 负载（可省略）
+
+    HELLO   客户端 -> 宿主  {"name": 应用名, "pid": 进程号}
+    ATTACH  客户端 -> 宿主  {"title": 标题}，面板名在所有客户端之间唯一
+    DETACH  客户端 -> 宿主  删除面板
+    ROWS    客户端 -> 宿主  {"u": [[key, text, status, value], ...], "r": [key, ...]}
+    CLEAR   客户端 -> 宿主  清空面板中的行
+    PING    客户端 -> 宿主  任意负载，宿主在此前的更新全部应用到界面之后原样以 PONG 返回
+    ERROR   宿主 -> 客户端  {"message": 错误信息}
+
+同一面板在一帧内收到的多次 ROWS 在宿主中合并为一次（见 feed_scheduler.merge_rows），
+界面线程每帧取走一次全部更新
+
+使用示例:
+    from sidebar_host import HostClient
+    from row_store import STATUS_OK
+
+    client = HostClient.connect(name='monitor')       # 宿主未运行时抛出 ConnectionError
+    client.attach('monitor.services', title='服务')
+    client.update_rows('monitor.services', [('svc-1', 'nginx', STATUS_OK, 12.5)])
+    client.sync()                                     # 等待宿主应用完毕，返回往返耗时（秒）
+    client.close()
+"""
+
+import itertools
+import json
+import os
+import stat
+import struct
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from feed_scheduler import RowDelta, merge_rows
+from sidebar_trace import tracer, WARNING
+
+OP_HELLO = 1
+OP_ATTACH = 2
+OP_DETACH = 3
+OP_ROWS = 4
+OP_CLEAR = 5
+OP_PING = 6
+OP_PONG = 7
+OP_ERROR = 8
+
+# 认证密钥文件，首次使用时随机生成，只有当前用户可以读取
+KEY_FILE = 'host.key'
+
+_HEADER = struct.Struct('<BH')
+
+
+def runtime_dir() -> str:
+    """
+    当前用户私有的运行目录，保存认证密钥和 Unix 套接字
+
+    Windows 上为 %LOCALAPPDATA%\\DesktopSidebar（由用户配置文件的 ACL 保护），
+    其他平台为 $XDG_RUNTIME_DIR/desktop-sidebar，没有时为临时目录中按 uid 区分的目录，权限 0700
+
+    Raises:
+        OSError: 目录不是当前用户所有或是符号链接
+    """
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or tempfile.gettempdir()
+        path = os.path.join(base, 'DesktopSidebar')
+        os.makedirs(path, exist_ok=True)
+        return path
+    base = os.environ.get('XDG_RUNTIME_DIR')
+    path = (os.path.join(base, 'desktop-sidebar') if base
+            else os.path.join(tempfile.gettempdir(), f'desktop-sidebar-{os.getuid()}'))
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    # 共享的临时目录中可能被其他用户抢先创建
+    info = os.lstat(path)
+    if stat.S_ISLNK(info.st_mode) or not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise OSError(f"运行目录不属于当前用户: {path}")
+    if info.st_mode & 0o077:
+        os.chmod(path, 0o700)
+    return path
+
+
+def default_address() -> str:
+    """当前用户的宿主地址：Windows 上为命名管道，其他平台为私有运行目录中的 Unix 套接字"""
+    if sys.platform == 'win32':
+        user = os.environ.get('USERNAME') or 'default'
+        return rf'\\.\pipe\DesktopSidebarHost-{user}'
+    return os.path.join(runtime_dir(), 'host.sock')
+
+
+def default_authkey() -> bytes:
+    """
+    返回认证密钥
+
+    优先使用环境变量 SIDEBAR_HOST_KEY；否则读取运行目录中的密钥文件，
+    不存在时随机生成 32 字节并以 0600 权限写入，宿主和客户端读取的是同一份
+    """
+    key = os.environ.get('SIDEBAR_HOST_KEY')
+    if key:
+        return key.encode('utf-8')
+    path = os.path.join(runtime_dir(), KEY_FILE)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(path, 'rb') as f:
+            key = f.read()
+        if len(key) < 16:
+            raise OSError(f"认证密钥文件无效: {path}")
+        return key
+    # secrets 会加载 random 和 hashlib，只在生成密钥时导入
+    import secrets
+    key = secrets.token_bytes(32)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    return key
+
+
+def encode(op: int, panel: str = '', payload: Any = None) -> bytes:
+    """编码一条消息"""
+    name = panel.encode('utf-8')
+    body = b'' if payload is None else json.dumps(
+        payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return _HEADER.pack(op, len(name)) + name + body
+
+
+def decode(data: bytes) -> Tuple[int, str, Any]:
+    """
+    解码一条消息
+
+    Returns:
+        tuple: (操作码, 面板名, 负载)，没有负载时为 None
+
+    Raises:
+        ValueError: 消息格式不正确
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError(f"消息过短: {len(data)} 字节")
+    op, length = _HEADER.unpack_from(data)
+    end = _HEADER.size + length
+    if len(data) < end:
+        raise ValueError("面板名不完整")
+    panel = data[_HEADER.size:end].decode('utf-8')
+    payload = json.loads(data[end:].decode('utf-8')) if len(data) > end else None
+    return op, panel, payload
+
+
+def parse_rows(payload: Any) -> RowDelta:
+    """
+    检查并转换 ROWS 消息的负载
+
+    Raises:
+        ValueError: 负载不是 {"u": [[str, str, 0-255 的整数, 数值], ...], "r": [str, ...]}
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("行更新的负载必须是对象")
+    upserts = {}
+    rows = payload.get('u', [])
+    if not isinstance(rows, list):
+        raise ValueError("u 必须是数组")
+    for row in rows:
+        if not isinstance(row, list) or len(row) != 4:
+            raise ValueError(f"行必须是 [key, text, status, value]: {row!r}")
+        key, text, status, value = row
+        if not isinstance(key, str) or not isinstance(text, str):
+            raise ValueError(f"key 和 text 必须是字符串: {row!r}")
+        if type(status) is not int or not 0 <= status <= 255:
+            raise ValueError(f"status 必须是 0-255 的整数: {row!r}")
+        if type(value) not in (int, float):
+            raise ValueError(f"value 必须是数值: {row!r}")
+        upserts[key] = (text, status, float(value))
+    removed = payload.get('r', [])
+    if not isinstance(removed, list) or not all(isinstance(key, str) for key in removed):
+        raise ValueError("r 必须是字符串数组")
+    return RowDelta(upserts, set(removed))
+
+
+class _Connection:
+    """宿主端的一个客户端连接"""
+
+    def __init__(self, conn: Connection, client_id: int):
+        self.conn = conn
+        self.client_id = client_id
+        self.name = f'client-{client_id}'
+        self.pid: Optional[int] = None
+        self.panels: Dict[str, str] = {}
+        self.send_lock = threading.Lock()
+        self.messages = 0
+        self.bytes = 0
+
+    def send(self, data: bytes) -> bool:
+        try:
+            with self.send_lock:
+                self.conn.send_bytes(data)
+            return True
+        except (OSError, EOFError):
+            return False
+
+
+class HostUpdates:
+    """
+    界面线程一次取走的全部更新
+
+    ops 为按到达顺序排列的 ('attach', panel, title) / ('detach', panel) / ('clear', panel)，
+    应当先于 rows 应用；rows 为 {面板名: 合并后的 RowDelta}；pongs 在应用完毕后交给 acknowledge()
+    """
+
+    __slots__ = ('ops', 'rows', 'pongs')
+
+    def __init__(self):
+        self.ops: List[tuple] = []
+        self.rows: Dict[str, RowDelta] = {}
+        self.pongs: List[Tuple[_Connection, bytes]] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.ops or self.rows or self.pongs)
+
+
+class HostServer:
+    """
+    宿主端
+
+    每个客户端连接一个读取线程，消息解码后合并到待取走的更新中；
+    只有待取走的更新从空变为非空时才调用一次 notify，界面线程每帧调用 take_updates()
+    """
+
+    def __init__(self, notify: Optional[Callable[[], None]] = None,
+                 address: Optional[str] = None, authkey: Optional[bytes] = None):
+        """
+        Args:
+            notify: 出现待取走的更新时调用，在读取线程中调用
+            address: 监听地址，默认为 default_address()
+            authkey: 认证密钥，默认为 default_authkey()
+        """
+        self.notify = notify
+        self.address = address or default_address()
+        self.authkey = authkey or default_authkey()
+        self._listener: Optional[Listener] = None
+        self._accept_thread: Optional[threading.Thread] = None
+        self._clients: Dict[int, _Connection] = {}
+        self._owners: Dict[str, _Connection] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._pending = HostUpdates()
+        self._stopping = False
+
+        self._messages = 0
+        self._bytes = 0
+        self._merged = 0
+        self._deliveries = 0
+        self._errors = 0
+
+    def start(self):
+        """
+        开始监听
+
+        Raises:
+            OSError: 地址已被占用（通常是已有宿主在运行）
+        """
+        if self._listener is not None:
+            return
+        if sys.platform != 'win32' and os.path.exists(self.address):
+            # 上一个宿主异常退出时留下的套接字文件
+            try:
+                Client(self.address, authkey=self.authkey).close()
+            except (OSError, EOFError):
+                os.unlink(self.address)
+            else:
+                raise OSError(f"宿主已在运行: {self.address}")
+        self._stopping = False
+        self._listener = Listener(self.address, authkey=self.authkey)
+        self._accept_thread = threading.Thread(target=self._accept, name='SidebarHostAccept',
+                                               daemon=True)
+        self._accept_thread.start()
+
+    def stop(self):
+        """停止监听并断开所有客户端"""
+        listener, self._listener = self._listener, None
+        if listener is None:
+            return
+        self._stopping = True
+        # 连接一次以唤醒阻塞在 accept() 中的线程
+        try:
+            Client(self.address, authkey=self.authkey).close()
+        except (OSError, EOFError):
+            pass
+        if self._accept_thread is not None:
+            self._accept_thread.join(1.0)
+            self._accept_thread = None
+        listener.close()
+        with self._lock:
+            clients = list(self._clients.values())
+        for client in clients:
+            client.conn.close()
+
+    def take_updates(self) -> HostUpdates:
+        """取走全部待处理的更新"""
+        with self._lock:
+            updates, self._pending = self._pending, HostUpdates()
+            if updates:
+                self._deliveries += 1
+            return updates
+
+    def acknowledge(self, pongs: Sequence[Tuple[_Connection, bytes]]):
+        """界面应用完一批更新后回复其中的 PING"""
+        for client, data in pongs:
+            client.send(data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """返回连接数、面板数、收到的消息数和字节数、合并次数和投递次数"""
+        with self._lock:
+            return {
+                'address': self.address,
+                'clients': {client.name: {'pid': client.pid, 'panels': sorted(client.panels),
+                                          'messages': client.messages, 'bytes': client.bytes}
+                            for client in self._clients.values()},
+                'panels': len(self._owners),
+                'messages': self._messages,
+                'bytes': self._bytes,
+                'merged': self._merged,
+                'deliveries': self._deliveries,
+                'errors': self._errors,
+            }
+
+    def _accept(self):
+        while not self._stopping:
+            listener = self._listener
+            if listener is None:
+                return
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError) as e:
+                # 认证失败或监听已关闭
+                if not self._stopping and tracer.enabled:
+                    tracer.event('host.accept_failed', WARNING, error=str(e))
+                continue
+            if self._stopping:
+                conn.close()
+                return
+            client = _Connection(conn, next(self._ids))
+            with self._lock:
+                self._clients[client.client_id] = client
+            threading.Thread(target=self._serve, args=(client,),
+                             name=f'SidebarHostClient-{client.client_id}', daemon=True).start()
+
+    def _serve(self, client: _Connection):
+        try:
+            while True:
+                data = client.conn.recv_bytes()
+                try:
+                    self._handle(client, data)
+                except (ValueError, TypeError, KeyError) as e:
+                    with self._lock:
+                        self._errors += 1
+                    client.send(encode(OP_ERROR, payload={'message': str(e)}))
+        except (OSError, EOFError):
+            pass
+        finally:
+            self._disconnect(client)
+
+    def _handle(self, client: _Connection, data: bytes):
+        op, panel, payload = decode(data)
+        # 在进入锁之前检查负载，错误的数据不会进入待投递的更新
+        delta = parse_rows(payload) if op == OP_ROWS else None
+        title = None
+        if op in (OP_HELLO, OP_ATTACH) and payload is not None and not isinstance(payload, dict):
+            raise ValueError("负载必须是对象")
+        if op == OP_ATTACH:
+            title = (payload or {}).get('title')
+            if title is not None and not isinstance(title, str):
+                raise ValueError(f"title 必须是字符串: {title!r}")
+        notify = False
+        with self._lock:
+            self._messages += 1
+            self._bytes += len(data)
+            client.messages += 1
+            client.bytes += len(data)
+            pending = self._pending
+            was_empty = not pending
+
+            if op == OP_HELLO:
+                payload = payload or {}
+                client.name = str(payload.get('name') or client.name)
+                client.pid = payload.get('pid')
+                return
+            if op == OP_PING:
+                pending.pongs.append((client, encode(OP_PONG, panel, payload)))
+            elif op == OP_ATTACH:
+                owner = self._owners.get(panel)
+                if owner is not None and owner is not client:
+                    raise ValueError(f"面板已被 {owner.name} 使用: {panel}")
+                title = title or panel
+                self._owners[panel] = client
+                client.panels[panel] = title
+                pending.ops.append(('attach', panel, title))
+            else:
+                if self._owners.get(panel) is not client:
+                    raise ValueError(f"面板不存在: {panel}")
+                if op == OP_ROWS:
+                    if not delta:
+                        return
+                    if panel in pending.rows:
+                        pending.rows[panel] = merge_rows(pending.rows[panel], delta)
+                        self._merged += 1
+                    else:
+                        pending.rows[panel] = delta
+                elif op in (OP_DETACH, OP_CLEAR):
+                    # 之前尚未投递的行更新已经没有意义
+                    pending.rows.pop(panel, None)
+                    if op == OP_DETACH:
+                        del self._owners[panel]
+                        del client.panels[panel]
+                    pending.ops.append(('detach' if op == OP_DETACH else 'clear', panel))
+                else:
+                    raise ValueError(f"未知的操作码: {op}")
+            notify = was_empty
+        if notify and self.notify is not None:
+            self.notify()
+
+    def _disconnect(self, client: _Connection):
+        """客户端断开：删除它的全部面板"""
+        notify = False
+        with self._lock:
+            self._clients.pop(client.client_id, None)
+            if client.panels:
+                notify = not self._pending
+                for panel in client.panels:
+                    self._owners.pop(panel, None)
+                    self._pending.rows.pop(panel, None)
+                    self._pending.ops.append(('detach', panel))
+                client.panels.clear()
+        client.conn.close()
+        if tracer.enabled:
+            tracer.event('host.client_disconnected', client=client.name)
+        if notify and self.notify is not None:
+            self.notify()
+
+
+class HostClient:
+    """客户端，可以在任意线程中调用，发送不等待宿主处理"""
+
+    def __init__(self, conn: Connection):
+        self.conn = conn
+        self.errors: List[str] = []
+        self._send_lock = threading.Lock()
+        self._sequence = itertools.count(1)
+
+    @classmethod
+    def connect(cls, address: Optional[str] = None, authkey: Optional[bytes] = None,
+                name: Optional[str] = None) -> 'HostClient':
+        """
+        连接宿主
+
+        Raises:
+            ConnectionError: 宿主未运行或认证失败
+        """
+        address = address or default_address()
+        try:
+            conn = Client(address, authkey=authkey or default_authkey())
+        except (OSError, EOFError) as e:
+            raise ConnectionError(f"无法连接侧边栏宿主 {address}: {e}") from e
+        client = cls(conn)
+        client._send(OP_HELLO, '', {'name': name or os.path.basename(sys.argv[0]) or 'python',
+                                    'pid': os.getpid()})
+        return client
+
+    def attach(self, panel: str, title: Optional[str] = None):
+        """在宿主窗口中添加一个面板"""
+        self._send(OP_ATTACH, panel, {'title': title or panel})
+
+    def detach(self, panel: str):
+        self._send(OP_DETACH, panel)
+
+    def update_rows(self, panel: str, rows: Iterable[Tuple[str, str, int, float]],
+                    removed: Iterable[str] = ()):
+        """
+        新增或更新行，并删除 removed 中的键
+
+        Args:
+            rows: (key, text, status, value)，与 RowStore 的行相同
+        """
+        self._send(OP_ROWS, panel, {'u': [list(row) for row in rows], 'r': list(removed)})
+
+    def send_delta(self, panel: str, delta: RowDelta):
+        """发送 feed_scheduler.diff_rows 计算出的差异"""
+        self._send(OP_ROWS, panel, {
+            'u': [[key, text, status, value] for key, (text, status, value) in delta.upserts.items()],
+            'r': list(delta.removed)})
+
+    def clear(self, panel: str):
+        self._send(OP_CLEAR, panel)
+
+    def sync(self, timeout: Optional[float] = 5.0) -> float:
+        """
+        等待此前发送的更新全部应用到宿主界面
+
+        Returns:
+            float: 往返耗时（秒）
+
+        Raises:
+            TimeoutError: 超时未收到回复
+        """
+        sequence = next(self._sequence)
+        start = time.perf_counter()
+        self._send(OP_PING, '', sequence)
+        deadline = None if timeout is None else start + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            if remaining is not None and (remaining <= 0 or not self.conn.poll(remaining)):
+                raise TimeoutError("等待侧边栏宿主回复超时")
+            op, _, payload = decode(self.conn.recv_bytes())
+            if op == OP_PONG and payload == sequence:
+                return time.perf_counter() - start
+            if op == OP_ERROR:
+                self.errors.append(payload.get('message', ''))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _send(self, op: int, panel: str, payload: Any = None):
+        data = encode(op, panel, payload)
+        with self._send_lock:
+            self.conn.send_bytes(data)
@@ -0,0 +1,202 @@
+"""
+共享侧边栏宿主进程
+唯一持有 AppBar 和停靠窗口的进程：客户端应用通过 sidebar_host.HostClient 连接，
+每个客户端面板显示为窗口中的一张卡片（标题 + VirtualListPanel），
+行更新在读取线程中合并，GUI线程每帧最多应用一次
+
+运行:
+    python sidebar_host_app.py [--edge left] [--width 320]
+
+在自己的窗口中使用:
+    from sidebar_host_app import SidebarHostApp
+
+    host = SidebarHostApp(window, layout)
+    host.start()
+"""
+
+import argparse
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from PySide6.QtCore import QObject, Qt, QTimer, Signal
+
+from appbar_events import FRAME_INTERVAL, RepositionThrottle
+from appbar_layout import EDGE_NAMES
+from sidebar_feeds import apply_row_delta
+from sidebar_host import HostServer, HostUpdates
+from sidebar_theme import ROLE_CARD, ROLE_ROOT, set_role
+from sidebar_trace import tracer, WARNING
+
+if TYPE_CHECKING:
+    from PySide6.QtWidgets import QVBoxLayout, QWidget
+    from sidebar_list import VirtualListPanel
+
+
+class SidebarHostApp(QObject):
+    """
+    宿主窗口中的面板集合
+
+    读取线程收到新消息时通过排队信号唤醒GUI线程，经 RepositionThrottle 合并为每帧最多一次应用
+    """
+
+    # 客户端面板添加/删除 (panel, title) / (panel)
+    panelAttached = Signal(str, str)
+    panelDetached = Signal(str)
+
+    # 从读取线程发出，排队到GUI线程处理
+    _wake = Signal()
+
+    def __init__(self, window: 'QWidget', layout: 'QVBoxLayout',
+                 server: Optional[HostServer] = None, interval: float = FRAME_INTERVAL):
+        """
+        Args:
+            window: 宿主窗口（通常由 SidebarWidget 停靠）
+            layout: 放置面板卡片的布局
+            server: 宿主端，默认监听 sidebar_host.default_address()
+            interval: 两次应用之间的最小间隔（秒），默认一帧
+        """
+        super().__init__(window)
+        self.window = window
+        self.layout = layout
+        self.server = server or HostServer()
+        self.server.notify = self._wake.emit
+        self._cards: Dict[str, 'QWidget'] = {}
+        self._panels: Dict[str, 'VirtualListPanel'] = {}
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._throttle = RepositionThrottle(
+            self._deliver,
+            lambda delay: self._timer.start(int(delay * 1000)),
+            interval,
+        )
+        self._timer.timeout.connect(self._throttle.fire)
+        # 连接到本对象的方法，跨线程时才会排队到GUI线程执行
+        self._wake.connect(self._on_wake)
+
+        self._frames = 0
+        self._deliver_ns = 0
+
+    def start(self):
+        """开始接受客户端连接，已有宿主在运行时抛出 OSError"""
+        self.server.start()
+
+    def stop(self):
+        self._throttle.cancel()
+        self._timer.stop()
+        self.server.stop()
+
+    def panel(self, name: str) -> Optional['VirtualListPanel']:
+        return self._panels.get(name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """返回宿主端统计以及GUI线程中的应用次数和平均耗时"""
+        stats = self.server.get_stats()
+        stats['frames'] = self._frames
+        stats['avg_deliver_ms'] = self._deliver_ns / self._frames / 1e6 if self._frames else 0.0
+        return stats
+
+    def _on_wake(self):
+        self._throttle.request()
+
+    def _deliver(self):
+        updates: HostUpdates = self.server.take_updates()
+        if not updates:
+            return
+        start = time.perf_counter_ns()
+        try:
+            with tracer.span('host.deliver', ops=len(updates.ops), panels=len(updates.rows)):
+                for op in updates.ops:
+                    if op[0] == 'attach':
+                        self._attach(op[1], op[2])
+                    elif op[0] == 'detach':
+                        self._detach(op[1])
+                    elif op[1] in self._panels:
+                        self._panels[op[1]].list_model.reset_rows(())
+                for name, delta in updates.rows.items():
+                    panel = self._panels.get(name)
+                    if panel is None:
+                        continue
+                    # 一个面板出错不影响同一帧中的其他面板
+                    try:
+                        apply_row_delta(panel, delta)
+                    except Exception as e:
+                        if tracer.enabled:
+                            tracer.event('host.apply_failed', WARNING, panel=name, error=str(e))
+        finally:
+            self._deliver_ns += time.perf_counter_ns() - start
+            self._frames += 1
+            # 无论是否出错都要回复，否则客户端的 sync() 会一直等待
+            self.server.acknowledge(updates.pongs)
+
+    def _attach(self, name: str, title: str):
+        from PySide6.QtWidgets import QLabel, QVBoxLayout, QWidget
+        from sidebar_list import VirtualListPanel
+
+        if name in self._panels:
+            self._cards[name].findChild(QLabel).setText(title)
+            return
+        card = QWidget()
+        set_role(card, ROLE_CARD)
+        card_layout = QVBoxLayout(card)
+        card_layout.addWidget(QLabel(title))
+        panel = VirtualListPanel(card)
+        card_layout.addWidget(panel)
+        self.layout.addWidget(card)
+        self._cards[name] = card
+        self._panels[name] = panel
+        self.panelAttached.emit(name, title)
+
+    def _detach(self, name: str):
+        card = self._cards.pop(name, None)
+        self._panels.pop(name, None)
+        if card is not None:
+            self.layout.removeWidget(card)
+            card.deleteLater()
+            self.panelDetached.emit(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="共享侧边栏宿主进程")
+    parser.add_argument('--edge', choices=tuple(EDGE_NAMES), default=None,
+                        help="停靠边缘，默认使用保存的配置")
+    parser.add_argument('--width', type=int, default=None, help="宽度（逻辑像素）")
+    args = parser.parse_args()
+
+    from PySide6.QtWidgets import QApplication, QVBoxLayout, QWidget
+    from sidebar_theme import default_theme
+    from sidebar_widget import SidebarWidget
+
+    app = QApplication(sys.argv)
+
+    window = QWidget()
+    window.setWindowTitle("侧边栏宿主")
+    set_role(window, ROLE_ROOT)
+    default_theme().attach(window)
+    layout = QVBoxLayout(window)
+
+    host = SidebarHostApp(window, layout)
+    try:
+        host.start()
+    except OSError as e:
+        print(f"❌ 无法启动宿主: {e}")
+        return 1
+
+    sidebar = SidebarWidget(window, config_file="sidebar_host.json")
+    changes = {key: value for key, value in (('edge', args.edge), ('width', args.width))
+               if value is not None}
+    if changes:
+        sidebar.set_config(**changes)
+    # 客户端推送的更新在侧边栏不可见时不重绘
+    sidebar.suspension.register_widget(window, 'host')
+    if not sidebar.restore_state():
+        sidebar.embed()
+    app.aboutToQuit.connect(host.stop)
+    app.aboutToQuit.connect(sidebar.cleanup)
+    return app.exec()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""
+虚拟化列表面板
+用于在侧边栏中显示成千上万行数据（例如服务监控），代替每行一个控件的 QVBoxLayout
+
+数据保存在 row_store.RowStore 的列数组中，QListView 以固定行高只绘制可见的行，
+每行由委托直接绘制状态圆点、文本和数值，不创建任何子控件；
+增量更新只修改对应的列并发出一次 dataChanged，视图只重绘可见部分
+
+使用示例:
+    from sidebar_list import VirtualListPanel
+    from row_store import STATUS_OK, STATUS_ERROR
+
+    panel = VirtualListPanel(window)
+    layout.addWidget(panel)
+    panel.append_rows([('svc-1', 'nginx', STATUS_OK, 12.5), ...])
+    panel.update_rows([('svc-1', None, STATUS_ERROR, 0.0)])
+
+RowListModel 只依赖 QtCore；RowDelegate 和 VirtualListPanel 在第一次访问时
+才导入 QtWidgets 并创建类，导入本模块本身不加载 QtWidgets
+"""
+
+from typing import TYPE_CHECKING, Iterable, Optional, Sequence, Tuple
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QPoint, QSize, Qt
+
+from row_store import (Row, RowStore, STATUS_ERROR, STATUS_OK, STATUS_UNKNOWN,
+                       STATUS_WARNING)
+
+if TYPE_CHECKING:
+    from PySide6.QtWidgets import QWidget
+
+# 行高（逻辑像素）
+ROW_HEIGHT = 24
+
+STATUS_ROLE = Qt.UserRole + 1
+VALUE_ROLE = Qt.UserRole + 2
+
+STATUS_COLORS = {
+    STATUS_OK: '#3fb950',
+    STATUS_WARNING: '#d29922',
+    STATUS_ERROR: '#f85149',
+    STATUS_UNKNOWN: '#8b949e',
+}
+
+# (key, text, status, value)，None 表示该列不变
+RowUpdate = Tuple[str, Optional[str], Optional[int], Optional[float]]
+
+
+class RowListModel(QAbstractListModel):
+    """RowStore 的 Qt 模型，data() 直接读取列数组，不为每行创建对象"""
+
+    def __init__(self, store: Optional[RowStore] = None, parent=None):
+        super().__init__(parent)
+        self.store = store if store is not None else RowStore()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.store)
+
+    def data(self, index, role=Qt.DisplayRole):
+        row = index.row()
+        store = self.store
+        if role == Qt.DisplayRole:
+            return store.texts[row]
+        if role == STATUS_ROLE:
+            return store.status[row]
+        if role == VALUE_ROLE:
+            return store.values[row]
+        if role == Qt.ToolTipRole:
+            return store.keys[row]
+        return None
+
+    def append_rows(self, rows: Sequence[Row]) -> int:
+        """
+        批量添加行，只发出一次插入通知
+
+        整批先经过 RowStore.check_rows 检查，有问题时不发出任何通知、不修改数据
+
+        Raises:
+            KeyError: 键已存在或在这一批中重复
+            ValueError: 行的格式或类型不正确
+        """
+        rows = self.store.check_rows(rows)
+        if not rows:
+            return 0
+        first = len(self.store)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        try:
+            self.store.extend(rows)
+        finally:
+            self.endInsertRows()
+        return len(rows)
+
+    def update_rows(self, updates: Iterable[RowUpdate]) -> int:
+        """
+        批量增量更新，所有变化合并为一次 dataChanged
+
+        整批先经过 RowStore.check_updates 检查，有问题时不修改任何一行
+
+        Returns:
+            int: 实际发生变化的行数
+
+        Raises:
+            ValueError: 更新的格式或类型不正确
+        """
+        store = self.store
+        updates = store.check_updates(updates)
+        first = last = None
+        count = 0
+        for key, text, status, value in updates:
+            row = store.update(key, text, status, value)
+            if row is None:
+                continue
+            count += 1
+            if first is None or row < first:
+                first = row
+            if last is None or row > last:
+                last = row
+        if count:
+            self.dataChanged.emit(self.index(first), self.index(last))
+        return count
+
+    def remove_row(self, key: str) -> bool:
+        row = self.store.find(key)
+        if row is None:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.store.remove(key)
+        self.endRemoveRows()
+        return True
+
+    def remove_rows(self, keys: Iterable[str]) -> int:
+        """
+        批量删除行，每个连续区间发出一次删除通知，索引只在最后重建一次
+
+        Returns:
+            int: 删除的行数
+        """
+        store = self.store
+        ranges = store.removal_ranges(keys)
+        if not ranges:
+            return 0
+        for first, last in ranges:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            store.delete_range(first, last)
+            self.endRemoveRows()
+        store.reindex(ranges[-1][0])
+        return sum(last - first + 1 for first, last in ranges)
+
+    def reset_rows(self, rows: Iterable[Row]):
+        """替换全部数据，rows 检查不通过时保持原有数据"""
+        rows = self.store.check_rows(rows, replace=True)
+        self.beginResetModel()
+        try:
+            self.store.clear()
+            self.store.extend(rows)
+        finally:
+            self.endResetModel()
+
+
+def _create_widget_classes():
+    from PySide6.QtGui import QColor, QPainter
+    from PySide6.QtWidgets import QListView, QStyle, QStyledItemDelegate
+
+    class RowDelegate(QStyledItemDelegate):
+        """固定行高的委托：左侧状态圆点，中间文本（过长时省略），右侧数值"""
+
+        def __init__(self, row_height: int = ROW_HEIGHT, value_format: str = '{:.1f}', parent=None):
+            super().__init__(parent)
+            self._size = QSize(0, row_height)
+            self._format = value_format
+            self._colors = {status: QColor(color) for status, color in STATUS_COLORS.items()}
+
+        def sizeHint(self, option, index) -> QSize:
+            return self._size
+
+        def paint(self, painter: QPainter, option, index):
+            rect = option.rect
+            selected = bool(option.state & QStyle.State_Selected)
+            painter.save()
+            if selected:
+                painter.fillRect(rect, option.palette.highlight())
+
+            # 状态圆点
+            dot = max(6, rect.height() // 3)
+            painter.setRenderHint(QPainter.Antialiasing, True)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(self._colors.get(index.data(STATUS_ROLE), self._colors[STATUS_UNKNOWN]))
+            painter.drawEllipse(rect.left() + 8, rect.center().y() - dot // 2, dot, dot)
+
+            # 数值右对齐，文本占据剩余宽度
+            painter.setPen(option.palette.highlightedText().color() if selected
+                           else option.palette.text().color())
+            metrics = option.fontMetrics
+            value = self._format.format(index.data(VALUE_ROLE))
+            value_width = metrics.horizontalAdvance(value)
+            text_left = rect.left() + 16 + dot
+            value_left = rect.right() - 8 - value_width
+            text = metrics.elidedText(index.data(Qt.DisplayRole), Qt.ElideRight,
+                                      max(0, value_left - 8 - text_left))
+            painter.drawText(text_left, rect.top(), value_left - text_left, rect.height(),
+                             Qt.AlignVCenter | Qt.AlignLeft, text)
+            painter.drawText(value_left, rect.top(), value_width, rect.height(),
+                             Qt.AlignVCenter | Qt.AlignRight, value)
+            painter.restore()
+
+
+    class VirtualListPanel(QListView):
+        """
+        虚拟化列表面板
+
+        可以直接放进由 SidebarWidget 管理的窗口；行高固定（uniformItemSizes），
+        滚动和重绘的开销只与可见行数有关，与总行数无关
+        """
+
+        def __init__(self, parent: Optional['QWidget'] = None, store: Optional[RowStore] = None,
+                     row_height: int = ROW_HEIGHT, value_format: str = '{:.1f}'):
+            super().__init__(parent)
+            self.list_model = RowListModel(store, self)
+            self.setModel(self.list_model)
+            self.setItemDelegate(RowDelegate(row_height, value_format, self))
+            # 所有行高度相同，布局时不逐行查询 sizeHint
+            self.setUniformItemSizes(True)
+            self.setVerticalScrollMode(QListView.ScrollPerPixel)
+            self.setEditTriggers(QListView.NoEditTriggers)
+            self.setSelectionMode(QListView.SingleSelection)
+
+        @property
+        def store(self) -> RowStore:
+            return self.list_model.store
+
+        def append_rows(self, rows: Sequence[Row]) -> int:
+            return self.list_model.append_rows(rows)
+
+        def update_rows(self, updates: Iterable[RowUpdate]) -> int:
+            return self.list_model.update_rows(updates)
+
+        def remove_row(self, key: str) -> bool:
+            return self.list_model.remove_row(key)
+
+        def remove_rows(self, keys: Iterable[str]) -> int:
+            return self.list_model.remove_rows(keys)
+
+        def visible_range(self) -> Tuple[int, int]:
+            """
+            返回当前可见的第一行和最后一行
+
+            Returns:
+                tuple: (first, last)，没有行时为 (-1, -1)
+            """
+            count = len(self.store)
+            if not count:
+                return -1, -1
+            viewport = self.viewport()
+            first = self.indexAt(QPoint(0, 0)).row()
+            last = self.indexAt(QPoint(0, viewport.height() - 1)).row()
+            return max(first, 0), last if last >= 0 else count - 1
+
+    return RowDelegate, VirtualListPanel
+
+
+def __getattr__(name):
+    # 第一次访问控件类时创建并缓存到模块中
+    if name in ('RowDelegate', 'VirtualListPanel'):
+        classes = _create_widget_classes()
+        globals().update(RowDelegate=classes[0], VirtualListPanel=classes[1])
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,215 @@
+"""
+多侧边栏协调模块
+统一计算同一进程中多个侧边栏的布局，并把所有窗口移动合并为一次延迟批量操作
+
+每个 SidebarWidget 单独定位时，一个侧边栏的 ABM_SETPOS 会改变工作区域并推挤其他
+侧边栏，引起一连串的重新定位；由 SidebarManager 管理后，布局只计算一次，
+所有窗口通过 BeginDeferWindowPos/DeferWindowPos/EndDeferWindowPos 一次移动到位
+
+使用示例:
+    from sidebar_manager import SidebarManager
+
+    manager = SidebarManager()
+    manager.add(monitor_window.sidebar)
+    manager.add(tools_window.sidebar)
+    manager.embed_all()
+"""
+
+from contextlib import contextmanager
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from PySide6.QtCore import QObject, QTimer
+
+from appbar_events import RepositionThrottle
+from appbar_native import NativeApi, default_native
+from appbar_layout import ABE_LEFT, ABE_RIGHT, FULL_LENGTH, pack_rects, stack_rects, unpack_rects
+from sidebar_trace import tracer
+
+SWP_NOACTIVATE = 0x0010
+
+
+class WindowMove(NamedTuple):
+    """一次窗口移动"""
+    hwnd: int
+    insert_after: int
+    rect: Tuple[int, int, int, int]
+    flags: int = SWP_NOACTIVATE
+
+
+class WindowPosBackend:
+    """批量移动窗口的接口"""
+
+    def apply(self, moves: Sequence[WindowMove]):
+        """一次性应用所有窗口移动"""
+        raise NotImplementedError
+
+
+class Win32DeferBackend(WindowPosBackend):
+    """基于 DeferWindowPos 的批量移动，所有窗口在 EndDeferWindowPos 时同时更新"""
+
+    def __init__(self, native: Optional[NativeApi] = None):
+        self.native = native or default_native()
+
+    def apply(self, moves: Sequence[WindowMove]):
+        if not moves:
+            return
+        native = self.native
+        hdwp = native.begin_defer_window_pos(len(moves))
+        for move in moves:
+            l, t, r, b = move.rect
+            if hdwp:
+                hdwp = native.defer_window_pos(
+                    hdwp, move.hwnd, move.insert_after, l, t, r - l, b - t, move.flags)
+            if not hdwp:
+                # 批量操作失败时系统已释放句柄，剩余窗口逐个移动
+                native.set_window_pos(
+                    move.hwnd, move.insert_after, l, t, r - l, b - t, move.flags)
+        if hdwp:
+            native.end_defer_window_pos(hdwp)
+
+
+class SidebarManager(QObject):
+    """
+    侧边栏管理器
+
+    被管理的侧边栏不再自行定位，而是把定位请求交给管理器合并处理
+    """
+
+    def __init__(self, backend: Optional[WindowPosBackend] = None):
+        """
+        初始化管理器
+
+        Args:
+            backend: 批量移动窗口的后端，默认使用 Win32DeferBackend
+        """
+        super().__init__()
+        self.backend = backend or Win32DeferBackend()
+        self._sidebars: List = []
+        self._batch_depth = 0
+        self._dirty = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._throttle = RepositionThrottle(
+            self.relayout,
+            lambda delay: self._timer.start(int(delay * 1000)),
+        )
+        self._timer.timeout.connect(self._throttle.fire)
+
+        self._relayouts = 0
+        self._moves = 0
+
+    @property
+    def sidebars(self) -> List:
+        """被管理的侧边栏列表（按添加顺序，同一边缘上先添加的在外侧）"""
+        return list(self._sidebars)
+
+    def add(self, sidebar):
+        """添加侧边栏"""
+        if sidebar in self._sidebars:
+            return
+        self._sidebars.append(sidebar)
+        sidebar.manager = self
+        if sidebar.is_embedded:
+            self.request_relayout()
+
+    def remove(self, sidebar):
+        """移除侧边栏，之后该侧边栏恢复自行定位"""
+        if sidebar not in self._sidebars:
+            return
+        self._sidebars.remove(sidebar)
+        sidebar.manager = None
+        self.request_relayout()
+
+    def request_relayout(self):
+        """请求重新布局，同一帧内的多次请求只执行一次"""
+        if self._batch_depth:
+            self._dirty = True
+        else:
+            self._throttle.request()
+
+    @contextmanager
+    def batch(self):
+        """
+        批量操作上下文
+
+        上下文中的所有布局请求推迟到退出时合并为一次布局
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._dirty:
+                self._dirty = False
+                self._throttle.cancel()
+                self.relayout()
+
+    def embed_all(self) -> bool:
+        """嵌入所有侧边栏，只进行一次布局"""
+        with self.batch():
+            results = [sidebar.embed() for sidebar in self._sidebars]
+        return all(results)
+
+    def unembed_all(self) -> bool:
+        """取消嵌入所有侧边栏"""
+        with self.batch():
+            results = [sidebar.unembed() for sidebar in list(self._sidebars)]
+        return all(results)
+
+    def relayout(self):
+        """立即计算所有已嵌入侧边栏的布局并批量移动窗口"""
+        # 自动隐藏的侧边栏不保留屏幕空间，自行定位
+        bars = [sidebar for sidebar in self._sidebars
+                if sidebar.is_embedded and sidebar.appbar is not None
+                and not sidebar.appbar.autohide]
+        if not bars:
+            return
+
+        with tracer.span('manager.relayout', bars=len(bars)) as span:
+            monitors: Dict[int, int] = {}
+            areas = []
+            index = []
+            for sidebar in bars:
+                info = sidebar.appbar.monitor_info()
+                if info.handle not in monitors:
+                    monitors[info.handle] = len(areas)
+                    areas.append(info.monitor)
+                index.append(monitors[info.handle])
+
+            appbars = [sidebar.appbar for sidebar in bars]
+            rects = unpack_rects(stack_rects(
+                pack_rects(areas),
+                [appbar.edge for appbar in appbars],
+                [appbar.width for appbar in appbars],
+                [FULL_LENGTH if appbar.height is None else appbar.height
+                 for appbar in appbars],
+                [appbar.top_offset for appbar in appbars],
+                index,
+            ))
+
+            # 每个AppBar仍需向Shell登记保留区域，但窗口统一在最后移动；
+            # 与 AppBar.reserve_target() 相同，厚度方向跟随 Shell 确认后的位置
+            # （例如同一边缘的任务栏把侧边栏向内推），沿边缘方向仍按布局结果
+            moves = []
+            for i, (appbar, rect) in enumerate(zip(appbars, rects)):
+                confirmed = appbar.reserve(rect)
+                if appbar.edge in (ABE_LEFT, ABE_RIGHT):
+                    rect = (confirmed[0], rect[1], confirmed[2], rect[3])
+                else:
+                    rect = (rect[0], confirmed[1], rect[2], confirmed[3])
+                rects[i] = rect
+                moves.append(WindowMove(int(appbar.hwnd), appbar.insert_after(), rect))
+            self.backend.apply(moves)
+
+            self._relayouts += 1
+            self._moves += len(moves)
+            span.set(rects=rects)
+
+    def get_stats(self) -> Dict[str, object]:
+        """返回布局统计"""
+        return {
+            'sidebars': len(self._sidebars),
+            'relayouts': self._relayouts,
+            'window_moves': self._moves,
+            'requests': self._throttle.get_stats(),
+        }
@@ -0,0 +1,277 @@
+"""
+侧边栏运行指标模块
+记录 embed/unembed/reposition 等操作的耗时直方图和错误计数，
+可以定期导出为 JSON 或 Prometheus 文本格式的本地文件，供监控系统采集
+
+与 sidebar_trace 不同，指标始终开启：每次记录只是一次桶查找和几次整数加法
+
+使用示例:
+    from sidebar_metrics import Metrics, MetricsExporter
+
+    metrics = Metrics()
+    with metrics.time('embed'):
+        ...
+    metrics.increment('errors.embed')
+
+    exporter = MetricsExporter(metrics.snapshot, 'sidebar.prom', interval=30)
+    exporter.start()
+"""
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Optional
+
+from config_writer import atomic_write_bytes
+from sidebar_trace import tracer, WARNING
+
+# 直方图桶上界（毫秒），最后一个桶收集超出范围的值
+BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+Snapshot = Dict[str, Any]
+
+
+class Histogram:
+    """固定桶的耗时直方图"""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value_ms: float):
+        self.counts[bisect_left(BUCKETS_MS, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def quantile(self, q: float) -> float:
+        """按桶上界估算分位数"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS_MS, self.counts):
+            seen += n
+            if seen >= rank:
+                return float(bound)
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum_ms': round(self.total, 3),
+            'avg_ms': round(self.total / self.count, 3) if self.count else 0.0,
+            'p50_ms': self.quantile(0.5),
+            'p95_ms': self.quantile(0.95),
+            'max_ms': round(self.max, 3),
+            'buckets': list(self.counts),
+        }
+
+
+class _Timer:
+    """Metrics.time() 返回的计时上下文"""
+
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics: 'Metrics', name: str):
+        self.metrics = metrics
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.name, (time.perf_counter() - self.start) * 1000.0)
+        return False
+
+
+class Metrics:
+    """耗时直方图和计数器的集合，可以在任意线程中读取"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, int] = {}
+
+    def time(self, name: str) -> _Timer:
+        """创建计时上下文，退出时记录耗时（毫秒）"""
+        return _Timer(self, name)
+
+    def observe(self, name: str, value_ms: float):
+        """记录一次耗时"""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(value_ms)
+
+    def increment(self, name: str, value: int = 1):
+        """计数器加一"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def snapshot(self) -> Snapshot:
+        """
+        返回当前指标
+
+        Returns:
+            dict: latency_ms 为各操作的直方图摘要，counters 为计数器
+        """
+        with self._lock:
+            return {
+                'latency_ms': {name: h.as_dict() for name, h in self._histograms.items()},
+                'counters': dict(self._counters),
+            }
+
+    def reset(self):
+        """清空所有指标"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    body = ','.join('{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                    for key, value in labels.items())
+    return '{' + body + '}'
+
+
+def format_prometheus(snapshot: Snapshot, labels: Optional[Dict[str, str]] = None) -> str:
+    """
+    将指标快照转换为 Prometheus 文本格式
+
+    识别的键:
+        latency_ms: 直方图，导出为 sidebar_latency_ms
+        counters: 计数器，'errors.embed' 导出为 sidebar_errors_total{kind="embed"}
+        native: 原生调用统计，导出为 sidebar_native_calls_total 等
+        config_io: 配置读写统计，导出为 sidebar_config_<name>_total
+
+    Args:
+        snapshot: 指标快照
+        labels: 附加到每个样本的标签
+    """
+    labels = labels or {}
+    lines = []
+
+    latency = snapshot.get('latency_ms') or {}
+    if latency:
+        lines.append('# TYPE sidebar_latency_ms histogram')
+    for op, h in sorted(latency.items()):
+        cumulative = 0
+        for bound, n in zip(BUCKETS_MS + ('+Inf',), h['buckets']):
+            cumulative += n
+            lines.append('sidebar_latency_ms_bucket{} {}'.format(
+                _labels(dict(labels, op=op, le=bound)), cumulative))
+        lines.append('sidebar_latency_ms_sum{} {}'.format(_labels(dict(labels, op=op)), h['sum_ms']))
+        lines.append('sidebar_latency_ms_count{} {}'.format(_labels(dict(labels, op=op)), h['count']))
+
+    declared = set()
+    for name, value in sorted((snapshot.get('counters') or {}).items()):
+        family, _, kind = name.partition('.')
+        metric = f'sidebar_{family}_total'
+        if metric not in declared:
+            declared.add(metric)
+            lines.append(f'# TYPE {metric} counter')
+        sample_labels = dict(labels, kind=kind) if kind else labels
+        lines.append('{}{} {}'.format(metric, _labels(sample_labels), value))
+
+    native = snapshot.get('native') or {}
+    for field in ('calls', 'failures'):
+        if native:
+            lines.append(f'# TYPE sidebar_native_{field}_total counter')
+        for api, stats in sorted(native.items()):
+            lines.append('sidebar_native_{}_total{} {}'.format(
+                field, _labels(dict(labels, api=api)), stats[field]))
+
+    for name, value in sorted((snapshot.get('config_io') or {}).items()):
+        metric = f'sidebar_config_{name}_total'
+        lines.append(f'# TYPE {metric} counter')
+        lines.append('{}{} {}'.format(metric, _labels(labels), value))
+
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsExporter:
+    """
+    定期把指标快照写入本地文件
+
+    文件以"临时文件 + 重命名"的方式原子替换，采集程序不会读到半截内容；
+    扩展名为 .prom 时默认使用 Prometheus 文本格式，否则为 JSON
+    """
+
+    def __init__(self, source: Callable[[], Snapshot], path: str,
+                 interval: float = 60.0, format: Optional[str] = None,
+                 labels: Optional[Dict[str, str]] = None):
+        """
+        初始化导出器
+
+        Args:
+            source: 返回指标快照的函数，在后台线程中调用
+            path: 导出文件路径
+            interval: 导出间隔（秒）
+            format: 'json' 或 'prometheus'，默认按扩展名判断
+            labels: Prometheus 格式中附加的标签
+        """
+        self.source = source
+        self.path = path
+        self.interval = interval
+        self.format = format or ('prometheus' if path.endswith('.prom') else 'json')
+        self.labels = labels or {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.exports = 0
+
+    def start(self):
+        """启动后台导出线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name='MetricsExporter', daemon=True)
+        self._thread.start()
+
+    def stop(self, export: bool = True):
+        """停止导出线程，export 为 True 时最后再导出一次"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.interval)
+            self._thread = None
+        if export:
+            self.export_now()
+
+    def export_now(self) -> bool:
+        """
+        立即导出一次
+
+        Returns:
+            bool: 是否导出成功
+        """
+        try:
+            snapshot = self.source()
+            if self.format == 'prometheus':
+                payload = format_prometheus(snapshot, self.labels).encode('utf-8')
+            else:
+                snapshot = dict(snapshot, timestamp=time.time())
+                payload = json.dumps(snapshot, indent=2, ensure_ascii=False,
+                                     default=str).encode('utf-8')
+            atomic_write_bytes(self.path, payload)
+            self.exports += 1
+            return True
+        except Exception as e:
+            if tracer.enabled:
+                tracer.event('metrics.export_failed', WARNING, path=self.path, error=repr(e))
+            return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.export_now()
@@ -0,0 +1,182 @@
+"""
+侧边栏拖动调整宽度模块
+在侧边栏内侧边缘放置一条可拖动的细条，拖动过程中只移动窗口，
+松开鼠标时才由调用方更新保留区域并保存配置
+
+ResizeGrip 继承 QWidget，第一次访问时才导入 QtWidgets 并创建这个类，
+导入本模块本身只加载 QtCore
+
+使用示例:
+    grip = ResizeGrip(window, edge, width,
+                      on_drag=lambda w: ..., on_release=lambda w: ...)
+"""
+
+from typing import Callable, Optional
+
+from PySide6.QtCore import QEvent, QObject, Qt, QTimer
+
+from appbar_events import FRAME_INTERVAL, RepositionThrottle
+from appbar_layout import ABE_BOTTOM, ABE_LEFT, ABE_RIGHT, ABE_TOP
+
+# 拖动细条的厚度（逻辑像素）
+GRIP_THICKNESS = 6
+
+# 允许拖动到的最小宽度（物理像素）
+MIN_WIDTH = 120
+
+
+def resize_width(edge: int, start_width: int, delta_x: int, delta_y: int,
+                 min_width: int = MIN_WIDTH, max_width: Optional[int] = None) -> int:
+    """
+    根据鼠标移动距离计算新的宽度
+
+    内侧边缘随鼠标移动：左/上边缘的侧边栏向右/下拖动变宽，右/下边缘相反
+
+    Args:
+        edge: 边缘 (ABE_*)
+        start_width: 开始拖动时的宽度
+        delta_x: 鼠标水平移动距离（物理像素）
+        delta_y: 鼠标垂直移动距离（物理像素）
+        min_width: 最小宽度
+        max_width: 最大宽度，None 表示不限制
+
+    Returns:
+        int: 新的宽度
+    """
+    if edge == ABE_LEFT:
+        width = start_width + delta_x
+    elif edge == ABE_RIGHT:
+        width = start_width - delta_x
+    elif edge == ABE_TOP:
+        width = start_width + delta_y
+    elif edge == ABE_BOTTOM:
+        width = start_width - delta_y
+    else:
+        raise ValueError(f"不支持的边缘: {edge}")
+    if max_width is not None:
+        width = min(width, max_width)
+    return max(min_width, int(width))
+
+
+def _create_resize_grip():
+    from PySide6.QtWidgets import QWidget
+
+    class ResizeGrip(QWidget):
+        """
+        侧边栏内侧边缘的拖动条
+
+        鼠标移动事件可能远高于显示刷新率，on_drag 经过节流每帧最多调用一次，
+        on_release 在松开鼠标时以最终宽度调用一次
+        """
+
+        def __init__(self, window: 'QWidget', edge: int, width: int,
+                     on_drag: Callable[[int], None],
+                     on_release: Callable[[int], None],
+                     max_width: Optional[int] = None):
+            super().__init__(window)
+            self.edge = edge
+            self.width_value = width
+            self.max_width = max_width
+            self.on_drag = on_drag
+            self.on_release = on_release
+
+            self._press = None
+            self._start_width = width
+            self._pending = width
+            self._timer = QTimer(self)
+            self._timer.setSingleShot(True)
+            self._throttle = RepositionThrottle(
+                self._apply_pending,
+                lambda delay: self._timer.start(int(delay * 1000)),
+                FRAME_INTERVAL,
+            )
+            self._timer.timeout.connect(self._throttle.fire)
+
+            window.installEventFilter(self)
+            self._update_cursor()
+            self._place()
+            self.show()
+            self.raise_()
+
+        @property
+        def dragging(self) -> bool:
+            """是否正在拖动"""
+            return self._press is not None
+
+        def set_edge(self, edge: int, width: int):
+            """侧边栏边缘或宽度在外部被修改后更新"""
+            self.edge = edge
+            self.width_value = width
+            self._update_cursor()
+            self._place()
+
+        def detach(self):
+            """移除拖动条"""
+            self._throttle.cancel()
+            self.parentWidget().removeEventFilter(self)
+            self.hide()
+            self.deleteLater()
+
+        def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+            # 窗口大小变化后重新贴到内侧边缘
+            if event.type() == QEvent.Resize:
+                self._place()
+            return False
+
+        def mousePressEvent(self, event):
+            if event.button() == Qt.LeftButton:
+                self._press = event.globalPosition()
+                self._start_width = self._pending = self.width_value
+                event.accept()
+
+        def mouseMoveEvent(self, event):
+            if self._press is None:
+                return
+            ratio = self.devicePixelRatioF()
+            delta = event.globalPosition() - self._press
+            self._pending = resize_width(self.edge, self._start_width,
+                                         int(delta.x() * ratio), int(delta.y() * ratio),
+                                         max_width=self.max_width)
+            self._throttle.request()
+            event.accept()
+
+        def mouseReleaseEvent(self, event):
+            if self._press is None or event.button() != Qt.LeftButton:
+                return
+            self._press = None
+            self._throttle.cancel()
+            self.width_value = self._pending
+            if self._pending != self._start_width:
+                self.on_release(self._pending)
+            event.accept()
+
+        def _apply_pending(self):
+            if self._press is not None:
+                self.on_drag(self._pending)
+
+        def _update_cursor(self):
+            horizontal = self.edge in (ABE_LEFT, ABE_RIGHT)
+            self.setCursor(Qt.SizeHorCursor if horizontal else Qt.SizeVerCursor)
+
+        def _place(self):
+            window = self.parentWidget()
+            w, h = window.width(), window.height()
+            if self.edge == ABE_LEFT:
+                self.setGeometry(w - GRIP_THICKNESS, 0, GRIP_THICKNESS, h)
+            elif self.edge == ABE_RIGHT:
+                self.setGeometry(0, 0, GRIP_THICKNESS, h)
+            elif self.edge == ABE_TOP:
+                self.setGeometry(0, h - GRIP_THICKNESS, w, GRIP_THICKNESS)
+            else:
+                self.setGeometry(0, 0, w, GRIP_THICKNESS)
+            self.raise_()
+
+    return ResizeGrip
+
+
+def __getattr__(name):
+    # 第一次访问 ResizeGrip 时创建类并缓存到模块中
+    if name == 'ResizeGrip':
+        cls = globals()['ResizeGrip'] = _create_resize_grip()
+        return cls
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,297 @@
+"""
+侧边栏主题模块
+整个侧边栏只使用一份样式表，设置在侧边栏的根控件上，按对象名选择器区分卡片、输入框和按钮，
+不再给每个控件单独 setStyleSheet（Qt 会逐个重新解析并向所有子控件级联重新计算样式）
+
+深色/浅色两套样式表各只生成一次并缓存，切换主题只替换根控件样式表中属于侧边栏的一段，
+不重建控件，也只重新计算侧边栏内控件的样式，不影响应用中的其他窗口；
+已安装 qfluentwidgets 时默认跟随 isDarkTheme()
+
+使用示例:
+    from sidebar_theme import ROLE_CARD, ROLE_ROOT, default_theme, set_role
+
+    set_role(main_widget, ROLE_ROOT)
+    set_role(config_frame, ROLE_CARD)
+    theme = default_theme()
+    theme.attach(main_widget)  # 按当前 qfluentwidgets 主题或调色板选择深色/浅色
+    theme.apply(DARK)          # 切换主题，控件保持不变
+"""
+
+import threading
+import time
+from string import Template
+from typing import Any, Dict, Optional
+
+from sidebar_trace import tracer
+
+DARK = 'dark'
+LIGHT = 'light'
+
+# 控件角色，即样式表中使用的对象名
+ROLE_ROOT = 'SidebarRoot'
+ROLE_CARD = 'SidebarCard'
+
+PALETTES: Dict[str, Dict[str, str]] = {
+    DARK: {
+        'card': '#2c2c2c',
+        'text': '#ffffff',
+        'input': '#3c3c3c',
+        'border': '#555555',
+        'accent': '#0078d4',
+        'accent_hover': '#1084d8',
+        'accent_pressed': '#006cbd',
+        'accent_text': '#ffffff',
+    },
+    LIGHT: {
+        'card': '#f3f3f3',
+        'text': '#1a1a1a',
+        'input': '#ffffff',
+        'border': '#d0d0d0',
+        'accent': '#0067c0',
+        'accent_hover': '#1975c5',
+        'accent_pressed': '#005ba1',
+        'accent_text': '#ffffff',
+    },
+}
+
+# 所有规则都限定在侧边栏的对象名之下，不影响应用中的其他窗口
+STYLESHEET_TEMPLATE = Template("""
+#SidebarRoot {
+    background-color: transparent;
+}
+QWidget#SidebarCard {
+    background-color: $card;
+    border-radius: 8px;
+    padding: 10px;
+}
+#SidebarCard QLabel {
+    color: $text;
+}
+#SidebarCard QComboBox, #SidebarCard QSpinBox {
+    background-color: $input;
+    color: $text;
+    border: 1px solid $border;
+    border-radius: 4px;
+    padding: 5px;
+}
+#SidebarCard QComboBox::drop-down {
+    border: none;
+}
+#SidebarCard QComboBox::down-arrow {
+    image: none;
+}
+#SidebarCard QPushButton {
+    background-color: $accent;
+    color: $accent_text;
+    border: none;
+    border-radius: 6px;
+    padding: 12px;
+    font-weight: bold;
+    font-size: 14px;
+}
+#SidebarCard QPushButton:hover {
+    background-color: $accent_hover;
+}
+#SidebarCard QPushButton:pressed {
+    background-color: $accent_pressed;
+}
+""")
+
+# 样式表中属于侧边栏的一段的边界，切换主题时只替换这一段
+_BEGIN = '/* sidebar-theme:begin */'
+_END = '/* sidebar-theme:end */'
+
+
+def set_role(widget, role: str):
+    """设置控件的角色（对象名），并让普通 QWidget 绘制样式表中的背景"""
+    from PySide6.QtCore import Qt
+
+    widget.setObjectName(role)
+    widget.setAttribute(Qt.WA_StyledBackground, True)
+
+
+def detect_mode(app=None) -> str:
+    """
+    返回当前应使用的主题
+
+    已安装 qfluentwidgets 时使用 isDarkTheme()，否则按应用调色板的窗口背景亮度判断
+    """
+    try:
+        from qfluentwidgets import isDarkTheme
+    except ImportError:
+        pass
+    else:
+        return DARK if isDarkTheme() else LIGHT
+    if app is None:
+        return DARK
+    return DARK if app.palette().window().color().lightness() < 128 else LIGHT
+
+
+def splice_stylesheet(current: str, section: str) -> str:
+    """把侧边栏的一段样式替换（或追加）到已有的样式表中，其他内容保持不变"""
+    block = f'{_BEGIN}{section}{_END}'
+    start = current.find(_BEGIN)
+    if start >= 0:
+        end = current.find(_END, start)
+        if end >= 0:
+            return current[:start] + block + current[end + len(_END):]
+    return f'{current}\n{block}' if current else block
+
+
+class SidebarTheme:
+    """
+    按模式缓存编译好的样式表，并应用到登记的侧边栏根控件
+
+    没有登记根控件时应用到整个 QApplication（会重新计算应用中所有控件的样式）
+    """
+
+    def __init__(self, palettes: Optional[Dict[str, Dict[str, str]]] = None,
+                 template: Template = STYLESHEET_TEMPLATE):
+        """
+        Args:
+            palettes: {模式: 颜色表}，默认使用 PALETTES
+            template: 样式表模板，颜色以 $name 引用
+        """
+        self.palettes = palettes or PALETTES
+        self.template = template
+        self.mode: Optional[str] = None
+        self._compiled: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        # id(根控件) -> 根控件，已销毁的控件在下一次 apply() 时移除
+        self._roots: Dict[int, Any] = {}
+        self._follow = None
+
+        self._compiles = 0
+        self._cache_hits = 0
+        self._applies = 0
+        self._skipped = 0
+        self._last_apply_ns = 0
+
+    def stylesheet(self, mode: str) -> str:
+        """
+        返回指定模式的样式表，每种模式只生成一次
+
+        Raises:
+            ValueError: 未知的模式
+        """
+        with self._lock:
+            sheet = self._compiled.get(mode)
+            if sheet is not None:
+                self._cache_hits += 1
+                return sheet
+            palette = self.palettes.get(mode)
+            if palette is None:
+                raise ValueError(f"未知的主题: {mode}")
+            sheet = self.template.substitute(palette)
+            self._compiled[mode] = sheet
+            self._compiles += 1
+            return sheet
+
+    def attach(self, root, mode: Optional[str] = None) -> bool:
+        """
+        把侧边栏样式表应用到根控件及其子控件，之后 apply() 切换主题时一并更新
+
+        Args:
+            root: 侧边栏的根控件
+            mode: DARK 或 LIGHT，默认使用当前主题，尚未应用过时由 detect_mode() 决定
+
+        Returns:
+            bool: 是否修改了根控件的样式表
+        """
+        self._roots[id(root)] = root
+        if mode is None:
+            mode = self.mode
+        if mode is None:
+            from PySide6.QtWidgets import QApplication
+            mode = detect_mode(QApplication.instance())
+        self.mode = mode
+        return self._apply_to([root], mode)
+
+    def apply(self, mode: Optional[str] = None, app=None) -> bool:
+        """
+        切换主题，应用到所有登记的根控件；没有登记根控件时应用到整个应用
+
+        Args:
+            mode: DARK 或 LIGHT，默认由 detect_mode() 决定
+            app: QApplication，默认为当前实例
+
+        Returns:
+            bool: 是否修改了样式表；与当前主题相同时不做任何事
+        """
+        if app is None:
+            from PySide6.QtWidgets import QApplication
+            app = QApplication.instance()
+        mode = mode or detect_mode(app)
+        targets = self._live_roots() or [app]
+        if mode == self.mode and all(_BEGIN in target.styleSheet() for target in targets):
+            self._skipped += 1
+            return False
+        self.mode = mode
+        return self._apply_to(targets, mode)
+
+    def _live_roots(self) -> list:
+        """返回仍然存在的根控件，丢弃 C++ 对象已被销毁的"""
+        from shiboken6 import isValid
+
+        for key, root in list(self._roots.items()):
+            if not isValid(root):
+                del self._roots[key]
+        return list(self._roots.values())
+
+    def _apply_to(self, targets, mode: str) -> bool:
+        sheet = self.stylesheet(mode)
+        start = time.perf_counter_ns()
+        with tracer.span('theme.apply', mode=mode, targets=len(targets)):
+            for target in targets:
+                target.setStyleSheet(splice_stylesheet(target.styleSheet(), sheet))
+        self._last_apply_ns = time.perf_counter_ns() - start
+        self._applies += 1
+        return True
+
+    def follow_fluent_theme(self, app=None) -> bool:
+        """
+        qfluentwidgets 切换主题时自动切换
+
+        Returns:
+            bool: 未安装 qfluentwidgets 时为 False
+        """
+        try:
+            from qfluentwidgets import qconfig
+        except ImportError:
+            return False
+        if self._follow is None:
+            self._follow = lambda *_: self.apply(app=app)
+            qconfig.themeChanged.connect(self._follow)
+        return True
+
+    def invalidate(self):
+        """清空缓存的样式表（修改 palettes 或 template 之后调用）"""
+        with self._lock:
+            self._compiled.clear()
+        self.mode = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """返回生成次数、缓存命中次数、应用次数和最近一次应用的耗时"""
+        return {
+            'mode': self.mode,
+            'compiled': sorted(self._compiled),
+            'roots': len(self._roots),
+            'compiles': self._compiles,
+            'cache_hits': self._cache_hits,
+            'applies': self._applies,
+            'skipped': self._skipped,
+            'last_apply_ms': self._last_apply_ns / 1e6,
+        }
+
+
+_default_theme: Optional[SidebarTheme] = None
+_default_theme_lock = threading.Lock()
+
+
+def default_theme() -> SidebarTheme:
+    """返回进程内共享的主题"""
+    global _default_theme
+    with _default_theme_lock:
+        if _default_theme is None:
+            _default_theme = SidebarTheme()
+        return _default_theme
@@ -0,0 +1,240 @@
+"""
+侧边栏结构化跟踪模块
+提供分级事件和计时区间 (span)，关闭时几乎没有开销
+
+启用方式:
+    环境变量 SIDEBAR_TRACE=debug|info|warning|error 设置级别
+    环境变量 SIDEBAR_TRACE_FILE=trace.jsonl 将事件和区间导出为 JSON Lines 文件
+
+    或在代码中:
+        from sidebar_trace import tracer
+        tracer.configure(level='debug', path='trace.jsonl')
+
+埋点写法:
+    with tracer.span('embed', edge=edge):
+        ...
+
+    # 字段计算有开销时先判断级别，关闭时不会构造任何参数
+    if tracer.enabled:
+        tracer.event('set_pos.rect', rect=rect)
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+# 与 logging 模块的级别数值一致，避免导入时加载 logging
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 60
+
+_LEVEL_NAMES = {
+    'debug': DEBUG,
+    'info': INFO,
+    'warning': WARNING,
+    'error': ERROR,
+    'off': OFF,
+}
+
+Record = Dict[str, Any]
+Sink = Callable[[Record], None]
+
+
+class _NullSpan:
+    """关闭跟踪时返回的空区间，所有操作都是空操作"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """计时区间，退出时记录耗时和嵌套深度"""
+
+    __slots__ = ('tracer', 'name', 'fields', 'start', 'depth')
+
+    def __init__(self, tracer: 'Tracer', name: str, fields: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.fields = fields
+        self.start = 0.0
+        self.depth = 0
+
+    def __enter__(self):
+        local = self.tracer._local
+        self.depth = getattr(local, 'depth', 0)
+        local.depth = self.depth + 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        self.tracer._local.depth = self.depth
+        if exc is not None:
+            self.fields['error'] = repr(exc)
+        self.tracer._emit({
+            'type': 'span',
+            'name': self.name,
+            'level': INFO if exc is None else ERROR,
+            'ts': time.time() - duration,
+            'duration_ms': round(duration * 1000.0, 3),
+            'depth': self.depth,
+            'thread': threading.current_thread().name,
+            'fields': self.fields,
+        })
+        return False
+
+    def set(self, **fields):
+        """为区间追加字段（例如执行结果）"""
+        self.fields.update(fields)
+
+
+class JsonLinesSink:
+    """将记录以 JSON Lines 格式追加写入文件"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def __call__(self, record: Record):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + '\n')
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class LoggingSink:
+    """将记录转发到标准 logging 模块"""
+
+    def __init__(self, logger=None):
+        if logger is None:
+            import logging
+            logger = logging.getLogger('sidebar')
+        self.logger = logger
+
+    def __call__(self, record: Record):
+        if record['type'] == 'span':
+            self.logger.log(record['level'], "%s %.3fms %s",
+                            record['name'], record['duration_ms'], record['fields'])
+        else:
+            self.logger.log(record['level'], "%s %s", record['name'], record['fields'])
+
+
+class Tracer:
+    """
+    跟踪器
+
+    enabled 为普通属性，调用方可以在构造字段前直接判断，关闭时只有一次属性读取的开销
+    """
+
+    def __init__(self):
+        self.level = OFF
+        self.enabled = False
+        self.sinks: List[Sink] = []
+        self._local = threading.local()
+
+    def configure(self,
+                  level: Union[int, str, None] = None,
+                  path: Optional[str] = None,
+                  sinks: Optional[List[Sink]] = None):
+        """
+        配置跟踪器
+
+        Args:
+            level: 最低记录级别，可以是 DEBUG/INFO/... 或对应的小写名称
+            path: JSON Lines 导出文件路径
+            sinks: 额外的记录接收器
+        """
+        if level is not None:
+            if isinstance(level, str):
+                level = _LEVEL_NAMES[level.lower()]
+            self.level = level
+        if sinks:
+            self.sinks.extend(sinks)
+        if path:
+            sink = JsonLinesSink(path)
+            self.sinks.append(sink)
+            atexit.register(sink.close)
+        self.enabled = self.level < OFF and bool(self.sinks)
+
+    def is_enabled(self, level: int = DEBUG) -> bool:
+        """判断指定级别是否会被记录"""
+        return self.enabled and level >= self.level
+
+    def event(self, name: str, level: int = DEBUG, **fields):
+        """记录一条结构化事件"""
+        if not self.enabled or level < self.level:
+            return
+        self._emit({
+            'type': 'event',
+            'name': name,
+            'level': level,
+            'ts': time.time(),
+            'depth': getattr(self._local, 'depth', 0),
+            'thread': threading.current_thread().name,
+            'fields': fields,
+        })
+
+    def span(self, name: str, **fields) -> Union[Span, _NullSpan]:
+        """
+        创建计时区间
+
+        Returns:
+            上下文管理器；关闭跟踪时返回共享的空区间
+        """
+        if not self.enabled or INFO < self.level:
+            return _NULL_SPAN
+        return Span(self, name, fields)
+
+    def flush(self):
+        """将缓冲中的记录写入导出文件"""
+        for sink in self.sinks:
+            flush = getattr(sink, 'flush', None)
+            if flush:
+                flush()
+
+    def _emit(self, record: Record):
+        for sink in self.sinks:
+            try:
+                sink(record)
+            except Exception:
+                pass
+
+
+tracer = Tracer()
+
+_env_level = os.environ.get('SIDEBAR_TRACE')
+_env_path = os.environ.get('SIDEBAR_TRACE_FILE')
+if _env_level or _env_path:
+    tracer.configure(
+        level=_env_level or 'info',
+        path=_env_path,
+        sinks=None if _env_path else [LoggingSink()],
+    )
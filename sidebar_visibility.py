@@ -0,0 +1,182 @@
+"""
+可见性感知的挂起登记
+侧边栏整天常驻，但在取消嵌入、被全屏应用覆盖、自动隐藏收起、最小化或会话锁定时
+用户看不到它的内容；登记在这里的定时器、数据源、动画和控件会在不可见时自动暂停，
+重新可见时恢复并立即补做一次刷新
+
+本模块不导入 Qt，登记的对象只需要提供相应的方法（QTimer、FeedHub、SlideAnimator、QWidget）
+
+使用示例:
+    registry = sidebar.suspension
+    registry.register_timer(clock_timer)        # 不可见时停止，恢复时补触发一次 timeout
+    registry.register_feeds(feed_hub)           # 暂停轮询，恢复时立即轮询全部数据源
+    registry.register_widget(panel)             # 暂停重绘，恢复时重绘一次
+    print(registry.get_stats())                 # 可见/不可见期间的 CPU 时间和唤醒次数
+"""
+
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sidebar_trace import tracer
+
+
+class _Entry:
+    __slots__ = ('name', 'pause', 'resume')
+
+    def __init__(self, name: str, pause: Callable[[], Any], resume: Callable[[], Any]):
+        self.name = name
+        self.pause = pause
+        self.resume = resume
+
+
+class SuspensionRegistry:
+    """
+    随可见性暂停和恢复的工作
+
+    set_active(False) 依次调用各项的 pause，set_active(True) 依次调用 resume；
+    不可见时登记的新项目立即暂停。同时按可见/不可见分别统计进程 CPU 时间和唤醒次数
+    """
+
+    def __init__(self, active: bool = True,
+                 clock: Callable[[], float] = time.monotonic,
+                 cpu_clock: Callable[[], float] = time.process_time):
+        self.active = active
+        self.clock = clock
+        self.cpu_clock = cpu_clock
+        self._entries: List[_Entry] = []
+
+        self.transitions = 0
+        self._since = clock()
+        self._cpu_since = cpu_clock()
+        self._seconds = {True: 0.0, False: 0.0}
+        self._cpu = {True: 0.0, False: 0.0}
+        self._wakeups = {True: 0, False: 0}
+
+    def register(self, name: str, pause: Callable[[], Any], resume: Callable[[], Any]):
+        """登记一项工作，resume 应当包含一次补刷新"""
+        entry = _Entry(name, pause, resume)
+        self._entries.append(entry)
+        if not self.active:
+            pause()
+        return entry
+
+    def unregister(self, entry: _Entry, resume: bool = True):
+        """取消登记，当前处于暂停状态且 resume 为 True 时先恢复"""
+        if entry in self._entries:
+            self._entries.remove(entry)
+            if resume and not self.active:
+                entry.resume()
+
+    def register_timer(self, timer, name: Optional[str] = None, catch_up: bool = True):
+        """
+        登记一个 QTimer：不可见时停止，恢复时重新启动并立即补触发一次 timeout
+
+        timeout 的次数计入唤醒统计
+        """
+        state = {'was_active': False}
+
+        def pause():
+            state['was_active'] = timer.isActive()
+            timer.stop()
+
+        def resume():
+            if not state['was_active']:
+                return
+            timer.start()
+            if catch_up:
+                timer.timeout.emit()
+
+        timer.timeout.connect(self.note_wakeup)
+        return self.register(name or f'timer:{id(timer):x}', pause, resume)
+
+    def register_feeds(self, hub, name: str = 'feeds'):
+        """登记 FeedHub：暂停轮询，恢复时立即轮询全部数据源"""
+        return self.register(name, hub.pause, hub.resume)
+
+    def register_animation(self, animation, name: str = 'animation'):
+        """
+        登记动画
+
+        QAbstractAnimation 在不可见时暂停、恢复时继续；
+        只提供 finish() 的动画（例如 SlideAnimator）直接跳到结束状态
+        """
+        if hasattr(animation, 'finish'):
+            return self.register(name, animation.finish, lambda: None)
+
+        def pause():
+            if animation.state() == animation.State.Running:
+                animation.pause()
+
+        def resume():
+            if animation.state() == animation.State.Paused:
+                animation.resume()
+
+        return self.register(name, pause, resume)
+
+    def register_widget(self, widget, name: Optional[str] = None):
+        """登记 QWidget：不可见时暂停重绘，恢复时重绘一次"""
+        def resume():
+            widget.setUpdatesEnabled(True)
+            widget.update()
+
+        return self.register(name or f'widget:{id(widget):x}',
+                             lambda: widget.setUpdatesEnabled(False), resume)
+
+    def set_active(self, active: bool) -> bool:
+        """
+        切换可见性
+
+        Returns:
+            bool: 状态是否发生变化
+        """
+        if active == self.active:
+            return False
+        self._account()
+        self.active = active
+        self.transitions += 1
+        failed = []
+        for entry in list(self._entries):
+            try:
+                entry.resume() if active else entry.pause()
+            except Exception as e:
+                failed.append((entry.name, str(e)))
+        if tracer.enabled:
+            tracer.event('sidebar.suspension', active=active, items=len(self._entries),
+                         failed=failed or None)
+        return True
+
+    def note_wakeup(self, *_):
+        """记录一次唤醒（定时器触发、原生消息等）"""
+        self._wakeups[self.active] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        返回统计
+
+        Returns:
+            dict: seconds/cpu_ms/wakeups 按 visible（可见）和 hidden（不可见）分别统计，
+                  wakeups_per_minute 为各状态下平均每分钟的唤醒次数
+        """
+        self._account()
+
+        def per_minute(state):
+            seconds = self._seconds[state]
+            return self._wakeups[state] * 60.0 / seconds if seconds else 0.0
+
+        return {
+            'active': self.active,
+            'items': len(self._entries),
+            'transitions': self.transitions,
+            'seconds': {'visible': self._seconds[True], 'hidden': self._seconds[False]},
+            'cpu_ms': {'visible': self._cpu[True] * 1e3, 'hidden': self._cpu[False] * 1e3},
+            'wakeups': {'visible': self._wakeups[True], 'hidden': self._wakeups[False]},
+            'wakeups_per_minute': {'visible': per_minute(True), 'hidden': per_minute(False)},
+        }
+
+    def _account(self):
+        now = self.clock()
+        cpu = self.cpu_clock()
+        self._seconds[self.active] += now - self._since
+        self._cpu[self.active] += cpu - self._cpu_since
+        self._since = now
+        self._cpu_since = cpu
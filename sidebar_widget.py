@@ -1,329 +1,1301 @@
-"""
-Windows 侧边栏组件模块
-提供简单易用的侧边栏嵌入功能
-
-使用示例:
-    from sidebar_widget import SidebarWidget
-    
-    # 在你的窗口类中
-    class MyWindow(QMainWindow):
-        def __init__(self):
-            super().__init__()
-            # ... 其他初始化代码 ...
-            
-            # 创建侧边栏组件
-            self.sidebar = SidebarWidget(self)
-            
-            # 添加切换按钮
-            toggle_btn = QPushButton("切换侧边栏")
-            toggle_btn.clicked.connect(self.sidebar.toggle)
-"""
-
-import json
-import os
-from typing import Optional, Dict, Any, Callable
-from PySide6.QtWidgets import QMainWindow
-from PySide6.QtCore import Qt, QObject, Signal
-from appbar_helper import AppBar, ABE_LEFT, ABE_RIGHT
-
-class SidebarWidget(QObject):
-    """
-    侧边栏组件类
-    
-    提供简单的侧边栏嵌入/取消功能
-    """
-    
-    # 信号定义
-    embedded = Signal()      # 嵌入成功信号
-    unembedded = Signal()    # 取消嵌入信号
-    error = Signal(str)      # 错误信号
-    
-    def __init__(self, 
-                 window: QMainWindow,
-                 config_file: str = "sidebar_config.json",
-                 default_config: Optional[Dict[str, Any]] = None):
-        """
-        初始化侧边栏组件
-        
-        Args:
-            window: 要嵌入的主窗口
-            config_file: 配置文件路径
-            default_config: 默认配置字典
-        """
-        super().__init__()
-        
-        self.window = window
-        self.config_file = config_file
-        self.appbar: Optional[AppBar] = None
-        self.is_embedded = False
-        
-        # 保存窗口状态
-        self.saved_geometry = None
-        self.saved_window_flags = None
-        
-        # 默认配置
-        self.default_config = default_config or {
-            'edge': 'left',        # 'left' 或 'right'
-            'width': 300,          # 宽度
-            'top_offset': 0,       # 顶部偏移
-            'auto_save': True,     # 是否自动保存配置
-        }
-        
-        # 加载配置
-        self.config = self.load_config()
-        
-        # 回调函数
-        self.on_embedded: Optional[Callable] = None
-        self.on_unembedded: Optional[Callable] = None
-        self.on_error: Optional[Callable[[str], None]] = None
-    
-    def set_config(self, **kwargs):
-        """
-        设置配置参数
-        
-        支持的参数:
-            edge: 'left' 或 'right'
-            width: 宽度 (int)
-            top_offset: 顶部偏移 (int)
-            auto_save: 是否自动保存配置 (bool)
-        """
-        for key, value in kwargs.items():
-            if key in self.default_config:
-                self.config[key] = value
-            else:
-                raise ValueError(f"不支持的配置参数: {key}")
-        
-        if self.config.get('auto_save', True):
-            self.save_config()
-    
-    def embed(self) -> bool:
-        """
-        嵌入为侧边栏
-        
-        Returns:
-            bool: 是否成功嵌入
-        """
-        if self.is_embedded:
-            return True
-        
-        try:
-            # 保存当前窗口状态
-            self.saved_geometry = self.window.geometry()
-            self.saved_window_flags = self.window.windowFlags()
-            
-            # 获取配置
-            edge_str = self.config.get('edge', 'left')
-            edge = ABE_LEFT if edge_str == 'left' else ABE_RIGHT
-            width = self.config.get('width', 300)
-            top_offset = self.config.get('top_offset', 0)
-            
-            # 获取窗口句柄
-            hwnd = int(self.window.winId())
-            
-            # 设置无边框窗口
-            self.window.setWindowFlags(Qt.Window | Qt.FramelessWindowHint)
-            self.window.show()
-            
-            # 创建并注册AppBar
-            self.appbar = AppBar(hwnd, edge=edge, width=width, top_offset=top_offset)
-            self.appbar.register()
-            
-            self.is_embedded = True
-            
-            # 保存状态到配置
-            if self.config.get('auto_save', True):
-                self.save_config()
-            
-            # 发射信号和调用回调
-            self.embedded.emit()
-            if self.on_embedded:
-                self.on_embedded()
-            
-            return True
-            
-        except Exception as e:
-            error_msg = f"嵌入失败: {str(e)}"
-            self.error.emit(error_msg)
-            if self.on_error:
-                self.on_error(error_msg)
-            return False
-    
-    def unembed(self) -> bool:
-        """
-        取消侧边栏嵌入
-        
-        Returns:
-            bool: 是否成功取消嵌入
-        """
-        if not self.is_embedded:
-            return True
-        
-        try:
-            # 取消注册AppBar
-            if self.appbar:
-                self.appbar.unregister()
-                self.appbar = None
-            
-            # 恢复窗口标志
-            if self.saved_window_flags is not None:
-                self.window.setWindowFlags(self.saved_window_flags)
-            else:
-                self.window.setWindowFlags(Qt.Window)
-            
-            self.window.show()
-            
-            # 恢复窗口几何信息
-            if self.saved_geometry is not None:
-                self.window.setGeometry(self.saved_geometry)
-            
-            self.is_embedded = False
-            
-            # 保存状态到配置
-            if self.config.get('auto_save', True):
-                self.save_config()
-            
-            # 发射信号和调用回调
-            self.unembedded.emit()
-            if self.on_unembedded:
-                self.on_unembedded()
-            
-            return True
-            
-        except Exception as e:
-            error_msg = f"取消嵌入失败: {str(e)}"
-            self.error.emit(error_msg)
-            if self.on_error:
-                self.on_error(error_msg)
-            return False
-    
-    def toggle(self) -> bool:
-        """
-        切换侧边栏状态
-        
-        Returns:
-            bool: 操作是否成功
-        """
-        if self.is_embedded:
-            return self.unembed()
-        else:
-            return self.embed()
-    
-    def save_config(self):
-        """保存配置到文件"""
-        try:
-            config_to_save = self.config.copy()
-            config_to_save['is_embedded'] = self.is_embedded
-            
-            # 如果当前不是嵌入状态，保存窗口几何信息
-            if not self.is_embedded and self.window:
-                geometry = self.window.geometry()
-                config_to_save['window_geometry'] = {
-                    'x': geometry.x(),
-                    'y': geometry.y(),
-                    'width': geometry.width(),
-                    'height': geometry.height()
-                }
-            
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config_to_save, f, indent=2, ensure_ascii=False)
-                
-        except Exception as e:
-            error_msg = f"保存配置失败: {str(e)}"
-            self.error.emit(error_msg)
-            if self.on_error:
-                self.on_error(error_msg)
-    
-    def load_config(self) -> Dict[str, Any]:
-        """从文件加载配置"""
-        config = self.default_config.copy()
-        
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    saved_config = json.load(f)
-                    config.update(saved_config)
-            except Exception as e:
-                error_msg = f"加载配置失败: {str(e)}"
-                self.error.emit(error_msg)
-                if self.on_error:
-                    self.on_error(error_msg)
-        
-        return config
-    
-    def restore_window_geometry(self):
-        """恢复窗口几何信息"""
-        window_geometry = self.config.get('window_geometry')
-        if window_geometry and self.window:
-            from PySide6.QtCore import QRect
-            geometry = QRect(
-                window_geometry['x'],
-                window_geometry['y'],
-                window_geometry['width'],
-                window_geometry['height']
-            )
-            self.window.setGeometry(geometry)
-    
-    def cleanup(self):
-        """清理资源（通常在窗口关闭时调用）"""
-        if self.is_embedded:
-            self.unembed()
-    
-    def get_status(self) -> Dict[str, Any]:
-        """
-        获取当前状态信息
-        
-        Returns:
-            dict: 包含当前状态的字典
-        """
-        return {
-            'is_embedded': self.is_embedded,
-            'config': self.config.copy(),
-            'has_saved_geometry': self.saved_geometry is not None
-        }
-
-
-class SidebarMixin:
-    """
-    侧边栏混入类
-    
-    为现有的QMainWindow类添加侧边栏功能
-    """
-    
-    def init_sidebar(self, 
-                    config_file: str = "sidebar_config.json",
-                    default_config: Optional[Dict[str, Any]] = None,
-                    auto_restore: bool = True):
-        """
-        初始化侧边栏功能
-        
-        Args:
-            config_file: 配置文件路径
-            default_config: 默认配置
-            auto_restore: 是否自动恢复窗口几何信息
-        """
-        self.sidebar = SidebarWidget(self, config_file, default_config)
-        
-        if auto_restore:
-            self.sidebar.restore_window_geometry()
-        
-        # 连接窗口关闭事件
-        original_close_event = getattr(self, 'closeEvent', None)
-        
-        def closeEvent(event):
-            self.sidebar.cleanup()
-            if original_close_event:
-                original_close_event(event)
-        
-        self.closeEvent = closeEvent
-    
-    def toggle_sidebar(self):
-        """切换侧边栏状态"""
-        return self.sidebar.toggle()
-    
-    def embed_sidebar(self):
-        """嵌入侧边栏"""
-        return self.sidebar.embed()
-    
-    def unembed_sidebar(self):
-        """取消嵌入侧边栏"""
-        return self.sidebar.unembed()
\ No newline at end of file
+"""
+Windows 侧边栏组件模块
+提供简单易用的侧边栏嵌入功能
+
+使用示例:
+    from sidebar_widget import SidebarWidget
+    
+    # 在你的窗口类中
+    class MyWindow(QMainWindow):
+        def __init__(self):
+            super().__init__()
+            # ... 其他初始化代码 ...
+            
+            # 创建侧边栏组件
+            self.sidebar = SidebarWidget(self)
+            
+            # 添加切换按钮
+            toggle_btn = QPushButton("切换侧边栏")
+            toggle_btn.clicked.connect(self.sidebar.toggle)
+"""
+
+import os
+import threading
+import time
+import weakref
+from typing import TYPE_CHECKING, Optional, Dict, Any, Callable, Set
+from PySide6.QtCore import Qt, QEvent, QObject, QTimer, Signal
+from appbar_helper import AppBar
+from appbar_events import (ABN_FULLSCREENAPP, ABN_POSCHANGED, ABN_STATECHANGE,
+                           SPI_SETWORKAREA, WM_DISPLAYCHANGE, WM_DPICHANGED, WM_SETTINGCHANGE,
+                           WM_WTSSESSION_CHANGE, WTS_SESSION_LOCK, WTS_SESSION_UNLOCK,
+                           RepositionThrottle, register_callback_message)
+from appbar_layout import ABE_LEFT, ABE_RIGHT, edge_from_name
+from appbar_native import NativeApi, default_native
+from config_store import ConfigStore, DEFAULT_STORE_PATH
+from config_writer import ConfigWriter
+from dpi_scale import DpiScaler
+from monitor_topology import MonitorTopology, default_topology
+from sidebar_animation import SlideAnimator, slide_keyframes
+from sidebar_config import SidebarConfig, SidebarState
+from sidebar_metrics import Metrics, MetricsExporter
+from sidebar_trace import tracer, WARNING
+from sidebar_visibility import SuspensionRegistry
+from window_style import SavedStyle, apply_docked_style, read_style, restore_style
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from PySide6.QtWidgets import QMainWindow
+
+# 自动隐藏模式下鼠标离开后延迟收起的时间（毫秒）
+AUTO_HIDE_DELAY_MS = 400
+# 嵌入且未被全屏应用覆盖时，检查窗口是否被其他窗口完全覆盖的间隔（毫秒）
+OCCLUSION_POLL_MS = 1000
+
+# 已经连接了Qt屏幕变化信号的拓扑对象
+_watched_topologies = weakref.WeakSet()
+
+# 异步嵌入/取消嵌入使用的原生调用线程
+_native_executor = None
+_native_executor_lock = threading.Lock()
+
+
+def native_executor():
+    """
+    获取进程内共享的原生调用线程
+    
+    只有一个工作线程，所有侧边栏的 SHAppBarMessage 按提交顺序串行执行；
+    窗口标志、显示和移动等需要窗口所属线程的操作仍留在GUI线程
+    """
+    global _native_executor
+    with _native_executor_lock:
+        if _native_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _native_executor = ThreadPoolExecutor(max_workers=1,
+                                                  thread_name_prefix='SidebarNative')
+        return _native_executor
+
+
+def _completed(result: bool) -> 'Future':
+    """返回已经完成的 Future"""
+    # concurrent.futures 会加载 logging，推迟到第一次异步操作时导入
+    from concurrent.futures import Future
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def watch_screen_changes(topology: MonitorTopology):
+    """
+    将Qt的屏幕变化信号连接到拓扑缓存的失效
+    
+    屏幕增减、分辨率、可用区域（任务栏/AppBar变化）和DPI变化时使缓存失效，
+    同一个拓扑对象只会连接一次
+    """
+    from PySide6.QtGui import QGuiApplication
+    
+    app = QGuiApplication.instance()
+    if app is None or topology in _watched_topologies:
+        return
+    _watched_topologies.add(topology)
+    
+    def invalidate(*_):
+        topology.invalidate()
+    
+    def watch(screen):
+        screen.geometryChanged.connect(invalidate)
+        screen.availableGeometryChanged.connect(invalidate)
+        screen.logicalDotsPerInchChanged.connect(invalidate)
+    
+    def on_screen_added(screen):
+        watch(screen)
+        invalidate()
+    
+    for screen in app.screens():
+        watch(screen)
+    app.screenAdded.connect(on_screen_added)
+    app.screenRemoved.connect(invalidate)
+    app.primaryScreenChanged.connect(invalidate)
+
+
+class SidebarWidget(QObject):
+    """
+    侧边栏组件类
+    
+    提供简单的侧边栏嵌入/取消功能
+    """
+    
+    # 信号定义
+    embedded = Signal()      # 嵌入成功信号
+    unembedded = Signal()    # 取消嵌入信号
+    error = Signal(str)      # 错误信号
+    fullscreenAppChanged = Signal(bool)  # 全屏应用出现/消失信号
+    visibilityChanged = Signal(bool)     # 实际可见性变化信号
+    
+    # 后台写入失败时从写入线程发出，排队到GUI线程处理
+    _save_failed = Signal(str)
+    # 原生调用线程完成后发出，参数为在GUI线程中执行的回调
+    _native_done = Signal(object)
+    
+    def __init__(self, 
+                 window: 'QMainWindow',
+                 config_file: str = "sidebar_config.json",
+                 default_config: Optional[Dict[str, Any]] = None,
+                 writer: Optional[ConfigWriter] = None,
+                 topology: Optional[MonitorTopology] = None,
+                 profile: Optional[str] = None,
+                 store: Optional[ConfigStore] = None,
+                 metrics: Optional[Metrics] = None,
+                 native: Optional[NativeApi] = None):
+        """
+        初始化侧边栏组件
+        
+        配置保存在统一配置文件的 profile 配置档中；旧版的单独配置文件
+        config_file 仅在配置档不存在时导入一次
+        
+        Args:
+            window: 要嵌入的主窗口
+            config_file: 旧版配置文件路径，同时用于推导默认的配置档名称
+            default_config: 默认配置字典，键为 SidebarConfig 的字段
+            writer: 配置写入器，仅在未指定 store 时使用，默认使用进程内共享的后台写入器；
+                    同一配置文件的侧边栏必须使用同一个写入器
+            topology: 显示器拓扑缓存，默认使用进程内共享的拓扑
+            profile: 配置档名称，默认为 config_file 去掉扩展名后的文件名
+            store: 配置存储，默认使用 config_file 同目录下的共享统一配置文件
+            metrics: 运行指标，默认每个侧边栏单独记录
+            native: 原生调用层，默认使用进程内共享的 Win32 实现
+        """
+        super().__init__()
+        # 启动指标 time_to_docked 的起点
+        self._created = time.perf_counter()
+        
+        self.window = window
+        self.config_file = config_file
+        self.profile = profile or os.path.splitext(os.path.basename(config_file))[0]
+        if store is None:
+            store_path = os.path.join(os.path.dirname(config_file), DEFAULT_STORE_PATH)
+            store = ConfigStore.shared(store_path, writer)
+        self.store = store
+        self.writer = store.writer
+        self._save_failed.connect(self._on_save_failed)
+        self._native_done.connect(self._on_native_done)
+        self.metrics = metrics or Metrics()
+        self._metrics_exporter: Optional[MetricsExporter] = None
+        self.topology = topology or default_topology()
+        # 配置中的尺寸为逻辑像素，按所在显示器的缩放比例换算为物理像素
+        self.dpi = DpiScaler(self.topology)
+        self.native = native or default_native()
+        watch_screen_changes(self.topology)
+        self.appbar: Optional[AppBar] = None
+        self.is_embedded = False
+        # 由 SidebarManager.add() 设置，被管理时定位交给管理器统一处理
+        self.manager = None
+        
+        # 保存窗口状态
+        self.saved_geometry = None
+        self.saved_window_flags = None
+        self.saved_style: Optional[SavedStyle] = None
+        
+        # Shell 通知处理：一串通知合并为每帧最多一次重新定位
+        self.fullscreen_app_active = False
+        self._reposition_timer = QTimer(self)
+        self._reposition_timer.setSingleShot(True)
+        self._reposition_throttle = RepositionThrottle(
+            self._reposition,
+            lambda delay: self._reposition_timer.start(int(delay * 1000)),
+        )
+        self._reposition_timer.timeout.connect(self._reposition_throttle.fire)
+        # 上次收到工作区域变化时所在显示器的工作区域
+        self._work_area = None
+        
+        # 滑入/滑出动画，每帧只移动窗口
+        self._animator = SlideAnimator(self._move_animated, parent=self)
+        
+        # 不可见（未嵌入、全屏应用覆盖、自动隐藏收起、最小化、会话锁定）时
+        # 暂停登记的定时器、数据源和动画，重新可见时恢复并补刷新一次
+        self.session_locked = False
+        self._session_hwnd: Optional[int] = None
+        self.suspension = SuspensionRegistry(active=False)
+        self.suspension.register_animation(self._animator, 'slide')
+        # 被其他窗口完全覆盖：Windows 不会通知，只能定时检查；
+        # 检查定时器不登记在 suspension 中，覆盖期间继续运行才能发现重新露出
+        self.window_occluded = False
+        self._occlusion_timer = QTimer(self)
+        self._occlusion_timer.setInterval(OCCLUSION_POLL_MS)
+        self._occlusion_timer.timeout.connect(self._check_occlusion)
+        
+        # 自动隐藏：鼠标离开窗口后延迟收起
+        self._collapse_timer = QTimer(self)
+        self._collapse_timer.setSingleShot(True)
+        self._collapse_timer.setInterval(AUTO_HIDE_DELAY_MS)
+        self._collapse_timer.timeout.connect(lambda: self._set_expanded(False))
+        
+        # 内侧边缘的拖动条，嵌入后创建
+        self._resize_grip = None
+        
+        # 尚未完成的异步嵌入/取消嵌入
+        self._pending: Optional['Future'] = None
+        self._pending_kind: Optional[str] = None
+        
+        # 默认配置，字段定义见 SidebarConfig
+        self.default_config = SidebarConfig(**(default_config or {}))
+        
+        # 回调函数
+        self.on_embedded: Optional[Callable] = None
+        self.on_unembedded: Optional[Callable] = None
+        self.on_error: Optional[Callable[[str], None]] = None
+        
+        # 加载配置，上次退出时保存的运行状态同时读入 self.state；
+        # restore_state() 只读取它，之后保存配置时另外生成快照，不修改它
+        self.state = SidebarState()
+        self.config = self.load_config()
+        # 最近一次保存的普通窗口几何信息，嵌入状态下保存时沿用
+        self._saved_geometry = self.state.window_geometry
+        
+        # 显示/隐藏/最小化和自动隐藏的 Enter/Leave 都由窗口事件过滤器处理
+        window.installEventFilter(self)
+    
+    def set_config(self, **kwargs) -> Set[str]:
+        """
+        设置配置参数，任一参数不合法时不做任何修改
+        
+        支持的参数:
+            edge: 'left' 或 'right'
+            width: 宽度，逻辑像素 (int)
+            top_offset: 顶部偏移，逻辑像素 (int)
+            auto_save: 是否自动保存配置 (bool)
+            animate: 是否播放滑入/滑出动画 (bool)
+            animation_ms: 动画时长，毫秒 (int)
+            auto_hide: 是否自动隐藏 (bool)
+            auto_hide_strip: 自动隐藏时收起的细条厚度，逻辑像素 (int)
+            resizable: 是否可以拖动内侧边缘调整宽度 (bool)
+            restyle_in_place: 就地修改原生窗口样式而不是调用 setWindowFlags (bool)，下次嵌入时生效
+            tool_window: 嵌入时改为工具窗口，不在任务栏上显示 (bool)，仅 restyle_in_place 时有效
+        
+        Returns:
+            set: 实际发生变化的参数
+        
+        Raises:
+            ValueError: 参数不存在或值不合法
+        """
+        changed = self.config.update(**kwargs)
+        if changed and self.config.auto_save:
+            self.save_config()
+        return changed
+    
+    def reconfigure(self, **changes) -> bool:
+        """
+        修改配置并就地应用到已嵌入的侧边栏
+        
+        与 unembed() + embed() 不同，不会注销AppBar、修改窗口标志或恢复窗口几何，
+        只对发生变化的参数执行最少的 ABM_QUERYPOS/ABM_SETPOS/SetWindowPos；
+        只有 edge 变化时才重新注册AppBar。未嵌入时等同于 set_config()
+        
+        Args:
+            **changes: 与 set_config() 相同的参数
+        
+        Returns:
+            bool: 是否成功应用
+        """
+        changed = self.set_config(**changes)
+        
+        if 'resizable' in changed and self.is_embedded and self.appbar is not None:
+            if self.config.resizable:
+                self._attach_resize_grip()
+            else:
+                self._detach_resize_grip()
+        
+        if 'suspend_unembedded' in changed:
+            self._update_visibility()
+        
+        changed &= {'edge', 'width', 'top_offset', 'auto_hide', 'auto_hide_strip'}
+        if not self.is_embedded or self.appbar is None or not changed:
+            return True
+        
+        try:
+            with self.metrics.time('reconfigure'), \
+                    tracer.span('sidebar.reconfigure', changed=sorted(changed)):
+                appbar = self.appbar
+                if changed & {'auto_hide', 'auto_hide_strip'} or (appbar.autohide and 'edge' in changed):
+                    # 自动隐藏栏按边缘登记，切换模式或边缘时重新注册
+                    self._release_appbar()
+                    appbar.edge = edge_from_name(self.config.edge)
+                    self._apply_dpi()
+                    self._register_appbar()
+                    self._update_visibility()
+                    return True
+                
+                scale = self.dpi.scale_for_window(appbar.hwnd)
+                to_physical = self.dpi.to_physical
+                appbar.reconfigure(
+                    edge=edge_from_name(self.config.edge) if 'edge' in changed else None,
+                    width=to_physical(self.config.width, scale) if 'width' in changed else None,
+                    top_offset=(to_physical(self.config.top_offset, scale)
+                                if 'top_offset' in changed else None),
+                    set_pos=self.manager is None or appbar.autohide,
+                )
+                if self.manager is not None and not appbar.autohide:
+                    self.manager.request_relayout()
+                if self._resize_grip is not None:
+                    self._resize_grip.set_edge(appbar.edge, appbar.width)
+                return True
+            
+        except Exception as e:
+            self._report_error('reconfigure', f"应用配置失败: {str(e)}")
+            return False
+    
+    def embed(self) -> bool:
+        """
+        嵌入为侧边栏
+        
+        启用 animate 时窗口先从屏幕外滑入，到位后才登记保留区域，
+        其他窗口只在动画结束时重排一次；embedded 信号在动画结束后发出
+        
+        Returns:
+            bool: 是否成功嵌入（动画模式下表示已开始滑入）
+        """
+        self._cancel_pending(wait=True)
+        if self.is_embedded:
+            return True
+        
+        try:
+            with self.metrics.time('embed'), tracer.span('sidebar.embed') as span:
+                # 正在滑出时直接重新注册，窗口状态此前已经保存
+                interrupted = self._animator.stop()
+                if self.appbar is None:
+                    self._prepare_embed()
+                
+                if self._should_animate() and not interrupted:
+                    span.set(animate=True)
+                    self.is_embedded = True
+                    self._animator.start(
+                        slide_keyframes(self.appbar.target_rect(), self.appbar.edge,
+                                        self.config.animation_ms, slide_in=True),
+                        on_finished=self._on_slide_in_finished)
+                    return True
+                
+                self._register_appbar()
+                self._finish_embed()
+                return True
+            
+        except Exception as e:
+            self._report_error('embed', f"嵌入失败: {str(e)}")
+            return False
+    
+    def _prepare_embed(self, show: bool = True):
+        """
+        保存窗口状态、切换为无边框窗口并创建AppBar（尚未注册）
+        
+        Args:
+            show: 是否显示窗口；启动时恢复嵌入状态时先不显示，确定最终位置后再显示
+        """
+        # 保存当前窗口状态
+        self.saved_geometry = self.window.geometry()
+        self.saved_window_flags = self.window.windowFlags()
+        
+        if self.config.restyle_in_place:
+            # 直接修改现有原生窗口的样式，句柄保持不变；Qt 的窗口标志先同步，最终样式以原生写入的为准
+            hwnd = int(self.window.winId())
+            saved = read_style(hwnd, self.native)
+            flags = self.saved_window_flags | Qt.FramelessWindowHint
+            if self.config.tool_window:
+                flags |= Qt.Tool
+            self._sync_qt_flags(flags)
+            self.saved_style = apply_docked_style(hwnd, self.native, self.config.tool_window, saved)
+            if show and not self.window.isVisible():
+                self.window.show()
+        else:
+            # setWindowFlags() 会重建原生窗口，句柄必须在之后读取
+            self.saved_style = None
+            self.window.setWindowFlags(Qt.Window | Qt.FramelessWindowHint)
+            if show:
+                self.window.show()
+            hwnd = int(self.window.winId())
+        
+        self.appbar = AppBar(hwnd, edge=edge_from_name(self.config.edge),
+                             topology=self.topology,
+                             callback_message=register_callback_message(),
+                             native=self.native)
+        self._apply_dpi()
+    
+    def _sync_qt_flags(self, flags):
+        """
+        让 Qt 记录的窗口标志与就地修改的原生样式一致，之后 Qt 重新计算样式时不会改回去
+        
+        QWidget.setWindowFlags() 会重建原生窗口；overrideWindowFlags() 只修改控件记录的标志，
+        QWindow.setFlags() 在原有窗口上更新样式，两者都不重建
+        """
+        self.window.overrideWindowFlags(flags)
+        handle = self.window.windowHandle()
+        if handle is not None:
+            handle.setFlags(flags)
+    
+    def _apply_dpi(self) -> bool:
+        """
+        按所在显示器的缩放比例，把配置中的逻辑像素换算为AppBar使用的物理像素
+        
+        Returns:
+            bool: 物理尺寸是否发生变化
+        """
+        appbar = self.appbar
+        if self._resize_grip is not None and self._resize_grip.dragging:
+            # 拖动过程中的宽度尚未写入配置
+            return False
+        scale = self.dpi.scale_for_window(appbar.hwnd)
+        to_physical = self.dpi.to_physical
+        dims = (to_physical(self.config.width, scale),
+                to_physical(self.config.top_offset, scale),
+                to_physical(self.config.auto_hide_strip, scale))
+        if dims == (appbar.width, appbar.top_offset, appbar.autohide_strip):
+            return False
+        appbar.width, appbar.top_offset, appbar.autohide_strip = dims
+        if self._resize_grip is not None:
+            self._resize_grip.set_edge(appbar.edge, appbar.width)
+        return True
+    
+    def _register_appbar(self):
+        """注册AppBar并开始接收Shell通知"""
+        self._attach_appbar(self._register_native(
+            self.appbar, self.config.auto_hide, managed=self.manager is not None))
+    
+    @staticmethod
+    def _register_native(appbar: AppBar, auto_hide: bool, managed: bool):
+        """
+        注册AppBar并保留区域，只调用 SHAppBarMessage，可以在原生调用线程中执行
+        
+        Returns:
+            窗口应移动到的矩形；由管理器统一布局时为 None
+        """
+        appbar.register(set_pos=False)
+        if auto_hide:
+            # 同一边缘已有自动隐藏栏时 Shell 拒绝注册，退回普通停靠
+            appbar.expanded = False
+            if not appbar.set_autohide(True) and tracer.enabled:
+                tracer.event('sidebar.auto_hide_rejected', WARNING, edge=appbar.edge)
+        
+        # 自动隐藏栏不参与管理器的空间分配
+        if managed and not appbar.autohide:
+            return None
+        return appbar.reserve_target()
+    
+    def _attach_appbar(self, rect):
+        """GUI线程部分：移动窗口、安装事件过滤器和拖动条"""
+        appbar = self.appbar
+        if rect is not None:
+            appbar.move_window(rect)
+        else:
+            self.manager.request_relayout()
+        self._work_area = None
+        
+        # 接收Shell通知和显示器变化消息
+        from native_event_filter import native_event_filter
+        native_event_filter().add_window(
+            self.appbar.hwnd, self._on_native_message,
+            (self.appbar.callback_message, WM_DISPLAYCHANGE, WM_DPICHANGED, WM_SETTINGCHANGE,
+             WM_WTSSESSION_CHANGE))
+        if self.native.register_session_notification(appbar.hwnd):
+            self._session_hwnd = appbar.hwnd
+        
+        if self.config.resizable:
+            self._attach_resize_grip()
+    
+    def _attach_resize_grip(self):
+        """在内侧边缘放置拖动条"""
+        from sidebar_resize import ResizeGrip
+        
+        appbar = self.appbar
+        l, t, r, b = appbar.monitor_info().monitor
+        # 最多占据半个屏幕
+        max_width = (r - l if appbar.edge in (ABE_LEFT, ABE_RIGHT) else b - t) // 2
+        self._resize_grip = ResizeGrip(
+            self.window, appbar.edge, appbar.width,
+            on_drag=self._on_resize_drag,
+            on_release=self._on_resize_release,
+            max_width=max_width)
+    
+    def _detach_resize_grip(self):
+        if self._resize_grip is not None:
+            self._resize_grip.detach()
+            self._resize_grip = None
+    
+    def _on_resize_drag(self, width: int):
+        """拖动过程中只移动窗口，不修改保留区域"""
+        if self.appbar is None:
+            return
+        self.appbar.width = width
+        self.appbar.move_window(self.appbar.resized_rect(width))
+    
+    def _on_resize_release(self, width: int):
+        """松开鼠标：一次 ABM_QUERYPOS/ABM_SETPOS 更新保留区域，并保存一次配置"""
+        if tracer.enabled:
+            tracer.event('sidebar.resize', width=width)
+        appbar = self.appbar
+        if appbar is None or not self.is_embedded:
+            self.reconfigure(width=width)
+            return
+        # 拖动条使用物理像素，配置中保存逻辑像素
+        scale = self.dpi.scale_for_window(appbar.hwnd)
+        width = self.dpi.to_logical(width, scale)
+        if width != self.config.width:
+            self.reconfigure(width=width)
+            return
+        # 换算后宽度没有变化时 reconfigure() 不会重新定位，
+        # 拖动中已经移动过的窗口需要回到按配置宽度确认的位置
+        appbar.reconfigure(width=self.dpi.to_physical(width, scale),
+                           set_pos=self.manager is None or appbar.autohide)
+        if self.manager is not None and not appbar.autohide:
+            self.manager.request_relayout()
+        if self._resize_grip is not None:
+            self._resize_grip.set_edge(appbar.edge, appbar.width)
+    
+    def _finish_embed(self):
+        self.is_embedded = True
+        self._update_visibility()
+        
+        # 保存状态到配置
+        if self.config.auto_save:
+            self.save_config()
+        
+        # 发射信号和调用回调
+        self.embedded.emit()
+        if self.on_embedded:
+            self.on_embedded()
+    
+    def _on_slide_in_finished(self):
+        """滑入动画结束：一次性登记保留区域"""
+        try:
+            with tracer.span('sidebar.slide_in_finished'):
+                self._register_appbar()
+                self._finish_embed()
+        except Exception as e:
+            self._report_error('embed', f"嵌入失败: {str(e)}")
+    
+    def unembed(self) -> bool:
+        """
+        取消侧边栏嵌入
+        
+        启用 animate 时先释放保留区域再滑出，窗口在动画结束后恢复；
+        unembedded 信号在动画结束后发出
+        
+        Returns:
+            bool: 是否成功取消嵌入（动画模式下表示已开始滑出）
+        """
+        self._cancel_pending(wait=True)
+        # 滑出过程中无需处理；异步嵌入被取消后窗口仍需恢复
+        if not self.is_embedded and (self.appbar is None or self._animator.running):
+            return True
+        
+        try:
+            with self.metrics.time('unembed'), tracer.span('sidebar.unembed') as span:
+                # 正在滑入时直接恢复窗口
+                interrupted = self._animator.stop()
+                animate = self._should_animate() and not interrupted and self.appbar is not None
+                docked = self.appbar.target_rect() if animate else None
+                
+                # 取消注册AppBar
+                self._release_appbar()
+                self.is_embedded = False
+                
+                if animate:
+                    span.set(animate=True)
+                    self._animator.start(
+                        slide_keyframes(docked, self.appbar.edge,
+                                        self.config.animation_ms, slide_in=False),
+                        on_finished=self._on_slide_out_finished)
+                    return True
+                
+                self._finish_unembed()
+                return True
+            
+        except Exception as e:
+            self._report_error('unembed', f"取消嵌入失败: {str(e)}")
+            return False
+    
+    def _release_appbar(self):
+        """停止接收Shell通知并注销AppBar，窗口保持原位"""
+        appbar = self._detach_appbar()
+        if appbar is not None:
+            self._release_native(appbar)
+            if self.manager is not None:
+                self.manager.request_relayout()
+    
+    def _detach_appbar(self) -> Optional[AppBar]:
+        """GUI线程部分：停止接收Shell通知，移除拖动条和自动隐藏的事件过滤器"""
+        self._reposition_throttle.cancel()
+        self._detach_resize_grip()
+        if self.appbar is None:
+            return None
+        from native_event_filter import native_event_filter
+        native_event_filter().remove_window(self.appbar.hwnd)
+        if self._session_hwnd is not None:
+            self.native.unregister_session_notification(self._session_hwnd)
+            self._session_hwnd = None
+        # 不再收到解锁通知
+        self.session_locked = False
+        self._collapse_timer.stop()
+        return self.appbar
+    
+    @staticmethod
+    def _release_native(appbar: AppBar):
+        """注销自动隐藏栏和AppBar，只调用 SHAppBarMessage，可以在原生调用线程中执行"""
+        if appbar.autohide:
+            appbar.set_autohide(False)
+        if appbar.registered:
+            appbar.unregister()
+    
+    def _finish_unembed(self):
+        appbar, self.appbar = self.appbar, None
+        
+        if self.saved_style is not None:
+            # 就地恢复样式，不重建原生窗口
+            if self.saved_window_flags is not None:
+                self._sync_qt_flags(self.saved_window_flags)
+            if appbar is not None:
+                restore_style(appbar.hwnd, self.saved_style, self.native)
+            self.saved_style = None
+        else:
+            # 恢复窗口标志
+            if self.saved_window_flags is not None:
+                self.window.setWindowFlags(self.saved_window_flags)
+            else:
+                self.window.setWindowFlags(Qt.Window)
+            
+            self.window.show()
+        
+        # 恢复窗口几何信息
+        if self.saved_geometry is not None:
+            self.window.setGeometry(self.saved_geometry)
+        
+        self.is_embedded = False
+        self._update_visibility()
+        
+        # 保存状态到配置
+        if self.config.auto_save:
+            self.save_config()
+        
+        # 发射信号和调用回调
+        self.unembedded.emit()
+        if self.on_unembedded:
+            self.on_unembedded()
+    
+    def _on_slide_out_finished(self):
+        """滑出动画结束：恢复普通窗口"""
+        try:
+            with tracer.span('sidebar.slide_out_finished'):
+                self._finish_unembed()
+        except Exception as e:
+            self._report_error('unembed', f"取消嵌入失败: {str(e)}")
+    
+    def _should_animate(self) -> bool:
+        """被 SidebarManager 管理时由管理器统一布局，不单独播放动画"""
+        return self.config.animate and self.manager is None
+    
+    def _move_animated(self, rect):
+        """动画帧回调：只移动窗口，不修改保留区域"""
+        if self.appbar is not None:
+            self.appbar.move_window(rect)
+    
+    def _on_native_message(self, message: int, wparam: int, lparam: int):
+        """处理Shell通知和显示器变化消息（在Qt窗口过程中调用）"""
+        if self.appbar is None:
+            return
+        self.suspension.note_wakeup()
+        if message == self.appbar.callback_message:
+            if tracer.enabled:
+                tracer.event('sidebar.appbar_notify', code=wparam, lparam=lparam)
+            if wparam == ABN_FULLSCREENAPP:
+                active = bool(lparam)
+                if active != self.fullscreen_app_active:
+                    self.fullscreen_app_active = active
+                    self.appbar.topmost = not active
+                    self.fullscreenAppChanged.emit(active)
+                    self._update_visibility()
+                    self._reposition_throttle.request()
+            elif wparam in (ABN_POSCHANGED, ABN_STATECHANGE):
+                self._reposition_throttle.request()
+        elif message == WM_WTSSESSION_CHANGE:
+            if wparam in (WTS_SESSION_LOCK, WTS_SESSION_UNLOCK):
+                self.session_locked = wparam == WTS_SESSION_LOCK
+                self._update_visibility()
+        elif message == WM_DPICHANGED:
+            # 只有这里和显示器变化时才重新计算缩放比例
+            self.dpi.dpi_changed(self.appbar.hwnd, wparam & 0xFFFF)
+            self._reposition_throttle.request()
+        elif message == WM_SETTINGCHANGE and wparam == SPI_SETWORKAREA:
+            self._on_work_area_changed()
+        else:
+            # 显示器或工作区域变化：缓存失效后重新定位
+            if message == WM_DISPLAYCHANGE:
+                # 拓扑一并失效
+                self.dpi.invalidate()
+            else:
+                self.topology.invalidate()
+            self._reposition_throttle.request()
+    
+    def _on_work_area_changed(self):
+        """
+        工作区域变化：缓存失效，只有别人改变了所在显示器的工作区域时才重新定位
+        
+        自己的 ABM_SETPOS 同样会广播 WM_SETTINGCHANGE，每次都重新定位会再次
+        ABM_SETPOS 形成循环；执行 ABM_SETPOS 期间收到的、以及工作区域与上次
+        相同的通知都不重新定位
+        """
+        appbar = self.appbar
+        own = appbar.setpos_in_flight
+        self.topology.invalidate()
+        work = appbar.monitor_info().work
+        previous, self._work_area = self._work_area, work
+        if own or work == previous:
+            if tracer.enabled:
+                tracer.event('sidebar.work_area_ignored', own=own, work=work)
+            return
+        self._reposition_throttle.request()
+    
+    def _reposition(self):
+        """执行被合并后的重新定位"""
+        if not self.is_embedded or self.appbar is None:
+            return
+        # 窗口可能移到了缩放比例不同的显示器上
+        self._apply_dpi()
+        if self.manager is not None and not self.appbar.autohide:
+            self.manager.request_relayout()
+            return
+        try:
+            with self.metrics.time('reposition'), tracer.span('sidebar.reposition'):
+                self.appbar.set_pos()
+        except Exception as e:
+            self._report_error('reposition', f"重新定位失败: {str(e)}")
+    
+    def eventFilter(self, obj, event) -> bool:
+        """
+        窗口的显示/隐藏/最小化，以及自动隐藏模式的命中检测
+        
+        依靠窗口收到的 Enter/Leave 事件展开和收起，不轮询光标位置
+        """
+        if obj is not self.window:
+            return False
+        event_type = event.type()
+        if event_type in (QEvent.Show, QEvent.Hide, QEvent.WindowStateChange):
+            self._update_visibility()
+        elif self.appbar is not None and self.appbar.autohide:
+            if event_type == QEvent.Enter:
+                self._collapse_timer.stop()
+                self._set_expanded(True)
+            elif event_type == QEvent.Leave:
+                self._collapse_timer.start()
+        return False
+    
+    def _set_expanded(self, expanded: bool):
+        """展开或收起自动隐藏的侧边栏，只移动窗口，不改变工作区域"""
+        if self.appbar is None or not self.appbar.autohide or self.appbar.expanded == expanded:
+            return
+        try:
+            with tracer.span('sidebar.auto_hide', expanded=expanded):
+                self.appbar.set_expanded(expanded)
+        except Exception as e:
+            self._report_error('reposition', f"重新定位失败: {str(e)}")
+        self._update_visibility()
+    
+    @property
+    def effectively_visible(self) -> bool:
+        """侧边栏内容当前是否能被看到，登记在 suspension 中的工作只在可见时运行"""
+        return self.suspension.active
+    
+    def _compute_visible(self) -> bool:
+        """除遮挡以外的可见性，遮挡只在这里为 True 时才检查"""
+        window = self.window
+        if not window.isVisible() or window.isMinimized():
+            return False
+        if not self.is_embedded:
+            return not self.config.suspend_unembedded
+        appbar = self.appbar
+        if self.fullscreen_app_active or self.session_locked:
+            return False
+        # 自动隐藏收起时只剩一条细边
+        return appbar is None or not appbar.autohide or appbar.expanded
+    
+    def _update_visibility(self):
+        """重新计算实际可见性，变化时暂停或恢复登记的工作并发出 visibilityChanged"""
+        visible = self._compute_visible()
+        if visible and self.is_embedded and self.appbar is not None:
+            if not self._occlusion_timer.isActive():
+                self._occlusion_timer.start()
+        else:
+            self._occlusion_timer.stop()
+            self.window_occluded = False
+        visible = visible and not self.window_occluded
+        if self.suspension.set_active(visible):
+            if tracer.enabled:
+                tracer.event('sidebar.visibility', visible=visible,
+                             embedded=self.is_embedded,
+                             fullscreen=self.fullscreen_app_active,
+                             locked=self.session_locked,
+                             occluded=self.window_occluded)
+            self.visibilityChanged.emit(visible)
+    
+    def _check_occlusion(self):
+        """定时检查窗口是否被 Z 序在上面的窗口完全覆盖"""
+        appbar = self.appbar
+        if appbar is None:
+            return
+        try:
+            occluded = appbar.native.window_occluded(appbar.hwnd)
+        except Exception as e:
+            # 检查失败时按未被覆盖处理，不因此暂停任何工作
+            occluded = False
+            if tracer.enabled:
+                tracer.event('sidebar.occlusion_failed', WARNING, error=str(e))
+        if occluded != self.window_occluded:
+            self.window_occluded = occluded
+            self._update_visibility()
+    
+    def toggle(self) -> bool:
+        """
+        切换侧边栏状态
+        
+        Returns:
+            bool: 操作是否成功
+        """
+        if self.is_embedded:
+            return self.unembed()
+        else:
+            return self.embed()
+    
+    def embed_async(self) -> 'Future':
+        """
+        异步嵌入为侧边栏，GUI线程不等待 SHAppBarMessage
+        
+        保存窗口状态、切换无边框窗口在GUI线程中立即完成；AppBar 注册和保留区域
+        交给原生调用线程，完成后回到GUI线程移动窗口、保存配置并发出 embedded 信号。
+        配置照常由后台写入器写盘。启用 animate 时与 embed() 相同，动画本身不阻塞事件循环
+        
+        之后调用的 embed_async()/unembed_async()/embed()/unembed() 会取消尚未完成的操作
+        
+        Returns:
+            Future: 结果为是否成功嵌入；被后续操作取消时处于 cancelled 状态
+        """
+        self._cancel_pending()
+        if self.is_embedded:
+            return _completed(True)
+        if self._should_animate():
+            return _completed(self.embed())
+        
+        try:
+            with tracer.span('sidebar.embed_async'):
+                self._animator.stop()
+                if self.appbar is None:
+                    self._prepare_embed()
+        except Exception as e:
+            self._report_error('embed', f"嵌入失败: {str(e)}")
+            return _completed(False)
+        
+        appbar = self.appbar
+        auto_hide = self.config.auto_hide
+        managed = self.manager is not None
+        
+        def finish(rect):
+            self._attach_appbar(rect)
+            self._finish_embed()
+        
+        return self._submit(
+            'embed', "嵌入失败",
+            lambda: self._register_native(appbar, auto_hide, managed),
+            finish)
+    
+    def unembed_async(self) -> 'Future':
+        """
+        异步取消侧边栏嵌入，GUI线程不等待 SHAppBarMessage
+        
+        停止接收Shell通知后由原生调用线程注销AppBar，完成后回到GUI线程恢复窗口、
+        保存配置并发出 unembedded 信号；可以取消尚未完成的 embed_async()
+        
+        Returns:
+            Future: 结果为是否成功取消嵌入；被后续操作取消时处于 cancelled 状态
+        """
+        self._cancel_pending()
+        if not self.is_embedded and (self.appbar is None or self._animator.running):
+            return _completed(True)
+        if self._should_animate() and self.is_embedded:
+            return _completed(self.unembed())
+        
+        try:
+            with tracer.span('sidebar.unembed_async'):
+                self._animator.stop()
+                appbar = self._detach_appbar()
+                self.is_embedded = False
+        except Exception as e:
+            self._report_error('unembed', f"取消嵌入失败: {str(e)}")
+            return _completed(False)
+        
+        def finish(_):
+            if self.manager is not None:
+                self.manager.request_relayout()
+            self._finish_unembed()
+        
+        return self._submit(
+            'unembed', "取消嵌入失败",
+            lambda: self._release_native(appbar) if appbar is not None else None,
+            finish)
+    
+    def toggle_async(self) -> 'Future':
+        """异步切换侧边栏状态，正在嵌入时视为已嵌入"""
+        if self.is_embedded or self._pending_kind == 'embed':
+            return self.unembed_async()
+        return self.embed_async()
+    
+    def _submit(self, kind: str, error_prefix: str,
+                work: Callable[[], Any], finish: Callable[[Any], None]) -> 'Future':
+        """
+        在原生调用线程中执行 work，再在GUI线程中以其返回值调用 finish
+        
+        每一步开始前检查 Future 是否已被后续操作取消，取消后不再执行
+        """
+        from concurrent.futures import Future
+        future = Future()
+        self._pending = future
+        self._pending_kind = kind
+        started = time.perf_counter()
+        
+        def run():
+            if future.cancelled():
+                return
+            try:
+                result = work()
+            except Exception as e:
+                result = e
+            self._native_done.emit(
+                lambda: self._complete(future, kind, error_prefix, started, finish, result))
+        
+        native_executor().submit(run)
+        return future
+    
+    def _on_native_done(self, callback: Callable[[], None]):
+        callback()
+    
+    def _complete(self, future: 'Future', kind: str, error_prefix: str,
+                  started: float, finish: Callable[[Any], None], result: Any):
+        """GUI线程中完成异步操作"""
+        if future.cancelled():
+            return
+        if self._pending is future:
+            self._pending = None
+            self._pending_kind = None
+        try:
+            if isinstance(result, Exception):
+                raise result
+            finish(result)
+        except Exception as e:
+            self._report_error(kind, f"{error_prefix}: {str(e)}")
+            future.set_result(False)
+            return
+        self.metrics.observe(f'{kind}_async', (time.perf_counter() - started) * 1000)
+        future.set_result(True)
+    
+    def _cancel_pending(self, wait: bool = False):
+        """
+        取消尚未完成的异步操作
+        
+        Args:
+            wait: 是否等待原生调用线程执行完已提交的调用，
+                  之后要在GUI线程中直接操作AppBar时传 True
+        """
+        future, self._pending = self._pending, None
+        self._pending_kind = None
+        if future is None:
+            return
+        future.cancel()
+        if tracer.enabled:
+            tracer.event('sidebar.async_cancelled')
+        if wait:
+            self._wait_native_idle()
+    
+    def _wait_native_idle(self):
+        """
+        等待原生调用线程执行完已提交的调用，等待期间继续处理消息
+        
+        原生线程中的 SHAppBarMessage/SetWindowPos 会向本线程的窗口 SendMessage
+        （其他AppBar的 ABN_POSCHANGED、WM_SETTINGCHANGE），直接阻塞等待会死锁；
+        等待期间不处理用户输入，避免重入 embed()/unembed()
+        """
+        from PySide6.QtCore import QCoreApplication, QEventLoop
+        barrier = native_executor().submit(lambda: None)
+        if QCoreApplication.instance() is None:
+            barrier.result()
+            return
+        # 完成时投递一个排队信号，保证下面的等待会被唤醒
+        barrier.add_done_callback(lambda _: self._native_done.emit(lambda: None))
+        flags = QEventLoop.WaitForMoreEvents | QEventLoop.ExcludeUserInputEvents
+        while not barrier.done():
+            QCoreApplication.processEvents(flags)
+    
+    def save_config(self, embedded: Optional[bool] = None):
+        """
+        保存配置到文件
+        
+        在GUI线程中生成配置快照，交给后台写入器合并后写盘；
+        需要确保已写入磁盘时调用 flush()
+        
+        Args:
+            embedded: 保存的嵌入状态，默认为当前状态
+        """
+        try:
+            with self.metrics.time('save_config'), tracer.span('sidebar.save_config'):
+                # 如果当前不是嵌入状态，保存窗口几何信息
+                if not self.is_embedded and self.window:
+                    geometry = self.window.geometry()
+                    self._saved_geometry = {
+                        'x': geometry.x(),
+                        'y': geometry.y(),
+                        'width': geometry.width(),
+                        'height': geometry.height()
+                    }
+            
+                # 保存的运行状态单独生成，不修改 restore_state() 读取的 self.state
+                state = SidebarState(self.is_embedded if embedded is None else embedded,
+                                     self._saved_geometry)
+                data = self.config.to_dict()
+                data.update(state.to_dict())
+                self.store.save_profile(self.profile, data, on_error=self._on_writer_error)
+                
+        except Exception as e:
+            self._on_save_failed(str(e))
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        立即将待保存的配置写入磁盘
+        
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
+        
+        Returns:
+            bool: 是否全部写入完成
+        """
+        return self.store.flush(timeout)
+    
+    def _on_writer_error(self, path: str, exc: Exception):
+        """写入线程回调，转发到GUI线程"""
+        self._save_failed.emit(str(exc))
+    
+    def _on_save_failed(self, message: str):
+        self._report_error('save', f"保存配置失败: {message}")
+    
+    def _report_error(self, kind: str, error_msg: str):
+        """记录错误次数，并通过 error 信号和 on_error 回调通知"""
+        self.metrics.increment(f'errors.{kind}')
+        if tracer.enabled:
+            tracer.event('sidebar.error', WARNING, kind=kind, message=error_msg)
+        self.error.emit(error_msg)
+        if self.on_error:
+            self.on_error(error_msg)
+    
+    def load_config(self) -> SidebarConfig:
+        """
+        从统一配置文件加载配置档，旧版本的配置档先迁移到当前版本
+        
+        配置档中的运行状态（嵌入状态、窗口几何信息）读入 self.state
+        """
+        config = self.default_config.copy()
+        
+        try:
+            data = self.store.load_profile(self.profile, legacy_path=self.config_file)
+            config = SidebarConfig.from_dict(data, self.default_config)
+            self.state = SidebarState.from_dict(data)
+        except Exception as e:
+            self._report_error('load', f"加载配置失败: {str(e)}")
+        
+        return config
+    
+    def restore_window_geometry(self):
+        """恢复窗口几何信息"""
+        window_geometry = self.state.window_geometry
+        if window_geometry and self.window:
+            from PySide6.QtCore import QRect
+            geometry = QRect(
+                window_geometry['x'],
+                window_geometry['y'],
+                window_geometry['width'],
+                window_geometry['height']
+            )
+            self.window.setGeometry(geometry)
+    
+    def restore_state(self) -> bool:
+        """
+        启动时恢复上次退出时的状态，应在窗口第一次显示之前调用
+        
+        上次为嵌入状态时，在窗口显示之前就地修改样式、注册AppBar并计算出最终矩形，
+        窗口只在停靠位置显示一次，不会先以普通窗口出现再移动；
+        从创建 SidebarWidget 到嵌入完成的耗时记录为 time_to_docked 指标。
+        上次为普通窗口时只恢复窗口几何信息
+        
+        Returns:
+            bool: 是否恢复为嵌入状态
+        """
+        # 普通窗口的几何信息同时用于确定所在显示器和之后取消嵌入时的恢复
+        self.restore_window_geometry()
+        if not self.state.is_embedded or self.is_embedded:
+            return self.is_embedded
+        if self.window.isVisible():
+            return self.embed()
+        
+        try:
+            with self.metrics.time('restore'), tracer.span('sidebar.restore') as span:
+                self._prepare_embed(show=False)
+                appbar = self.appbar
+                rect = self._register_native(appbar, self.config.auto_hide,
+                                             managed=self.manager is not None)
+                # 由管理器布局时先按单独停靠的位置显示，稍后统一调整
+                docked = rect if rect is not None else appbar.target_rect()
+                from PySide6.QtCore import QRect
+                l, t, r, b = self.dpi.rect_to_logical(docked, appbar.monitor_info())
+                self.window.setGeometry(QRect(l, t, r - l, b - t))
+                self.window.show()
+                self._attach_appbar(rect)
+                self._finish_embed()
+                span.set(rect=list(docked))
+        except Exception as e:
+            self._report_error('embed', f"恢复嵌入状态失败: {str(e)}")
+            return False
+        
+        self.metrics.observe('time_to_docked', (time.perf_counter() - self._created) * 1000)
+        return True
+    
+    def start_metrics_export(self, path: str, interval: float = 60.0,
+                             format: Optional[str] = None):
+        """
+        定期将运行指标导出到本地文件
+        
+        Args:
+            path: 导出文件路径，扩展名为 .prom 时使用 Prometheus 文本格式，否则为 JSON
+            interval: 导出间隔（秒）
+            format: 'json' 或 'prometheus'，默认按扩展名判断
+        """
+        self.stop_metrics_export(export=False)
+        self._metrics_exporter = MetricsExporter(
+            self.get_metrics, path, interval, format, labels={'profile': self.profile})
+        self._metrics_exporter.start()
+    
+    def stop_metrics_export(self, export: bool = True):
+        """停止定期导出，export 为 True 时最后导出一次"""
+        if self._metrics_exporter is not None:
+            self._metrics_exporter.stop(export)
+            self._metrics_exporter = None
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        获取运行指标（可以在任意线程中调用）
+        
+        Returns:
+            dict: latency_ms 为各操作耗时直方图，counters 为错误等计数，
+                  native 为各原生函数的调用次数，config_io 为配置读写次数和字节数
+        """
+        snapshot = self.metrics.snapshot()
+        snapshot['native'] = self.native.get_stats()
+        store_stats = self.store.get_stats()
+        writer_stats = self.writer.get_stats()
+        snapshot['config_io'] = {
+            'reads': store_stats['disk_reads'],
+            'read_bytes': store_stats['bytes_read'],
+            'cache_hits': store_stats['cache_hits'],
+            'writes': writer_stats['written'],
+            'written_bytes': writer_stats['bytes_written'],
+            'write_failures': writer_stats['failed'],
+        }
+        return snapshot
+    
+    def cleanup(self):
+        """清理资源（通常在窗口关闭时调用）"""
+        self._cancel_pending(wait=True)
+        # 正在播放的动画直接跳到结束状态
+        self._animator.finish()
+        was_embedded = self.is_embedded
+        if self.is_embedded or self.appbar is not None:
+            self.unembed()
+            self._animator.finish()
+        if was_embedded and self.config.auto_save:
+            # 退出前恢复了普通窗口，但下次启动时由 restore_state() 直接恢复为嵌入状态
+            self.save_config(embedded=True)
+        self.flush()
+        self.stop_metrics_export()
+        tracer.flush()
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        获取当前状态信息
+        
+        Returns:
+            dict: 包含当前状态的字典；config 为当前的 SidebarConfig 对象本身（只读，
+                  修改请使用 set_config()/reconfigure()），不复制字段
+        """
+        return {
+            'is_embedded': self.is_embedded,
+            'config': self.config,
+            'has_saved_geometry': self.saved_geometry is not None,
+            'save_stats': self.writer.get_stats(),
+            'store_stats': self.store.get_stats(),
+            'monitor': self.appbar.monitor_info()._asdict() if self.appbar else None,
+            'dpi_stats': self.dpi.get_stats(),
+            'fullscreen_app_active': self.fullscreen_app_active,
+            'session_locked': self.session_locked,
+            'window_occluded': self.window_occluded,
+            'visible': self.effectively_visible,
+            'suspension': self.suspension.get_stats(),
+            'auto_hide_active': bool(self.appbar and self.appbar.autohide),
+            'reposition_stats': self._reposition_throttle.get_stats(),
+            'native_stats': self.appbar.native.get_stats() if self.appbar else None,
+            'animating': self._animator.running,
+            'pending': self._pending_kind,
+            'animation_stats': self._animator.stats.as_dict(),
+            'metrics': self.get_metrics(),
+        }
+
+
+class SidebarMixin:
+    """
+    侧边栏混入类
+    
+    为现有的QMainWindow类添加侧边栏功能
+    """
+    
+    def init_sidebar(self, 
+                    config_file: str = "sidebar_config.json",
+                    default_config: Optional[Dict[str, Any]] = None,
+                    auto_restore: bool = True):
+        """
+        初始化侧边栏功能
+        
+        Args:
+            config_file: 配置文件路径
+            default_config: 默认配置
+            auto_restore: 是否自动恢复上次退出时的状态（嵌入状态或窗口几何信息），
+                          应在窗口显示之前调用 init_sidebar()
+        """
+        self.sidebar = SidebarWidget(self, config_file, default_config)
+        
+        if auto_restore:
+            self.sidebar.restore_state()
+        
+        # 连接窗口关闭事件
+        original_close_event = getattr(self, 'closeEvent', None)
+        
+        def closeEvent(event):
+            self.sidebar.cleanup()
+            if original_close_event:
+                original_close_event(event)
+        
+        self.closeEvent = closeEvent
+    
+    def toggle_sidebar(self):
+        """切换侧边栏状态"""
+        return self.sidebar.toggle()
+    
+    def embed_sidebar(self):
+        """嵌入侧边栏"""
+        return self.sidebar.embed()
+    
+    def unembed_sidebar(self):
+        """取消嵌入侧边栏"""
+        return self.sidebar.unembed()
+    
+    def reconfigure_sidebar(self, **changes):
+        """修改侧边栏配置并就地应用"""
+        return self.sidebar.reconfigure(**changes)
\ No newline at end of file
@@ -0,0 +1,9 @@
+"""
+测试公共设置
+与 benchmarks 相同，把仓库根目录加入 sys.path，直接导入各平铺模块
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,72 @@
+"""
+stack_rects 多侧边栏布局测试
+"""
+
+import pytest
+
+from appbar_layout import ABE_BOTTOM, ABE_LEFT, ABE_RIGHT, ABE_TOP, stack_rects, subtract_rect
+from shell_simulator import ABM_NEW, ABM_SETPOS, SimulatedShell
+
+
+def _rects(out):
+    return [tuple(out[i:i + 4]) for i in range(0, len(out), 4)]
+
+
+def test_same_edge_bars_stack_from_outside_in():
+    areas = (0, 0, 1920, 1080) * 3
+    out = stack_rects(areas, (ABE_LEFT, ABE_LEFT, ABE_RIGHT), (300, 200, 100),
+                      monitor_index=(0, 0, 0))
+    assert _rects(out) == [(0, 0, 300, 1080), (300, 0, 500, 1080), (1820, 0, 1920, 1080)]
+
+
+def test_top_and_bottom_stack_independently():
+    areas = (0, 0, 1920, 1080)
+    out = stack_rects(areas, (ABE_TOP, ABE_BOTTOM, ABE_TOP), (30, 40, 50),
+                      monitor_index=(0, 0, 0))
+    assert _rects(out) == [(0, 0, 1920, 30), (0, 1040, 1920, 1080), (0, 30, 1920, 80)]
+
+
+def test_monitors_are_stacked_separately():
+    areas = (0, 0, 1920, 1080, 1920, 0, 3840, 1080)
+    out = stack_rects(areas, (ABE_LEFT, ABE_LEFT, ABE_LEFT), (300, 300, 100),
+                      monitor_index=(0, 1, 0))
+    assert _rects(out) == [(0, 0, 300, 1080), (1920, 0, 2220, 1080), (300, 0, 400, 1080)]
+
+
+def test_without_monitor_index_each_bar_uses_its_own_area():
+    areas = (0, 0, 1920, 1080) * 2
+    out = stack_rects(areas, (ABE_LEFT, ABE_LEFT), (300, 200))
+    assert _rects(out) == [(0, 0, 300, 1080), (0, 0, 200, 1080)]
+
+
+def test_length_mismatch_is_rejected():
+    with pytest.raises(ValueError):
+        stack_rects((0, 0, 1920, 1080), (ABE_LEFT, ABE_LEFT), (300,), monitor_index=(0, 0))
+
+
+def test_layout_matches_shell_setpos():
+    """统一计算的布局与 Shell 逐个 SETPOS 的结果一致，不会互相推挤"""
+    shell = SimulatedShell([(0, 0, 1920, 1080)], taskbar_size=0)
+    edges, widths = (ABE_LEFT, ABE_LEFT, ABE_RIGHT), (300, 200, 100)
+    out = _rects(stack_rects((0, 0, 1920, 1080), edges, widths, monitor_index=(0, 0, 0)))
+    for edge, rect in zip(edges, out):
+        hwnd = shell.create_window()
+        abd = shell.new_appbardata(hwnd, edge=edge)
+        shell.shappbarmessage(ABM_NEW, abd)
+        abd.rc[0:4] = rect
+        shell.shappbarmessage(ABM_SETPOS, abd)
+        assert tuple(abd.rc) == rect
+
+
+def test_subtract_rect_splits_around_hole():
+    pieces = subtract_rect([(0, 0, 100, 100)], (20, 30, 60, 70))
+    assert sorted(pieces) == [(0, 0, 100, 30), (0, 30, 20, 70), (0, 70, 100, 100), (60, 30, 100, 70)]
+    assert sum((r - l) * (b - t) for l, t, r, b in pieces) == 100 * 100 - 40 * 40
+
+
+def test_subtract_rect_until_covered():
+    pieces = [(0, 0, 100, 100)]
+    assert subtract_rect(pieces, (200, 0, 300, 100)) == pieces
+    pieces = subtract_rect(pieces, (-10, -10, 50, 200))
+    assert pieces == [(50, 0, 100, 100)]
+    assert subtract_rect(pieces, (40, 0, 120, 100)) == []
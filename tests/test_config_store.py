@@ -0,0 +1,120 @@
+"""
+ConfigStore 读写往返与配置档迁移测试
+"""
+
+import json
+import os
+
+import pytest
+
+import config_store
+from config_store import ConfigStore
+from config_writer import ConfigWriter
+from sidebar_config import CONFIG_VERSION, SidebarConfig, SidebarState
+
+
+@pytest.fixture
+def writer():
+    writer = ConfigWriter(delay=0.0)
+    yield writer
+    writer.close(5.0)
+
+
+def test_round_trip(tmp_path, writer):
+    path = str(tmp_path / 'profiles.json')
+    store = ConfigStore(path, writer)
+    config = SidebarConfig(edge='right', width=320)
+    data = config.to_dict()
+    data.update(SidebarState(True, {'x': 1, 'y': 2, 'width': 3, 'height': 4}).to_dict())
+    store.save_profile('main', data)
+    assert store.flush(5.0)
+
+    with open(path, encoding='utf-8') as f:
+        document = json.load(f)
+    assert document['version'] == config_store.STORE_VERSION
+    assert document['profiles']['main']['width'] == 320
+
+    loaded = ConfigStore(path, writer).load_profile('main')
+    assert SidebarConfig.from_dict(loaded) == config
+    state = SidebarState.from_dict(loaded)
+    assert state.is_embedded is True
+    assert state.window_geometry == {'x': 1, 'y': 2, 'width': 3, 'height': 4}
+
+
+def test_load_merges_defaults_and_returns_copies(tmp_path, writer):
+    store = ConfigStore(str(tmp_path / 'profiles.json'), writer)
+    first = store.load_profile('main', defaults={'width': 300})
+    first['width'] = 1
+    assert store.load_profile('main', defaults={'width': 300}) == {'width': 300}
+    assert not store.has_profile('main')
+
+
+def test_cached_until_file_changes(tmp_path, writer):
+    path = str(tmp_path / 'profiles.json')
+    ConfigStore(path, writer).save_profile('main', {'width': 300})
+    writer.flush(5.0)
+
+    store = ConfigStore(path, writer)
+    store.load_profile('main')
+    store.load_profile('main')
+    assert store.get_stats()['disk_reads'] == 1
+
+    # 其他进程改写了文件：大小变化，重新解析
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'profiles': {'main': {'width': 4000}}}, f)
+    assert store.load_profile('main') == {'width': 4000}
+    assert store.get_stats()['disk_reads'] == 2
+
+
+def test_own_writes_are_not_reparsed(tmp_path, writer):
+    store = ConfigStore(str(tmp_path / 'profiles.json'), writer)
+    store.save_profile('main', {'width': 300})
+    store.flush(5.0)
+    store.save_profile('other', {'width': 200})
+    store.flush(5.0)
+    assert store.load_profile('main') == {'width': 300}
+    assert store.get_stats()['disk_reads'] == 0
+
+
+def test_import_legacy(tmp_path, writer):
+    legacy = tmp_path / 'sidebar_config.json'
+    legacy.write_text(json.dumps({'direction': 1, 'width': 250}), encoding='utf-8')
+    store = ConfigStore(str(tmp_path / 'profiles.json'), writer)
+    data = store.load_profile('sidebar_config', legacy_path=str(legacy))
+    assert data == {'direction': 1, 'width': 250}
+    assert store.has_profile('sidebar_config')
+
+
+def test_migrate_v1_profile():
+    config = SidebarConfig.from_dict({'direction': 1, 'width': 250, 'is_embedded': True})
+    assert config.edge == 'right' and config.width == 250
+    # 已有 edge 时 direction 被丢弃
+    assert SidebarConfig.from_dict({'direction': 1, 'edge': 'top'}).edge == 'top'
+    assert SidebarConfig.from_dict({'version': 'x', 'direction': 0}).edge == 'left'
+    assert config.to_dict()['version'] == CONFIG_VERSION
+    assert 'is_embedded' not in config.to_dict()
+
+
+def test_invalid_values_fall_back_to_defaults():
+    config = SidebarConfig.from_dict({'version': CONFIG_VERSION, 'width': True,
+                                      'edge': 'middle', 'animate': True, 'unknown': 1})
+    assert config.width == SidebarConfig().width
+    assert config.edge == SidebarConfig().edge
+    assert config.animate is True
+
+
+def test_failed_write_keeps_edits_and_retries(tmp_path, writer, monkeypatch):
+    monkeypatch.setattr(config_store, 'WRITE_RETRY_DELAY', 0.01)
+    directory = tmp_path / 'later'
+    store = ConfigStore(str(directory / 'profiles.json'), writer)
+    errors = []
+    store.save_profile('main', {'width': 300}, on_error=lambda path, e: errors.append(e))
+    writer.flush(5.0)
+    assert store.load_profile('main') == {'width': 300}
+    assert errors and writer.get_stats()['failed'] == config_store.WRITE_RETRIES + 1
+
+    # 目录可写后，下一次保存把保留在内存中的修改一起写入
+    os.mkdir(directory)
+    store.save_profile('other', {'width': 200})
+    assert store.flush(5.0)
+    assert ConfigStore(str(directory / 'profiles.json'), writer).profile_names() == ['main', 'other']
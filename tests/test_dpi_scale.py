@@ -0,0 +1,45 @@
+"""
+DpiScaler 缓存与失效测试（使用 FakeMonitorBackend）
+"""
+
+from dpi_scale import DpiScaler
+from monitor_topology import FakeMonitorBackend, MonitorInfo, MonitorTopology
+
+PRIMARY = MonitorInfo(1, (0, 0, 1920, 1080), (0, 0, 1920, 1040), 96, True)
+SECOND = MonitorInfo(2, (1920, 0, 4480, 1440), (1920, 0, 4480, 1440), 144)
+
+
+def test_scale_is_cached_across_work_area_changes():
+    backend = FakeMonitorBackend([PRIMARY, SECOND], {10: 2})
+    topology = MonitorTopology(backend)
+    dpi = DpiScaler(topology)
+    assert dpi.scale_for_window(10) == 1.5
+    topology.invalidate()
+    assert dpi.scale_for_window(10) == 1.5
+    assert dpi.get_stats()['computed'] == 1
+
+
+def test_dpi_changed_updates_monitor_info():
+    backend = FakeMonitorBackend([PRIMARY, SECOND], {10: 2})
+    topology = MonitorTopology(backend)
+    seen = []
+    topology.add_listener(lambda t: seen.append(t.generation))
+    dpi = DpiScaler(topology)
+    dpi.scale_for_window(10)
+
+    backend.monitors[1] = SECOND._replace(dpi=192)
+    dpi.dpi_changed(10, 192)
+    assert seen == [1]
+    assert topology.from_window(10).dpi == 192
+    assert dpi.scale_for_window(10) == 2.0
+
+
+def test_invalidate_reenumerates():
+    backend = FakeMonitorBackend([PRIMARY, SECOND], {10: 2})
+    topology = MonitorTopology(backend)
+    dpi = DpiScaler(topology)
+    dpi.scale_for_window(10)
+    backend.monitors[1] = SECOND._replace(dpi=120)
+    dpi.invalidate()
+    assert topology.generation == 1
+    assert dpi.scale_for_window(10) == 1.25
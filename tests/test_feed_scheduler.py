@@ -0,0 +1,59 @@
+"""
+FeedScheduler 排期测试
+"""
+
+import threading
+import time
+
+from feed_scheduler import Feed, FeedScheduler
+
+
+def test_readded_feed_is_scheduled_once():
+    polls = []
+    lock = threading.Lock()
+
+    def poll():
+        with lock:
+            polls.append(time.monotonic())
+        return len(polls)
+
+    scheduler = FeedScheduler()
+    feed = Feed('counter', poll, interval=0.05)
+    for _ in range(5):
+        scheduler.add(feed)
+        scheduler.remove('counter')
+    scheduler.add(feed)
+    scheduler.start()
+    try:
+        time.sleep(0.5)
+    finally:
+        scheduler.stop(5.0)
+    # 旧的排期作废后只剩一条排期，约 0.05 秒轮询一次
+    assert 5 <= len(polls) <= 15
+
+
+def test_removed_feed_result_is_dropped():
+    started = threading.Event()
+    release = threading.Event()
+
+    def poll():
+        started.set()
+        release.wait(5.0)
+        return 'value'
+
+    scheduler = FeedScheduler()
+    feed = Feed('slow', poll, interval=10.0)
+    scheduler.add(feed)
+    scheduler.start()
+    try:
+        assert started.wait(5.0)
+        scheduler.remove('slow')
+        scheduler.add(feed, delay=10.0)
+        release.set()
+        time.sleep(0.1)
+        # 移除前开始的轮询不写入快照、不产生差异
+        assert scheduler.take_updates() == {}
+        assert feed.snapshot is None
+    finally:
+        release.set()
+        scheduler.stop(5.0)
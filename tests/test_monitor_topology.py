@@ -0,0 +1,95 @@
+"""
+MonitorTopology 缓存与失效测试（使用 FakeMonitorBackend）
+"""
+
+from monitor_topology import FakeMonitorBackend, MonitorInfo, MonitorTopology
+
+PRIMARY = MonitorInfo(1, (0, 0, 1920, 1080), (0, 0, 1920, 1040), 96, True)
+SECOND = MonitorInfo(2, (1920, 0, 4480, 1440), (1920, 0, 4480, 1440), 144)
+
+
+def _topology(windows=None):
+    backend = FakeMonitorBackend([PRIMARY, SECOND], windows)
+    return backend, MonitorTopology(backend)
+
+
+def test_enumerates_once_until_invalidated():
+    backend, topology = _topology()
+    assert topology.monitors() == [PRIMARY, SECOND]
+    assert topology.primary() == PRIMARY
+    assert topology.by_handle(2) == SECOND
+    assert backend.enumerate_calls == 1
+
+    topology.invalidate()
+    assert backend.enumerate_calls == 1
+    topology.monitors()
+    assert backend.enumerate_calls == 2
+
+
+def test_from_point():
+    _, topology = _topology()
+    assert topology.from_point(100, 100) == PRIMARY
+    assert topology.from_point(1920, 0) == SECOND
+    # 不在任何显示器上的点取最近的显示器
+    assert topology.from_point(5000, 100) == SECOND
+    assert topology.from_point(-50, 2000) == PRIMARY
+
+
+def test_from_window_is_cached():
+    backend, topology = _topology({10: 2})
+    assert topology.from_window(10) == SECOND
+    assert topology.from_window(10) == SECOND
+    assert topology.from_window(11) == PRIMARY
+    assert backend.window_calls == 2
+    stats = topology.get_stats()
+    assert (stats['window_hits'], stats['window_misses']) == (1, 2)
+
+
+def test_forget_window_queries_again():
+    backend, topology = _topology({10: 2})
+    topology.from_window(10)
+    backend.windows[10] = 1
+    assert topology.from_window(10) == SECOND
+    topology.forget_window(10)
+    assert topology.from_window(10) == PRIMARY
+    assert backend.window_calls == 2
+
+
+def test_invalidate_clears_windows_and_notifies():
+    backend, topology = _topology({10: 2})
+    seen = []
+
+    def listener(t):
+        seen.append(t.generation)
+
+    topology.add_listener(listener)
+    topology.from_window(10)
+
+    backend.monitors[1] = SECOND._replace(dpi=192)
+    topology.invalidate()
+    assert seen == [1]
+    assert topology.from_window(10).dpi == 192
+    assert backend.window_calls == 2
+
+    topology.remove_listener(listener)
+    topology.invalidate()
+    assert seen == [1]
+
+
+def test_unknown_monitor_handle_invalidates():
+    backend, topology = _topology({10: 1, 11: 1})
+    seen = []
+    topology.add_listener(lambda t: seen.append(t.generation))
+    assert topology.from_window(10) == PRIMARY
+
+    # 新接入的显示器尚未通知，窗口已经位于其上
+    third = MonitorInfo(3, (4480, 0, 6400, 1080), (4480, 0, 6400, 1080), 120)
+    backend.monitors.append(third)
+    backend.windows[11] = 3
+    assert topology.from_window(11) == third
+    assert seen == [1]
+    assert topology.generation == 1
+    # 其他窗口的映射同样作废，重新查询
+    calls = backend.window_calls
+    topology.from_window(10)
+    assert backend.window_calls == calls + 1
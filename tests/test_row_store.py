@@ -0,0 +1,104 @@
+"""
+RowStore 与 merge_rows 测试
+"""
+
+import pytest
+
+from feed_scheduler import RowDelta, merge_rows
+from row_store import STATUS_ERROR, STATUS_OK, RowStore
+
+
+def _store(count=5):
+    store = RowStore()
+    store.extend([(f'k{i}', f'row {i}', STATUS_OK, float(i)) for i in range(count)])
+    return store
+
+
+def test_extend_and_find():
+    store = _store()
+    assert len(store) == 5
+    assert store.find('k3') == 3
+    assert store.row(3) == ('k3', 'row 3', STATUS_OK, 3.0)
+    assert 'k9' not in store
+
+
+def test_extend_is_atomic():
+    store = _store(2)
+    with pytest.raises(KeyError):
+        store.extend([('k5', 'a', STATUS_OK, 1.0), ('k0', 'dup', STATUS_OK, 1.0)])
+    with pytest.raises(OverflowError):
+        store.extend([('k6', 'a', STATUS_OK, 1.0), ('k7', 'b', 300, 1.0)])
+    assert store.keys == ['k0', 'k1']
+    assert len(store.status) == len(store.values) == 2
+    assert 'k5' not in store and 'k6' not in store
+
+
+def test_append_rolls_back_on_bad_value():
+    store = _store(1)
+    with pytest.raises(TypeError):
+        store.append('k1', 'text', STATUS_OK, 'x')
+    assert len(store.status) == 1 and 'k1' not in store
+
+
+def test_update_reports_changed_row():
+    store = _store()
+    assert store.update('k2', status=STATUS_ERROR) == 2
+    assert store.update('k2', status=STATUS_ERROR) is None
+    assert store.update('missing', text='x') is None
+    assert store.row(2)[2] == STATUS_ERROR
+
+
+def test_remove_shifts_following_rows():
+    store = _store()
+    assert store.remove('k1') == 1
+    assert store.remove('k1') is None
+    assert store.keys == ['k0', 'k2', 'k3', 'k4']
+    assert [store.find(key) for key in store.keys] == [0, 1, 2, 3]
+
+
+def test_check_rows_rejects_bad_rows():
+    store = _store(1)
+    with pytest.raises(ValueError):
+        store.check_rows([('k1', 'text', 256, 0.0)])
+    with pytest.raises(ValueError):
+        store.check_rows([('k1', 'text', STATUS_OK)])
+    with pytest.raises(KeyError):
+        store.check_rows([('k0', 'text', STATUS_OK, 0.0)])
+    assert store.check_rows([('k0', 'text', STATUS_OK, 0.0)], replace=True)
+
+
+def test_merge_rows_later_delta_wins():
+    old = RowDelta({'a': ('A', 0, 1.0), 'b': ('B', 0, 2.0)}, {'c'})
+    new = RowDelta({'c': ('C', 0, 3.0), 'a': ('A2', 1, 1.5)}, {'b'})
+    merged = merge_rows(old, new)
+    assert merged.upserts == {'a': ('A2', 1, 1.5), 'c': ('C', 0, 3.0)}
+    assert merged.removed == {'b'}
+
+
+def test_merge_rows_remove_then_readd():
+    merged = merge_rows(RowDelta({}, {'a'}), RowDelta({'a': ('A', 0, 0.0)}))
+    assert merged.upserts == {'a': ('A', 0, 0.0)} and not merged.removed
+    merged = merge_rows(RowDelta({'a': ('A', 0, 0.0)}), RowDelta({}, {'a'}))
+    assert not merged.upserts and merged.removed == {'a'}
+
+
+def test_remove_many_compacts_once():
+    store = _store(10)
+    assert store.removal_ranges(['k8', 'k1', 'k2', 'k3', 'k9', 'missing']) == [(8, 9), (1, 3)]
+    assert store.remove_many(['k8', 'k1', 'k2', 'k3', 'k9', 'missing']) == 5
+    assert store.keys == ['k0', 'k4', 'k5', 'k6', 'k7']
+    assert list(store.values) == [0.0, 4.0, 5.0, 6.0, 7.0]
+    assert [store.find(key) for key in store.keys] == [0, 1, 2, 3, 4]
+    assert store.find('k1') is None
+    assert store.remove_many([]) == 0
+
+
+def test_check_updates():
+    store = _store(1)
+    assert store.check_updates([('k0', None, None, None), ('missing', 't', 1, 2)])
+    with pytest.raises(ValueError):
+        store.check_updates([('k0', 'text', 300, None)])
+    with pytest.raises(ValueError):
+        store.check_updates([('k0', 'text', None, 'x')])
+    with pytest.raises(ValueError):
+        store.check_updates([('k0', 1, None, None)])
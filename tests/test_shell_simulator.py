@@ -0,0 +1,134 @@
+"""
+SimulatedShell 的 QUERYPOS/SETPOS 冲突规则测试
+"""
+
+from appbar_layout import ABE_BOTTOM, ABE_LEFT, ABE_RIGHT, ABE_TOP
+from shell_simulator import (ABM_NEW, ABM_QUERYPOS, ABM_REMOVE, ABM_SETPOS,
+                             SimulatedShell)
+
+SCREEN = (0, 0, 1920, 1080)
+
+
+def _register(shell, hwnd):
+    abd = shell.new_appbardata(hwnd, callback_message=0x8000)
+    assert shell.shappbarmessage(ABM_NEW, abd) == 1
+    return abd
+
+
+def _set_pos(shell, hwnd, edge, rect):
+    abd = shell.new_appbardata(hwnd, edge=edge)
+    abd.rc[0:4] = rect
+    assert shell.shappbarmessage(ABM_SETPOS, abd) == 1
+    return tuple(abd.rc)
+
+
+def test_side_bar_is_shortened_by_bottom_taskbar():
+    shell = SimulatedShell([SCREEN], taskbar_edge=ABE_BOTTOM, taskbar_size=40)
+    hwnd = shell.create_window()
+    _register(shell, hwnd)
+    abd = shell.new_appbardata(hwnd, edge=ABE_LEFT)
+    abd.rc[0:4] = (0, 0, 300, 1080)
+    assert shell.shappbarmessage(ABM_QUERYPOS, abd) == 1
+    assert tuple(abd.rc) == (0, 0, 300, 1040)
+    # QUERYPOS 只调整矩形，不保留区域
+    assert shell.work_area(0) == (0, 0, 1920, 1040)
+
+
+def test_same_edge_bars_stack_inward():
+    shell = SimulatedShell([SCREEN], taskbar_size=0)
+    first, second = shell.create_window(), shell.create_window()
+    _register(shell, first)
+    _register(shell, second)
+    assert _set_pos(shell, first, ABE_LEFT, (0, 0, 300, 1080)) == (0, 0, 300, 1080)
+    # 第二个左侧栏的左边缘移到第一个的右边缘
+    assert _set_pos(shell, second, ABE_LEFT, (0, 0, 500, 1080)) == (300, 0, 500, 1080)
+    assert shell.work_area(0) == (500, 0, 1920, 1080)
+
+
+def test_same_edge_as_taskbar_is_pushed_inward():
+    shell = SimulatedShell([SCREEN], taskbar_edge=ABE_LEFT, taskbar_size=40)
+    hwnd = shell.create_window()
+    _register(shell, hwnd)
+    assert _set_pos(shell, hwnd, ABE_LEFT, (0, 0, 300, 1080)) == (40, 0, 300, 1080)
+    assert shell.work_area(0) == (300, 0, 1920, 1080)
+
+
+def test_opposite_edges_do_not_conflict():
+    shell = SimulatedShell([SCREEN], taskbar_size=0)
+    left, right = shell.create_window(), shell.create_window()
+    _register(shell, left)
+    _register(shell, right)
+    _set_pos(shell, left, ABE_LEFT, (0, 0, 300, 1080))
+    assert _set_pos(shell, right, ABE_RIGHT, (1620, 0, 1920, 1080)) == (1620, 0, 1920, 1080)
+    assert shell.work_area(0) == (300, 0, 1620, 1080)
+
+
+def test_top_bar_avoids_left_bar():
+    shell = SimulatedShell([SCREEN], taskbar_size=0)
+    left, top = shell.create_window(), shell.create_window()
+    _register(shell, left)
+    _register(shell, top)
+    _set_pos(shell, left, ABE_LEFT, (0, 0, 300, 1080))
+    assert _set_pos(shell, top, ABE_TOP, (0, 0, 1920, 50)) == (300, 0, 1920, 50)
+
+
+def test_remove_restores_work_area_and_notifies():
+    shell = SimulatedShell([SCREEN], taskbar_size=40)
+    messages = []
+    shell.on_message = lambda *message: messages.append(message)
+    first, second = shell.create_window(), shell.create_window()
+    _register(shell, first)
+    _register(shell, second)
+    _set_pos(shell, first, ABE_LEFT, (0, 0, 300, 1080))
+    _set_pos(shell, second, ABE_RIGHT, (1620, 0, 1920, 1080))
+    messages.clear()
+
+    shell.shappbarmessage(ABM_REMOVE, shell.new_appbardata(first))
+    assert shell.work_area(0) == (0, 0, 1620, 1040)
+    assert [hwnd for hwnd, _, _ in shell.reserved_rects(0)] == [0, second]
+    # 剩下的 AppBar 收到 ABN_POSCHANGED，所有窗口收到 WM_SETTINGCHANGE
+    assert any(hwnd == second and message == 0x8000 for hwnd, message, _, _ in messages)
+    assert {hwnd for hwnd, message, _, _ in messages if message != 0x8000} == {first, second}
+
+
+def test_bars_on_other_monitor_do_not_conflict():
+    shell = SimulatedShell([SCREEN, (1920, 0, 3840, 1080)], taskbar_size=40)
+    first, second = shell.create_window(), shell.create_window()
+    _register(shell, first)
+    _register(shell, second)
+    _set_pos(shell, first, ABE_LEFT, (0, 0, 300, 1080))
+    # 第二个显示器上没有任务栏，侧边栏铺满高度
+    assert _set_pos(shell, second, ABE_LEFT, (1920, 0, 2220, 1080)) == (1920, 0, 2220, 1080)
+    assert shell.work_area(1) == (2220, 0, 3840, 1080)
+
+
+def test_own_setpos_work_area_change_is_flagged():
+    from appbar_events import SPI_SETWORKAREA, WM_SETTINGCHANGE
+    from appbar_helper import AppBar
+    from monitor_topology import MonitorTopology
+
+    shell = SimulatedShell([SCREEN], taskbar_size=0)
+    hwnd = shell.create_window()
+    appbar = AppBar(hwnd, width=300, topology=MonitorTopology(shell), native=shell)
+    seen = []
+    shell.on_message = lambda target, message, wparam, lparam: seen.append(
+        (message, wparam, appbar.setpos_in_flight))
+    appbar.register()
+    # 工作区域变化在 ABM_SETPOS 执行期间同步广播，接收方能分辨出是自己引起的
+    assert (WM_SETTINGCHANGE, SPI_SETWORKAREA, True) in seen
+    assert not appbar.setpos_in_flight
+    seen.clear()
+    # 工作区域不变时 Shell 不再广播
+    appbar.set_pos()
+    assert not seen
+
+
+def test_failed_appbar_messages_are_counted():
+    shell = SimulatedShell([SCREEN], taskbar_size=0)
+    hwnd = shell.create_window()
+    _register(shell, hwnd)
+    abd = shell.new_appbardata(hwnd, callback_message=0x8000)
+    # 重复注册失败
+    assert shell.shappbarmessage(ABM_NEW, abd) == 0
+    stats = shell.get_stats()['SHAppBarMessage']
+    assert (stats['calls'], stats['failures']) == (2, 1)
@@ -0,0 +1,39 @@
+"""
+宿主进程 ROWS 消息负载解析测试
+"""
+
+import pytest
+
+from sidebar_host import parse_rows
+
+
+def test_parse_rows():
+    delta = parse_rows({'u': [['k1', 'nginx', 2, 12]], 'r': ['k2']})
+    assert delta.upserts == {'k1': ('nginx', 2, 12.0)}
+    assert isinstance(delta.upserts['k1'][2], float)
+    assert delta.removed == {'k2'}
+
+
+def test_parse_rows_defaults_to_empty():
+    delta = parse_rows({})
+    assert not delta
+
+
+@pytest.mark.parametrize('payload', [
+    None,
+    [],
+    {'u': {}},
+    {'u': [['k1', 'text', 0]]},
+    {'u': [('k1', 'text', 0, 1.0)]},
+    {'u': [[1, 'text', 0, 1.0]]},
+    {'u': [['k1', 'text', 256, 1.0]]},
+    {'u': [['k1', 'text', True, 1.0]]},
+    {'u': [['k1', 'text', 1.0, 1.0]]},
+    {'u': [['k1', 'text', 0, '1']]},
+    {'u': [['k1', 'text', 0, False]]},
+    {'r': 'k1'},
+    {'r': [1]},
+])
+def test_parse_rows_rejects_malformed_payload(payload):
+    with pytest.raises(ValueError):
+        parse_rows(payload)
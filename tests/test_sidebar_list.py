@@ -0,0 +1,39 @@
+"""
+RowListModel 批量更新与删除测试（需要 PySide6）
+"""
+
+import pytest
+
+pytest.importorskip('PySide6.QtCore')
+
+from row_store import STATUS_ERROR, STATUS_OK  # noqa: E402
+from sidebar_list import RowListModel  # noqa: E402
+
+
+def _model(count=6):
+    model = RowListModel()
+    model.append_rows([(f'k{i}', f'row {i}', STATUS_OK, float(i)) for i in range(count)])
+    return model
+
+
+def test_update_rows_is_all_or_nothing():
+    model = _model()
+    changed = []
+    model.dataChanged.connect(lambda first, last: changed.append((first.row(), last.row())))
+    with pytest.raises(ValueError):
+        model.update_rows([('k1', 'new text', STATUS_ERROR, 1.0), ('k2', 'text', 300, None)])
+    assert model.store.row(1) == ('k1', 'row 1', STATUS_OK, 1.0)
+    assert not changed
+
+    assert model.update_rows([('k1', 'new text', None, None), ('k4', None, STATUS_ERROR, None)]) == 2
+    assert changed == [(1, 4)]
+
+
+def test_remove_rows_notifies_each_range():
+    model = _model()
+    removed = []
+    model.rowsRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+    assert model.remove_rows(['k0', 'k1', 'k4', 'missing']) == 3
+    assert removed == [(4, 4), (0, 1)]
+    assert model.rowCount() == 3
+    assert [model.store.find(key) for key in ('k2', 'k3', 'k5')] == [0, 1, 2]
@@ -0,0 +1,90 @@
+"""
+SidebarWidget 可见性测试（需要 PySide6，使用模拟 Shell）
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip('PySide6.QtWidgets')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtWidgets import QApplication, QWidget  # noqa: E402
+
+from config_store import ConfigStore  # noqa: E402
+from monitor_topology import MonitorTopology  # noqa: E402
+from native_event_filter import native_event_filter  # noqa: E402
+from shell_simulator import SimulatedShell  # noqa: E402
+from sidebar_widget import SidebarWidget  # noqa: E402
+
+
+@pytest.fixture
+def sidebar(tmp_path):
+    app = QApplication.instance() or QApplication([])
+    shell = SimulatedShell([(0, 0, 1920, 1080)])
+    shell.on_message = native_event_filter().dispatch
+    window = QWidget()
+    window.resize(400, 800)
+    shell.create_window((100, 100, 500, 900), hwnd=int(window.winId()))
+    sidebar = SidebarWidget(window, profile='test', store=ConfigStore(str(tmp_path / 'profiles.json')),
+                            topology=MonitorTopology(shell), native=shell,
+                            default_config={'animate': False, 'resizable': False})
+    assert sidebar.embed()
+    app.processEvents()
+    yield sidebar, shell
+    sidebar.cleanup()
+    window.close()
+
+
+def test_occluded_window_suspends_work(sidebar):
+    sidebar, shell = sidebar
+    changes = []
+    sidebar.visibilityChanged.connect(changes.append)
+    assert sidebar.effectively_visible
+    assert sidebar._occlusion_timer.isActive()
+
+    shell.set_window_occluded(sidebar.appbar.hwnd, True)
+    sidebar._check_occlusion()
+    assert not sidebar.effectively_visible
+    # 覆盖期间继续检查，才能发现重新露出
+    assert sidebar._occlusion_timer.isActive()
+
+    shell.set_window_occluded(sidebar.appbar.hwnd, False)
+    sidebar._check_occlusion()
+    assert sidebar.effectively_visible
+    assert changes == [False, True]
+
+
+def test_occlusion_is_not_polled_while_fullscreen_app_covers(sidebar):
+    sidebar, shell = sidebar
+    shell.set_fullscreen_app(True)
+    assert not sidebar.effectively_visible
+    assert not sidebar._occlusion_timer.isActive()
+    shell.set_fullscreen_app(False)
+    assert sidebar._occlusion_timer.isActive()
+
+
+def test_unembed_stops_occlusion_polling(sidebar):
+    sidebar, shell = sidebar
+    shell.set_window_occluded(sidebar.appbar.hwnd, True)
+    sidebar._check_occlusion()
+    assert sidebar.unembed()
+    QApplication.processEvents()
+    assert not sidebar._occlusion_timer.isActive()
+    assert not sidebar.window_occluded
+
+
+def test_restyle_in_place_syncs_qt_flags(sidebar):
+    from PySide6.QtCore import Qt
+
+    sidebar, shell = sidebar
+    window = sidebar.window
+    hwnd = sidebar.appbar.hwnd
+    assert sidebar.config.restyle_in_place
+    assert window.windowFlags() & Qt.FramelessWindowHint
+    assert window.windowHandle().flags() & Qt.FramelessWindowHint
+    assert sidebar.unembed()
+    QApplication.processEvents()
+    assert int(window.winId()) == hwnd
+    assert not window.windowFlags() & Qt.FramelessWindowHint
+    assert not window.windowHandle().flags() & Qt.FramelessWindowHint
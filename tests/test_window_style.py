@@ -0,0 +1,68 @@
+"""
+就地修改窗口样式测试（使用模拟 Shell）
+"""
+
+from shell_simulator import SimulatedShell
+from window_style import (GWL_EXSTYLE, GWL_STYLE, SWP_NOMOVE, SWP_NOSIZE, SWP_SHOWWINDOW,
+                          WS_CAPTION, WS_EX_TOOLWINDOW, WS_POPUP, WS_VISIBLE,
+                          apply_docked_style, read_style, restore_style)
+
+
+class _RecordingShell(SimulatedShell):
+    """记录每次写入扩展样式时窗口是否可见"""
+
+    def __init__(self):
+        super().__init__([(0, 0, 1920, 1080)])
+        self.ex_style_writes = []
+
+    def set_window_long(self, hwnd, index, value):
+        if index == GWL_EXSTYLE:
+            self.ex_style_writes.append(bool(self.get_window_long(hwnd, GWL_STYLE) & WS_VISIBLE))
+        return super().set_window_long(hwnd, index, value)
+
+
+def _visible_window(shell):
+    hwnd = shell.create_window()
+    shell.set_window_pos(hwnd, 0, 0, 0, 0, 0, SWP_NOMOVE | SWP_NOSIZE | SWP_SHOWWINDOW)
+    return hwnd
+
+
+def test_tool_window_change_hides_visible_window():
+    shell = _RecordingShell()
+    hwnd = _visible_window(shell)
+    original = read_style(hwnd, shell)
+
+    saved = apply_docked_style(hwnd, shell)
+    assert saved == original
+    docked = read_style(hwnd, shell)
+    assert docked.style & WS_POPUP and not docked.style & WS_CAPTION
+    assert docked.ex_style & WS_EX_TOOLWINDOW
+    # 扩展样式在隐藏期间写入，之后重新显示
+    assert shell.ex_style_writes == [False]
+    assert docked.style & WS_VISIBLE
+
+    restore_style(hwnd, saved, shell)
+    assert read_style(hwnd, shell) == original
+    assert shell.ex_style_writes == [False, False]
+
+
+def test_hidden_window_stays_hidden():
+    shell = _RecordingShell()
+    hwnd = shell.create_window()
+    saved = apply_docked_style(hwnd, shell)
+    assert not read_style(hwnd, shell).style & WS_VISIBLE
+    # 嵌入期间被显示，恢复样式时不改变显示状态
+    shell.set_window_pos(hwnd, 0, 0, 0, 0, 0, SWP_NOMOVE | SWP_NOSIZE | SWP_SHOWWINDOW)
+    restore_style(hwnd, saved, shell)
+    assert read_style(hwnd, shell).style == saved.style | WS_VISIBLE
+
+
+def test_keeping_taskbar_button_does_not_hide():
+    shell = _RecordingShell()
+    hwnd = _visible_window(shell)
+    hidden = []
+    set_window_pos = shell.set_window_pos
+    shell.set_window_pos = lambda *args: hidden.append(args[-1]) or set_window_pos(*args)
+    apply_docked_style(hwnd, shell, tool_window=False)
+    assert shell.ex_style_writes == []
+    assert len(hidden) == 1 and not hidden[0] & SWP_SHOWWINDOW
@@ -0,0 +1,123 @@
+"""
+就地修改窗口样式
+通过 GetWindowLongPtr/SetWindowLongPtr 直接修改已有原生窗口的样式，
+不调用 Qt 的 setWindowFlags()，因此不会销毁并重建原生窗口：
+句柄在整个生命周期内保持不变，嵌入和取消嵌入时也不会闪烁
+
+Qt 记录的窗口标志由调用方另外同步（QWidget.overrideWindowFlags() 和 QWindow.setFlags()，
+都不会重建原生窗口），应在修改原生样式之前同步，最终的样式以这里写入的为准；
+任务栏按钮只在窗口显示时更新，切换工具窗口样式时先隐藏窗口，改完后再显示
+
+使用示例:
+    from window_style import apply_docked_style, read_style, restore_style
+
+    saved = read_style(hwnd, native)
+    sync_qt_flags(...)                                   # 调用方同步 Qt 的窗口标志
+    apply_docked_style(hwnd, native, saved=saved)        # 嵌入：无边框 + 工具窗口
+    ...
+    restore_style(hwnd, saved, native)                   # 取消嵌入：恢复原样式
+"""
+
+from typing import NamedTuple
+
+from appbar_native import NativeApi
+
+GWL_STYLE = -16
+GWL_EXSTYLE = -20
+
+WS_CAPTION = 0x00C00000
+WS_THICKFRAME = 0x00040000
+WS_SYSMENU = 0x00080000
+WS_MINIMIZEBOX = 0x00020000
+WS_MAXIMIZEBOX = 0x00010000
+WS_POPUP = 0x80000000
+WS_VISIBLE = 0x10000000
+WS_EX_TOPMOST = 0x00000008
+WS_EX_TOOLWINDOW = 0x00000080
+WS_EX_APPWINDOW = 0x00040000
+
+SWP_NOSIZE = 0x0001
+SWP_NOMOVE = 0x0002
+SWP_NOZORDER = 0x0004
+SWP_NOACTIVATE = 0x0010
+SWP_FRAMECHANGED = 0x0020
+SWP_SHOWWINDOW = 0x0040
+SWP_HIDEWINDOW = 0x0080
+
+HWND_NOTOPMOST = -2
+HWND_TOPMOST = -1
+
+# 嵌入时去掉的标题栏和边框样式
+FRAME_STYLES = WS_CAPTION | WS_THICKFRAME | WS_SYSMENU | WS_MINIMIZEBOX | WS_MAXIMIZEBOX
+# 决定是否显示任务栏按钮的扩展样式
+TASKBAR_EX_STYLES = WS_EX_TOOLWINDOW | WS_EX_APPWINDOW
+
+_FRAME_CHANGED = SWP_NOMOVE | SWP_NOSIZE | SWP_NOACTIVATE | SWP_FRAMECHANGED
+
+
+class SavedStyle(NamedTuple):
+    """嵌入前的窗口样式"""
+    style: int
+    ex_style: int
+
+    @property
+    def topmost(self) -> bool:
+        return bool(self.ex_style & WS_EX_TOPMOST)
+
+
+def docked_style(saved: SavedStyle, tool_window: bool = True) -> SavedStyle:
+    """计算嵌入后的样式：去掉标题栏和边框，可选改为不显示在任务栏上的工具窗口"""
+    style = (saved.style & ~FRAME_STYLES) | WS_POPUP
+    ex_style = saved.ex_style
+    if tool_window:
+        ex_style = (ex_style | WS_EX_TOOLWINDOW) & ~WS_EX_APPWINDOW
+    return SavedStyle(style & 0xFFFFFFFF, ex_style & 0xFFFFFFFF)
+
+
+def read_style(hwnd: int, native: NativeApi) -> SavedStyle:
+    """读取窗口当前的样式"""
+    return SavedStyle(native.get_window_long(hwnd, GWL_STYLE) & 0xFFFFFFFF,
+                      native.get_window_long(hwnd, GWL_EXSTYLE) & 0xFFFFFFFF)
+
+
+def apply_docked_style(hwnd: int, native: NativeApi, tool_window: bool = True,
+                       saved: SavedStyle = None) -> SavedStyle:
+    """
+    将已有窗口改为侧边栏样式
+
+    置顶由 AppBar 移动窗口时的 HWND_TOPMOST 负责，这里只发送一次
+    SWP_FRAMECHANGED 让系统重新计算非客户区
+
+    Args:
+        saved: 同步 Qt 的窗口标志之前用 read_style() 读取的样式，默认现在读取
+
+    Returns:
+        SavedStyle: 原来的样式，取消嵌入时传给 restore_style()
+    """
+    if saved is None:
+        saved = read_style(hwnd, native)
+    _write_style(hwnd, native, docked_style(saved, tool_window), SWP_NOZORDER, 0)
+    return saved
+
+
+def restore_style(hwnd: int, saved: SavedStyle, native: NativeApi):
+    """恢复嵌入前的样式（显示状态保持不变），并撤销嵌入期间的置顶"""
+    _write_style(hwnd, native, saved, 0, HWND_TOPMOST if saved.topmost else HWND_NOTOPMOST)
+
+
+def _write_style(hwnd: int, native: NativeApi, target: SavedStyle, flags: int, insert_after: int):
+    current = read_style(hwnd, native)
+    # 窗口显示期间改变工具窗口样式，任务栏按钮不会随之出现或消失
+    hide = bool(current.style & WS_VISIBLE and (target.ex_style ^ current.ex_style) & TASKBAR_EX_STYLES)
+    if hide:
+        native.set_window_pos(hwnd, 0, 0, 0, 0, 0,
+                              SWP_NOMOVE | SWP_NOSIZE | SWP_NOZORDER | SWP_NOACTIVATE | SWP_HIDEWINDOW)
+        current = current._replace(style=current.style & ~WS_VISIBLE)
+    # WS_VISIBLE 只由显示/隐藏改变，不随样式写入
+    style = (target.style & ~WS_VISIBLE) | (current.style & WS_VISIBLE)
+    if style != current.style:
+        native.set_window_long(hwnd, GWL_STYLE, style)
+    if target.ex_style != current.ex_style:
+        native.set_window_long(hwnd, GWL_EXSTYLE, target.ex_style)
+    native.set_window_pos(hwnd, insert_after, 0, 0, 0, 0,
+                          _FRAME_CHANGED | flags | (SWP_SHOWWINDOW if hide else 0))